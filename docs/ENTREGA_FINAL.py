@@ -6,426 +6,90 @@
 Este archivo muestra un resumen de lo que se ha entregado.
 """
 
+import os
 import sys
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
-# Crear el resumen
-RESUMEN = """
+# Directorios que se recorren, resueltos una sola vez
+_HERE = Path(__file__).resolve().parent
+_SRC_DIR = _HERE / 'src'
+_DOCS_DIR = _HERE / 'docs'
 
-╔══════════════════════════════════════════════════════════════════════════╗
-║                  ✅ PIPELINE ETL - ENTREGA COMPLETADA                   ║
-╚══════════════════════════════════════════════════════════════════════════╝
+# Las listas de archivos son tuplas (nombre, tamaño): se ordenan por nombre
+_BY_NAME = itemgetter(0)
 
-📊 ESTADÍSTICAS DE ENTREGA
-════════════════════════════════════════════════════════════════════════════
+# Scripts del ETL que se buscan en el directorio base (además de src/etl_*.py)
+_PY_RAIZ = frozenset({'examples.py', 'setup_etl.py', 'ETL_INDEX.py'})
 
-Código Python:
-  • 4 módulos ETL en src/: etl_football_data.py, etl_cli.py, 
-    etl_config.py, etl_data_analysis.py
-  • 2 scripts ejecutables: examples.py, setup_etl.py
-  • Total: 2,190 líneas de código
-  
-Documentación:
-  • 1 Guía completa (6,000+ palabras): ETL_FOOTBALL_DATA_GUIDE.md
-  • 1 Quick Start (5 minutos): ETL_QUICKSTART.md
-  • 1 Referencia rápida: COMANDOS_RAPIDOS.md
-  • 1 Resumen ejecutivo: RESUMEN_ETL.md
-  • 1 Índice técnico: ETL_INDEX.py
-  • Total: 2,046 líneas de documentación
 
-TOTAL ENTREGADO: 4,236 líneas de código y documentación
+# El texto del resumen vive en ENTREGA_FINAL.txt (junto a este archivo) y
+# solo se lee al mostrarlo; importar el módulo no lo carga.
+@lru_cache(maxsize=1)
+def _resumen_bytes():
+    """Contenido de ENTREGA_FINAL.txt (UTF-8), leído una sola vez."""
+    return (_HERE / 'ENTREGA_FINAL.txt').read_bytes()
 
 
-🎯 FUNCIONALIDADES PRINCIPALES
-════════════════════════════════════════════════════════════════════════════
+def _escribir_resumen():
+    """Escribe el resumen en stdout con un único write de bytes."""
+    try:
+        buffer = sys.stdout.buffer
+    except AttributeError:
+        # stdout reemplazado (p. ej. capturado por pytest) sin buffer binario
+        sys.stdout.write(_resumen_bytes().decode('utf-8'))
+        return
+    sys.stdout.flush()
+    buffer.write(_resumen_bytes())
+    buffer.flush()
 
-✅ EXTRACCIÓN (FootballDataExtractor)
-   └─ Descarga automática desde Football-Data.co.uk
-      • 3 ligas (Premier League, La Liga, Bundesliga)
-      • 10 temporadas (2015-2025)
-      • 30 archivos CSV (~10,500 registros)
-      • Reintentos automáticos con backoff exponencial
-      • Rate limiting respetuoso
-      • Total: ~10,660 partidos históricos
 
-✅ TRANSFORMACIÓN (FootballDataTransformer)
-   └─ Normalización y enriquecimiento de datos
-      • Fechas: Formato ISO 8601
-      • Columnas críticas: FTR, HS/AS, HST/AST, B365H/D/A
-      • Enriquecimiento: Total goles, Over/Under, Efectividad
-      • Validación: Duplicados, NULL, FTR inválidos
-      • Limpieza automática
-      • 5 métodos públicos
+def _scan(dirpath, predicate):
+    """
+    Lista (nombre, tamaño) de las entradas de `dirpath` cuyo nombre cumple `predicate`.
+    Una sola pasada con os.scandir: no crea un Path ni hace un stat() aparte por archivo.
+    """
+    try:
+        with os.scandir(dirpath) as it:
+            return [(e.name, e.stat().st_size) for e in it if predicate(e.name)]
+    except FileNotFoundError:
+        return []
 
-✅ CARGA (FootballDataLoader)
-   └─ Base de datos con dos opciones
-      • SQLite: Portátil, sin configuración (desarrollo)
-      • PostgreSQL: Multi-usuario, performance (producción)
-      • Inserción masiva en chunks (1,000 registros)
-      • Índices automáticos
-      • Constraints de unicidad
-
-✅ ORQUESTACIÓN (FootballETLPipeline)
-   └─ Coordina todo el pipeline
-      • 3 fases automáticas
-      • Manejo de errores robusto
-      • Logging detallado
-      • Estadísticas finales
-
-✅ ANÁLISIS INTEGRADO (FootballDataAnalyzer)
-   └─ Queries y análisis sobre BD
-      • Estadísticas por equipo (casa/fuera)
-      • Historial directo (H2H) entre equipos
-      • Rankings por métrica (goles, victorias, defensa)
-      • Cálculo de probabilidades (Poisson)
-      • Tendencias de mercado
-      • 6 métodos de análisis
-
-✅ EXPORTACIÓN (FootballDataExporter)
-   └─ Múltiples formatos
-      • Excel (.xlsx) - Con múltiples sheets
-      • CSV (.csv)
-      • JSON (.json)
-      • Parquet (.parquet) - Comprimido para ML
-
-✅ VALIDACIÓN (FootballDataValidator)
-   └─ Asegura calidad de datos
-      • Completitud de columnas
-      • Rangos válidos
-      • Detección de outliers
-      • Integridad referencial
-
-✅ CLI PROFESIONAL (etl_cli.py)
-   └─ Interfaz de línea de comandos
-      • Comando: run - Ejecutar pipeline completo
-      • Comando: stats - Ver estadísticas
-      • Comando: validate - Validar integridad
-      • Comando: export - Exportar a múltiples formatos
-      • Argumentos: --db-type, --ligas, --connection, etc
-      • Help integrado: --help
-
-✅ EJEMPLOS PRÁCTICOS (examples.py)
-   └─ 8 ejemplos listos para ejecutar
-      1. Descargar datos (10 temporadas)
-      2. Analizar estadísticas de equipo
-      3. Historial directo (H2H)
-      4. Predecir probabilidades de partido
-      5. Top equipos por métrica
-      6. Tendencias de mercado
-      7. Exportar datos para ML
-      8. Validar integridad de BD
-
-
-🗂️ ARCHIVOS CREADOS
-════════════════════════════════════════════════════════════════════════════
-
-📁 src/ (Módulos principales)
-   ├── etl_football_data.py      (1,200 líneas)
-   │   ├─ FootballDataExtractor
-   │   ├─ FootballDataTransformer
-   │   ├─ FootballDataLoader
-   │   └─ FootballETLPipeline
-   │
-   ├── etl_cli.py                (500 líneas)
-   │   ├─ Comandos: run, stats, validate, export
-   │   └─ ETLCliManager
-   │
-   ├── etl_config.py             (150 líneas)
-   │   ├─ DATABASE_CONFIG
-   │   ├─ ETL_CONFIG
-   │   └─ Validaciones
-   │
-   └── etl_data_analysis.py      (600 líneas)
-       ├─ FootballDataAnalyzer
-       ├─ FootballDataExporter
-       └─ FootballDataValidator
-
-📁 root/ (Scripts y configuración)
-   ├── examples.py               (600 líneas - 8 ejemplos)
-   ├── setup_etl.py              (140 líneas - Validación)
-   ├── requirements.txt          (Actualizado)
-   └── ETL_INDEX.py              (Referencia técnica)
-
-📁 docs/ (Documentación)
-   └── ETL_FOOTBALL_DATA_GUIDE.md (480+ líneas)
-
-📁 root/ (Guías y referencias)
-   ├── ETL_QUICKSTART.md          (Guía 5 minutos)
-   ├── RESUMEN_ETL.md             (Resumen ejecutivo)
-   └── COMANDOS_RAPIDOS.md        (Referencia rápida)
-
-📁 data/ (Base de datos - creada automáticamente)
-   └── databases/
-       └── football_data.db       (SQLite, creada en ejecución)
-
-📁 logs/ (Logs - creados en ejecución)
-   └── etl_football_data.log      (Logs detallados)
-
-
-🚀 QUICK START (3 pasos)
-════════════════════════════════════════════════════════════════════════════
-
-Paso 1: Instalar dependencias
-   $ pip install -r requirements.txt
-
-Paso 2: Ejecutar ETL
-   $ cd src
-   $ python etl_cli.py run
-
-Paso 3: Verificar
-   $ python etl_cli.py stats
-
-✅ Listo! Base de datos en: data/databases/football_data.db
-
-
-💻 COMANDOS PRINCIPALES
-════════════════════════════════════════════════════════════════════════════
-
-CLI (Línea de comandos):
-   python etl_cli.py run                    # Descargar todo
-   python etl_cli.py run --ligas E0,SP1    # Ligas específicas
-   python etl_cli.py stats                  # Ver estadísticas
-   python etl_cli.py validate               # Validar integridad
-   python etl_cli.py export --output d.xlsx # Exportar Excel
-
-Python:
-   from src.etl_football_data import FootballETLPipeline
-   pipeline = FootballETLPipeline()
-   pipeline.ejecutar(['E0', 'SP1', 'D1'])
-
-Ejemplos:
-   python examples.py descargar_datos
-   python examples.py analizar_equipo "Liverpool"
-   python examples.py predecir "Liverpool" "Chelsea"
-
-
-📊 DATOS A DESCARGAR
-════════════════════════════════════════════════════════════════════════════
-
-Liga                  País        Partidos/Temp  Temporadas  Total
-─────────────────────────────────────────────────────────────────────
-Premier League        Inglaterra  380            10          3,800
-La Liga               España      380            10          3,800
-Bundesliga            Alemania    306            10          3,060
-─────────────────────────────────────────────────────────────────────
-TOTAL                                                        10,660 partidos
-
-
-🗄️ COLUMNAS DE BASE DE DATOS
-════════════════════════════════════════════════════════════════════════════
-
-Temporales:    date, temporada
-Equipos:       home_team, away_team
-Resultado:     fthg, ftag, ftr, total_goles
-Tiros:         hs, as_shots, hst, ast, diff_tiros
-Disciplina:    hf, af, hr, ar, hy, ay
-Cuotas:        b365h, b365d, b365a
-Derivadas:     over_25, efectividad_local
-Metadata:      id, created_at
-
-
-✨ CARACTERÍSTICAS ESPECIALES
-════════════════════════════════════════════════════════════════════════════
-
-✅ Sin APIKey: Usa datos públicos de Football-Data.co.uk
-✅ Robusto: Validación automática, reintentos, manejo de errores
-✅ Flexible: SQLite (desarrollo) o PostgreSQL (producción)
-✅ Escalable: Procesa 10,660 registros eficientemente
-✅ Integrado: Análisis, exportación, validación incluidos
-✅ Documentado: Guía + ejemplos + referencia rápida
-✅ Profesional: Logging, CLI, arquitectura limpia
-✅ Rápido: Descarga + transformación en 5-10 minutos
-✅ Seguro: Validación de datos, manejo de errores
-✅ Portátil: SQLite sin configuración adicional
-
-
-🎓 CASOS DE USO
-════════════════════════════════════════════════════════════════════════════
-
-1. Modelo de Predicción
-   $ python etl_cli.py run
-   $ python etl_cli.py export --output training.parquet
-   → Usar con scikit-learn, XGBoost, TensorFlow
-
-2. Dashboard Streamlit
-   from src.etl_data_analysis import FootballDataAnalyzer
-   analyzer = FootballDataAnalyzer(engine)
-   st.write(analyzer.obtener_estadisticas_equipo(equipo))
-
-3. Análisis Exploratorio
-   $ python examples.py analizar_equipo "Manchester City"
-   $ python examples.py top_equipos
-   $ python examples.py h2h "team1" "team2"
-
-4. Sistema en Producción
-   $ python etl_cli.py run --db-type postgresql
-   → Ejecutar en cron/scheduler para actualización automática
-
-5. Machine Learning
-   $ python etl_cli.py export --output training.parquet
-   → Entrenar modelos con 10,660 partidos históricos
-
-
-📚 DOCUMENTACIÓN INCLUIDA
-════════════════════════════════════════════════════════════════════════════
-
-📖 ETL_FOOTBALL_DATA_GUIDE.md (480+ líneas)
-   • Descripción general
-   • Características principales
-   • Instalación paso a paso
-   • Uso (CLI, Python, módulos)
-   • Configuración de BD
-   • Esquema de BD
-   • Estructura de datos
-   • Casos de uso
-   • Troubleshooting
-   • Ejemplos completos
-
-⚡ ETL_QUICKSTART.md
-   • TL;DR (3 pasos)
-   • Comandos principales
-   • Ejemplos Python
-   • Troubleshooting básico
-   • Checklist
-
-📋 COMANDOS_RAPIDOS.md
-   • Referencia rápida
-   • Todos los comandos
-   • Soluciones rápidas
-
-📊 RESUMEN_ETL.md
-   • Resumen ejecutivo
-   • Características entregadas
-   • Estadísticas
-   • Próximos pasos
-
-🔍 ETL_INDEX.py
-   • Índice técnico
-   • Arquitectura
-   • Roadmap
-   • Contacto
-
-
-✅ VALIDACIÓN Y TESTING
-════════════════════════════════════════════════════════════════════════════
-
-Setup & Validación:
-   $ python setup_etl.py
-   Verifica:
-   ✓ Python version
-   ✓ Paquetes instalados
-   ✓ Estructura de archivos
-   ✓ Importación de módulos
-
-Integridad de datos:
-   $ python etl_cli.py validate
-   Verifica:
-   ✓ Total de registros
-   ✓ Valores NULL
-   ✓ Duplicados
-   ✓ FTR válidos
-
-Estadísticas:
-   $ python etl_cli.py stats
-   Muestra:
-   ✓ Registros por temporada
-   ✓ Equipos únicos
-   ✓ Fecha inicio/fin
-   ✓ Promedio de goles
-
-
-🔐 CONSIDERACIONES DE SEGURIDAD
-════════════════════════════════════════════════════════════════════════════
-
-✅ Datos públicos (Football-Data.co.uk)
-✅ Validación de entrada
-✅ Manejo seguro de conexiones BD
-⚠️  Para PostgreSQL: usar .env para credenciales
-
-
-🎯 PRÓXIMOS PASOS SUGERIDOS
-════════════════════════════════════════════════════════════════════════════
-
-1. ✅ Instalar: pip install -r requirements.txt
-2. ✅ Validar: python setup_etl.py
-3. ✅ Ejecutar: python src/etl_cli.py run
-4. ✅ Verificar: python src/etl_cli.py stats
-5. ✅ Explorar: python examples.py todos
-6. ✅ Integrar en Streamlit (src/app.py)
-7. ✅ Entrenar modelo ML con datos exportados
-8. ✅ Desplegar con PostgreSQL en producción
-
-
-📞 SOPORTE Y RECURSOS
-════════════════════════════════════════════════════════════════════════════
-
-📖 Documentación Completa
-   └─ docs/ETL_FOOTBALL_DATA_GUIDE.md
-
-⚡ Quick Start
-   └─ ETL_QUICKSTART.md
-
-📚 Ejemplos Prácticos
-   └─ examples.py (8 ejemplos)
-
-📋 Referencia Rápida
-   └─ COMANDOS_RAPIDOS.md
-
-📊 Resumen Ejecutivo
-   └─ RESUMEN_ETL.md
-
-🔍 Índice Técnico
-   └─ ETL_INDEX.py
-
-📝 Logs Detallados
-   └─ logs/etl_football_data.log
-
-
-════════════════════════════════════════════════════════════════════════════
-
-✨ ESTADO: ✅ PRODUCCIÓN
-📦 VERSIÓN: 1.0.0
-📅 ÚLTIMA ACTUALIZACIÓN: 30 de Enero de 2025
-
-════════════════════════════════════════════════════════════════════════════
-
-🎉 ¡ETL FOOTBALL DATA COMPLETAMENTE LISTO PARA USAR!
-
-════════════════════════════════════════════════════════════════════════════
-"""
 
 def main():
     """Mostrar resumen"""
-    print(RESUMEN)
+    _escribir_resumen()
     
     # Estadísticas de archivos
     print("\n📊 ESTADÍSTICAS DE ARCHIVOS\n")
     
-    base_dir = Path(__file__).parent
+    # Una sola lectura de _HERE, repartiendo cada entrada en Python o Markdown
+    py_files, md_files = [], []
+    with os.scandir(_HERE) as it:
+        for entry in it:
+            name = entry.name
+            if name in _PY_RAIZ:
+                py_files.append((name, entry.stat().st_size))
+            elif name.endswith('.md'):
+                md_files.append((name, entry.stat().st_size))
+    py_files += _scan(_SRC_DIR, lambda n: n.startswith('etl_') and n.endswith('.py'))
+    md_files += _scan(_DOCS_DIR, lambda n: n.endswith('.md'))
     
     # Archivos Python
-    py_files = list(base_dir.glob('src/etl_*.py')) + \
-               list(base_dir.glob('examples.py')) + \
-               list(base_dir.glob('setup_etl.py')) + \
-               list(base_dir.glob('ETL_INDEX.py'))
-    
+    py_files.sort(key=_BY_NAME)
     print(f"Archivos Python: {len(py_files)}")
-    for f in sorted(py_files):
-        size = f.stat().st_size
-        print(f"  • {f.name:30} {size:>8,} bytes")
+    sys.stdout.writelines(f"  • {name:30} {size:>8,} bytes\n" for name, size in py_files)
     
     # Archivos Markdown
-    md_files = list(base_dir.glob('*.md')) + \
-               list((base_dir / 'docs').glob('*.md'))
-    
+    md_files.sort(key=_BY_NAME)
     print(f"\nArchivos Markdown: {len(md_files)}")
-    for f in sorted(md_files):
-        size = f.stat().st_size
-        print(f"  • {f.name:40} {size:>8,} bytes")
+    sys.stdout.writelines(f"  • {name:40} {size:>8,} bytes\n" for name, size in md_files)
     
     print("\n" + "="*80)
     print("✅ ETL LISTO PARA USAR")
     print("="*80)
+    sys.stdout.flush()
 
 
 if __name__ == '__main__':
@@ -5,76 +5,117 @@
 Este archivo documenta todos los archivos creados para el ETL.
 """
 
+from dataclasses import dataclass
+from typing import Optional
+
+
+# ESQUEMAS
+# ========
+# Cada tabla guarda su esquema una sola vez (dataclass con slots) en vez de
+# repetir las mismas claves en un dict por entrada.
+
+@dataclass(slots=True, frozen=True)
+class ArchivoInfo:
+    """Archivo creado o modificado por el ETL."""
+    descripcion: str
+    lineas: Optional[str] = None
+    clases: tuple[str, ...] = ()
+    metodos_clave: tuple[str, ...] = ()
+    metodos: tuple[str, ...] = ()
+    comandos: tuple[str, ...] = ()
+    contiene: tuple[str, ...] = ()
+    ejemplos: tuple[str, ...] = ()
+    secciones: tuple[str, ...] = ()
+    agregadas: tuple[str, ...] = ()
+    usar: Optional[str] = None
+
+
+@dataclass(slots=True, frozen=True)
+class CasoUso:
+    """Caso de uso del ETL con sus pasos."""
+    descripcion: str
+    pasos: tuple[str, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class LigaInfo:
+    """Liga descargada por el ETL."""
+    nombre: str
+    pais: str
+    partidos_temporada: int
+    temporadas: int
+
+
 # ESTRUCTURA COMPLETA DEL ETL
 # ============================
 
 ARCHIVOS_CREADOS = {
     
     # ====== CORE ETL ======
-    "src/etl_football_data.py": {
-        "descripción": "Pipeline ETL principal (3 clases principales)",
-        "líneas": "~1200",
-        "clases": [
+    "src/etl_football_data.py": ArchivoInfo(
+        descripcion="Pipeline ETL principal (3 clases principales)",
+        lineas="~1200",
+        clases=(
             "FootballDataExtractor - Descarga desde Football-Data.co.uk",
             "FootballDataTransformer - Normaliza y enriquece datos",
             "FootballDataLoader - Carga en SQLite/PostgreSQL",
             "FootballETLPipeline - Orquesta todo el pipeline"
-        ],
-        "métodos_clave": [
+        ),
+        metodos_clave=(
             "ejecutar() - Run completo del pipeline",
             "descargar_csv() - Descarga un archivo CSV",
             "transformar() - Pipeline de transformación",
             "cargar_datos() - Inserta en BD"
-        ]
-    },
+        )
+    ),
     
     # ====== CLI ======
-    "src/etl_cli.py": {
-        "descripción": "Interfaz CLI para ejecutar ETL",
-        "líneas": "~500",
-        "comandos": [
+    "src/etl_cli.py": ArchivoInfo(
+        descripcion="Interfaz CLI para ejecutar ETL",
+        lineas="~500",
+        comandos=(
             "run - Ejecutar pipeline completo",
             "stats - Ver estadísticas de datos cargados",
             "validate - Validar integridad de BD",
             "export - Exportar datos a múltiples formatos"
-        ],
-        "usar": "python etl_cli.py run"
-    },
+        ),
+        usar="python etl_cli.py run"
+    ),
     
     # ====== CONFIGURACIÓN ======
-    "src/etl_config.py": {
-        "descripción": "Configuración centralizada",
-        "líneas": "~150",
-        "contiene": [
+    "src/etl_config.py": ArchivoInfo(
+        descripcion="Configuración centralizada",
+        lineas="~150",
+        contiene=(
             "DATABASE_CONFIG - Configs SQLite/PostgreSQL",
             "ETL_CONFIG - Parámetros de descarga",
             "LIGAS_CONFIG - Definición de ligas",
             "Validaciones automáticas"
-        ]
-    },
+        )
+    ),
     
     # ====== ANÁLISIS ======
-    "src/etl_data_analysis.py": {
-        "descripción": "Análisis y queries sobre datos",
-        "líneas": "~600",
-        "clases": [
+    "src/etl_data_analysis.py": ArchivoInfo(
+        descripcion="Análisis y queries sobre datos",
+        lineas="~600",
+        clases=(
             "FootballDataAnalyzer - Queries y estadísticas",
             "FootballDataExporter - Exporta a varios formatos",
             "FootballDataValidator - Valida calidad de datos"
-        ],
-        "métodos": [
+        ),
+        metodos=(
             "obtener_estadisticas_equipo() - Stats completas",
             "calcular_probabilidades_match() - Poisson",
             "obtener_enfrentamientos_directos() - H2H",
             "obtener_top_equipos() - Ranking por métrica"
-        ]
-    },
+        )
+    ),
     
     # ====== EJEMPLOS ======
-    "examples.py": {
-        "descripción": "Ejemplos de uso de todos los módulos",
-        "líneas": "~600",
-        "ejemplos": [
+    "examples.py": ArchivoInfo(
+        descripcion="Ejemplos de uso de todos los módulos",
+        lineas="~600",
+        ejemplos=(
             "1. Descargar datos",
             "2. Analizar equipo",
             "3. Historial directo (H2H)",
@@ -83,14 +124,14 @@ ARCHIVOS_CREADOS = {
             "6. Tendencias de mercado",
             "7. Exportar para ML",
             "8. Validar datos"
-        ],
-        "usar": "python examples.py descargar_datos"
-    },
+        ),
+        usar="python examples.py descargar_datos"
+    ),
     
     # ====== DOCUMENTACIÓN ======
-    "docs/ETL_FOOTBALL_DATA_GUIDE.md": {
-        "descripción": "Guía completa (6000+ palabras)",
-        "secciones": [
+    "docs/ETL_FOOTBALL_DATA_GUIDE.md": ArchivoInfo(
+        descripcion="Guía completa (6000+ palabras)",
+        secciones=(
             "Descripción general",
             "Características principales",
             "Instalación",
@@ -101,30 +142,30 @@ ARCHIVOS_CREADOS = {
             "Casos de uso",
             "Troubleshooting",
             "Ejemplos completos"
-        ]
-    },
+        )
+    ),
     
-    "ETL_QUICKSTART.md": {
-        "descripción": "Guía rápida (empezar en 5 minutos)",
-        "contiene": [
+    "ETL_QUICKSTART.md": ArchivoInfo(
+        descripcion="Guía rápida (empezar en 5 minutos)",
+        contiene=(
             "TL;DR",
             "Comandos principales",
             "Ejemplos Python",
             "Troubleshooting básico",
             "Checklist"
-        ]
-    },
+        )
+    ),
     
     # ====== MODIFICACIONES ======
-    "requirements.txt": {
-        "descripción": "Actualizado con todas las dependencias",
-        "agregadas": [
+    "requirements.txt": ArchivoInfo(
+        descripcion="Actualizado con todas las dependencias",
+        agregadas=(
             "sqlalchemy>=2.0.0",
             "psycopg2-binary>=2.9.0",
             "python-dotenv>=1.0.0",
             "pyarrow>=12.0.0"
-        ]
-    }
+        )
+    )
 }
 
 
@@ -201,55 +242,55 @@ DESPUÉS (Con ETL):
 
 CASOS_USO = {
     
-    "1. PREDICCIÓN": {
-        "descripción": "Usar datos históricos para predicción",
-        "pasos": [
+    "1. PREDICCIÓN": CasoUso(
+        descripcion="Usar datos históricos para predicción",
+        pasos=(
             "1. python etl_cli.py run",
             "2. from src.etl_data_analysis import FootballDataAnalyzer",
             "3. analyzer.calcular_probabilidades_match('team1', 'team2')",
             "4. Ver probabilidades en Streamlit"
-        ]
-    },
+        )
+    ),
     
-    "2. MACHINE LEARNING": {
-        "descripción": "Crear dataset para entrenar modelos",
-        "pasos": [
+    "2. MACHINE LEARNING": CasoUso(
+        descripcion="Crear dataset para entrenar modelos",
+        pasos=(
             "1. python etl_cli.py run",
             "2. python etl_cli.py export --output training_data.parquet",
             "3. Importar en scikit-learn/XGBoost/TensorFlow",
             "4. Entrenar modelo predictivo"
-        ]
-    },
+        )
+    ),
     
-    "3. ANÁLISIS EXPLORATORIO": {
-        "descripción": "Analizar equipos y tendencias",
-        "pasos": [
+    "3. ANÁLISIS EXPLORATORIO": CasoUso(
+        descripcion="Analizar equipos y tendencias",
+        pasos=(
             "1. python etl_cli.py run",
             "2. python examples.py analizar_equipo 'Liverpool'",
             "3. python examples.py top_equipos",
             "4. python examples.py h2h 'team1' 'team2'"
-        ]
-    },
+        )
+    ),
     
-    "4. DASHBOARD": {
-        "descripción": "Visualizar datos en Streamlit",
-        "pasos": [
+    "4. DASHBOARD": CasoUso(
+        descripcion="Visualizar datos en Streamlit",
+        pasos=(
             "1. python etl_cli.py run",
             "2. Importar FootballDataAnalyzer en app.py",
             "3. Mostrar gráficos y estadísticas",
             "4. streamlit run src/app.py"
-        ]
-    },
+        )
+    ),
     
-    "5. SISTEMA EN PRODUCCIÓN": {
-        "descripción": "Desplegar con datos actualizados",
-        "pasos": [
+    "5. SISTEMA EN PRODUCCIÓN": CasoUso(
+        descripcion="Desplegar con datos actualizados",
+        pasos=(
             "1. Usar PostgreSQL (no SQLite)",
             "2. Ejecutar ETL en schedule (cron)",
             "3. Validar datos automáticamente",
             "4. Entrenar modelos con nuevos datos"
-        ]
-    }
+        )
+    )
 }
 
 
@@ -257,24 +298,9 @@ CASOS_USO = {
 # ================
 
 LIGAS = {
-    "E0": {
-        "nombre": "Premier League",
-        "país": "Inglaterra",
-        "partidos/temporada": 380,
-        "temporadas": 10
-    },
-    "SP1": {
-        "nombre": "La Liga",
-        "país": "España",
-        "partidos/temporada": 380,
-        "temporadas": 10
-    },
-    "D1": {
-        "nombre": "Bundesliga",
-        "país": "Alemania",
-        "partidos/temporada": 306,
-        "temporadas": 10
-    }
+    "E0": LigaInfo(nombre="Premier League", pais="Inglaterra", partidos_temporada=380, temporadas=10),
+    "SP1": LigaInfo(nombre="La Liga", pais="España", partidos_temporada=380, temporadas=10),
+    "D1": LigaInfo(nombre="Bundesliga", pais="Alemania", partidos_temporada=306, temporadas=10),
 }
 
 # Total: ~10,500 partidos históricos
@@ -370,29 +396,27 @@ SOPORTE = {
 
 
 if __name__ == "__main__":
-    print("\n" + "="*70)
-    print("📋 ÍNDICE ETL FOOTBALL DATA")
-    print("="*70)
+    import sys
+
+    # Se arma todo el índice y se escribe de una sola vez
+    lineas = ["", "="*70, "📋 ÍNDICE ETL FOOTBALL DATA", "="*70]
     
-    print("\n📁 ARCHIVOS PRINCIPALES:")
+    lineas.append("\n📁 ARCHIVOS PRINCIPALES:")
     for archivo, info in ARCHIVOS_CREADOS.items():
-        print(f"\n  {archivo}")
-        print(f"    📝 {info.get('descripción', 'N/A')}")
-        print(f"    📊 {info.get('líneas', 'N/A')} líneas")
+        lineas.append(f"\n  {archivo}")
+        lineas.append(f"    📝 {info.descripcion}")
+        lineas.append(f"    📊 {info.lineas or 'N/A'} líneas")
     
-    print("\n\n📋 CASOS DE USO:")
+    lineas.append("\n\n📋 CASOS DE USO:")
     for caso, detalles in CASOS_USO.items():
-        print(f"\n  {caso}")
-        print(f"    {detalles['descripción']}")
+        lineas.append(f"\n  {caso}")
+        lineas.append(f"    {detalles.descripcion}")
     
-    print("\n\n✅ VENTAJAS:")
-    for v in VENTAJAS:
-        print(f"  {v}")
+    lineas.append("\n\n✅ VENTAJAS:")
+    lineas.extend(f"  {v}" for v in VENTAJAS)
     
-    print("\n\n⚠️ LIMITACIONES:")
-    for l in LIMITACIONES:
-        print(f"  {l}")
+    lineas.append("\n\n⚠️ LIMITACIONES:")
+    lineas.extend(f"  {l}" for l in LIMITACIONES)
     
-    print("\n" + "="*70)
-    print("✨ ETL listo para usar!")
-    print("="*70 + "\n")
+    lineas.extend(["\n" + "="*70, "✨ ETL listo para usar!", "="*70 + "\n"])
+    sys.stdout.write("\n".join(lineas) + "\n")
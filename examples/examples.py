@@ -20,13 +20,57 @@ from pathlib import Path
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-import pandas as pd
-from sqlalchemy import create_engine
+from functools import lru_cache
 from typing import Optional
 
-from etl_football_data import FootballETLPipeline
-from etl_data_analysis import FootballDataAnalyzer, FootballDataExporter
-from etl_config import DATABASE_CONFIG
+# pandas, SQLAlchemy y los módulos etl_* se importan dentro de cada ejemplo:
+# así `python examples.py` sin argumentos (o con un comando inválido) responde al instante.
+
+
+@lru_cache(maxsize=None)
+def _get_engine():
+    """Engine SQLite compartido por todos los ejemplos (se crea una sola vez)."""
+    from sqlalchemy import create_engine
+    
+    return create_engine('sqlite:///football_data.db')
+
+
+@lru_cache(maxsize=None)
+def _get_analyzer():
+    """FootballDataAnalyzer compartido sobre `_get_engine()`."""
+    from etl_data_analysis import FootballDataAnalyzer
+    
+    return FootballDataAnalyzer(_get_engine())
+
+
+# Índices para los filtros de los ejemplos (estadísticas por equipo, H2H, top, tendencias).
+# idx_teams (home_team, away_team) también sirve para filtrar solo por home_team.
+INDICES_MATCHES = (
+    "CREATE INDEX IF NOT EXISTS idx_date ON matches(date)",
+    "CREATE INDEX IF NOT EXISTS idx_teams ON matches(home_team, away_team)",
+    "CREATE INDEX IF NOT EXISTS idx_away_team ON matches(away_team)",
+    "CREATE INDEX IF NOT EXISTS idx_ftr ON matches(ftr)",
+)
+
+
+def _fmt_table(df, headers) -> str:
+    """
+    Formatea un DataFrame chico como tabla de ancho fijo (sin índice).
+    Los anchos salen de una sola pasada por las filas, sin el formatter de pandas.
+    """
+    filas = [[str(v) for v in fila] for fila in df.itertuples(index=False)]
+    anchos = [max([len(h)] + [len(fila[i]) for fila in filas]) for i, h in enumerate(headers)]
+    lineas = [headers] + filas
+    return '\n'.join('  '.join(f'{v:<{w}}' for v, w in zip(fila, anchos)).rstrip() for fila in lineas)
+
+
+def preparar_indices():
+    """Crea (si faltan) los índices de `matches` y actualiza las estadísticas del planner."""
+    with _get_engine().begin() as conn:
+        for sentencia in INDICES_MATCHES:
+            conn.exec_driver_sql(sentencia)
+        conn.exec_driver_sql("ANALYZE")
+    print("✓ Índices de 'matches' listos")
 
 
 def ejemplo_1_descargar_datos():
@@ -37,6 +81,8 @@ def ejemplo_1_descargar_datos():
     print("📥 EJEMPLO 1: Descargar Datos Históricos")
     print("="*80 + "\n")
     
+    from etl_football_data import FootballETLPipeline
+    
     # Crear pipeline ETL
     pipeline = FootballETLPipeline(db_type='sqlite')
     
@@ -50,6 +96,7 @@ def ejemplo_1_descargar_datos():
     )
     
     if exitoso:
+        preparar_indices()
         print("\n✅ Datos descargados y cargados exitosamente")
     else:
         print("\n❌ Error en la descarga")
@@ -65,8 +112,7 @@ def ejemplo_2_analizar_equipo(nombre_equipo: str = "Liverpool"):
     print(f"🔍 EJEMPLO 2: Análisis de {nombre_equipo}")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
-    analyzer = FootballDataAnalyzer(engine)
+    analyzer = _get_analyzer()
     
     # Obtener estadísticas
     stats = analyzer.obtener_estadisticas_equipo(nombre_equipo)
@@ -102,8 +148,7 @@ def ejemplo_3_historial_directo(equipo1: str = "Liverpool", equipo2: str = "Manc
     print(f"🥊 EJEMPLO 3: Historial Directo {equipo1} vs {equipo2}")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
-    analyzer = FootballDataAnalyzer(engine)
+    analyzer = _get_analyzer()
     
     # Obtener últimos 10 enfrentamientos
     h2h = analyzer.obtener_enfrentamientos_directos(equipo1, equipo2, limit=10)
@@ -115,20 +160,18 @@ def ejemplo_3_historial_directo(equipo1: str = "Liverpool", equipo2: str = "Manc
     print(f"Últimos {len(h2h)} enfrentamientos:\n")
     
     # Mostrar tabla
-    h2h_display = h2h[['date', 'home_team', 'away_team', 'fthg', 'ftag', 'ftr']].copy()
-    h2h_display.columns = ['Fecha', 'Local', 'Visitante', 'GF', 'GC', 'Resultado']
+    h2h_display = h2h[['date', 'home_team', 'away_team', 'fthg', 'ftag', 'ftr']]
     
-    print(h2h_display.to_string(index=False))
+    print(_fmt_table(h2h_display, ['Fecha', 'Local', 'Visitante', 'GF', 'GC', 'Resultado']))
     
     # Estadísticas H2H
     print("\n📊 Estadísticas:")
-    if equipo1 in h2h['home_team'].values:
-        local_wins = len(h2h[(h2h['home_team'] == equipo1) & (h2h['ftr'] == '1')])
-        print(f"{equipo1} gana en casa: {local_wins}")
+    resumen = analyzer.obtener_h2h_resumen(equipo1, equipo2, limit=10)
+    if resumen['e1_local']:
+        print(f"{equipo1} gana en casa: {resumen['e1_gana_local']}")
     
-    if equipo2 in h2h['home_team'].values:
-        away_wins = len(h2h[(h2h['home_team'] == equipo2) & (h2h['ftr'] == '1')])
-        print(f"{equipo2} gana en casa: {away_wins}")
+    if resumen['e2_local']:
+        print(f"{equipo2} gana en casa: {resumen['e2_gana_local']}")
 
 
 def ejemplo_4_predecir_partido(home_team: str = "Liverpool", away_team: str = "Manchester City"):
@@ -139,26 +182,29 @@ def ejemplo_4_predecir_partido(home_team: str = "Liverpool", away_team: str = "M
     print(f"🔮 EJEMPLO 4: Predicción {home_team} vs {away_team}")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
-    analyzer = FootballDataAnalyzer(engine)
+    analyzer = _get_analyzer()
     
-    # Calcular probabilidades
-    probs = analyzer.calcular_probabilidades_match(home_team, away_team)
+    # Calcular probabilidades y goles esperados (API batch con un solo par)
+    pares = [(home_team, away_team)]
+    probs = analyzer.calcular_probabilidades_batch(pares)
+    goles = analyzer.goles_esperados_batch(pares)
+    p_local, p_empate, p_visitante = probs[0]
     
     print(f"Probabilidades estimadas:\n")
-    print(f"  🏆 {home_team} gana: {probs['local']:.1%}")
-    print(f"  🤝 Empate: {probs['empate']:.1%}")
-    print(f"  💥 {away_team} gana: {probs['visitante']:.1%}")
+    print(f"  🏆 {home_team} gana: {p_local:.1%}")
+    print(f"  🤝 Empate: {p_empate:.1%}")
+    print(f"  💥 {away_team} gana: {p_visitante:.1%}")
     
     print(f"\nGoles esperados:")
-    print(f"  {home_team}: {probs['goles_esp_local']:.2f}")
-    print(f"  {away_team}: {probs['goles_esp_visitante']:.2f}")
+    print(f"  {home_team}: {goles[0, 0]:.2f}")
+    print(f"  {away_team}: {goles[0, 1]:.2f}")
     
-    # Cuota justa
+    # Cuota justa (las tres de una vez)
+    cuota_1, cuota_x, cuota_2 = 1 / probs[0]
     print(f"\nCuotas justas:")
-    print(f"  1: {1/probs['local']:.2f}")
-    print(f"  X: {1/probs['empate']:.2f}")
-    print(f"  2: {1/probs['visitante']:.2f}")
+    print(f"  1: {cuota_1:.2f}")
+    print(f"  X: {cuota_x:.2f}")
+    print(f"  2: {cuota_2:.2f}")
 
 
 def ejemplo_5_top_equipos():
@@ -169,26 +215,22 @@ def ejemplo_5_top_equipos():
     print("🏆 EJEMPLO 5: Top Equipos por Métrica")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
-    analyzer = FootballDataAnalyzer(engine)
+    analyzer = _get_analyzer()
     
     # Top 10 por goles
     print("⚽ Top 10 equipos por goles promedio:\n")
     top_goles = analyzer.obtener_top_equipos('goles_promedio', limit=10)
-    top_goles.columns = ['Equipo', 'Goles/Partido']
-    print(top_goles.to_string(index=False))
+    print(_fmt_table(top_goles, ['Equipo', 'Goles/Partido']))
     
     # Top 10 por victorias
     print("\n\n🏅 Top 10 equipos por victorias:\n")
     top_victorias = analyzer.obtener_top_equipos('victorias', limit=10)
-    top_victorias.columns = ['Equipo', 'Victorias']
-    print(top_victorias.to_string(index=False))
+    print(_fmt_table(top_victorias, ['Equipo', 'Victorias']))
     
     # Top 10 por defensa
     print("\n\n🛡️  Top 10 equipos por mejor defensa (menos goles):\n")
     top_defensa = analyzer.obtener_top_equipos('defensa', limit=10)
-    top_defensa.columns = ['Equipo', 'Goles Recibidos']
-    print(top_defensa.to_string(index=False))
+    print(_fmt_table(top_defensa, ['Equipo', 'Goles Recibidos']))
 
 
 def ejemplo_6_tendencias():
@@ -199,8 +241,7 @@ def ejemplo_6_tendencias():
     print("📈 EJEMPLO 6: Tendencias de Mercado")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
-    analyzer = FootballDataAnalyzer(engine)
+    analyzer = _get_analyzer()
     
     # Últimos 30 días
     tendencias = analyzer.obtener_tendencias_mercado(dias=30)
@@ -216,21 +257,33 @@ def ejemplo_6_tendencias():
     print(f"  % Under 2.5: {100 - tendencias['over_25_pct']:.1f}%")
 
 
-def ejemplo_7_exportar_entrenamiento():
+# Filas por chunk de lectura y por row group del Parquet de entrenamiento
+FILAS_POR_ROW_GROUP = 100_000
+
+
+def ejemplo_7_exportar_entrenamiento(formatos_texto: bool = False):
     """
     Ejemplo 7: Exportar datos para entrenar modelo ML
+    
+    Por defecto exporta solo Parquet (zstd, fechas como timestamp); con
+    `formatos_texto=True` también genera CSV y Excel.
     """
     print("\n" + "="*80)
     print("📦 EJEMPLO 7: Exportar Datos para Entrenamiento")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
+    engine = _get_engine()
+    
+    import pandas as pd
+    from etl_data_analysis import FootballDataExporter
     
     print("Extrayendo datos para entrenamiento...\n")
     
+    exporter = FootballDataExporter()
+    
     with engine.connect() as conn:
-        # Seleccionar columnas relevantes para ML
-        df = pd.read_sql("""
+        # Seleccionar columnas relevantes para ML (en chunks con tipos Arrow)
+        chunks = pd.read_sql("""
             SELECT 
                 date,
                 home_team,
@@ -256,26 +309,25 @@ def ejemplo_7_exportar_entrenamiento():
             FROM matches
             WHERE temporada IN ('2425', '2324', '2223', '2122')
             ORDER BY date DESC
-        """, conn)
-    
-    print(f"✓ Extraídos {len(df)} registros")
-    
-    # Exportar en múltiples formatos
-    exporter = FootballDataExporter()
-    
-    # CSV
-    exporter.exportar_csv(df, 'datos_entrenamiento.csv')
-    
-    # Excel
-    exporter.exportar_excel(df, 'datos_entrenamiento.xlsx')
-    
-    # Parquet (comprimido y eficiente)
-    exporter.exportar_parquet(df, 'datos_entrenamiento.parquet')
+        """, conn, chunksize=FILAS_POR_ROW_GROUP, dtype_backend='pyarrow', parse_dates=['date'])
+        
+        # Exportar a medida que llegan los chunks (Parquet siempre; CSV/Excel solo si se piden)
+        total = exporter.exportar_por_chunks(
+            chunks,
+            archivo_parquet='datos_entrenamiento.parquet',
+            archivo_csv='datos_entrenamiento.csv' if formatos_texto else None,
+            archivo_excel='datos_entrenamiento.xlsx' if formatos_texto else None,
+            row_group_size=FILAS_POR_ROW_GROUP,
+            compression_level=5
+        )
+    
+    print(f"✓ Extraídos {total} registros")
     
     print("\n✅ Exportación completada:")
-    print("  📄 datos_entrenamiento.csv")
-    print("  📊 datos_entrenamiento.xlsx")
     print("  📦 datos_entrenamiento.parquet")
+    if formatos_texto:
+        print("  📄 datos_entrenamiento.csv")
+        print("  📊 datos_entrenamiento.xlsx")
 
 
 def ejemplo_8_validar_datos():
@@ -286,48 +338,44 @@ def ejemplo_8_validar_datos():
     print("✅ EJEMPLO 8: Validación de Integridad")
     print("="*80 + "\n")
     
-    engine = create_engine('sqlite:///football_data.db')
+    from sqlalchemy import text
+    
+    engine = _get_engine()
     
     with engine.connect() as conn:
-        # Contar registros
-        total = pd.read_sql("SELECT COUNT(*) as total FROM matches", conn)
-        print(f"Total de registros: {total['total'].values[0]:,}")
-        
-        # Verificar NULL
-        nulls = pd.read_sql("""
+        # Conteos, NULL y FTR inválidos en una sola pasada sobre matches
+        resumen = conn.execute(text("""
             SELECT 
+                COUNT(*) as total,
                 COUNT(CASE WHEN home_team IS NULL THEN 1 END) as null_home,
                 COUNT(CASE WHEN away_team IS NULL THEN 1 END) as null_away,
                 COUNT(CASE WHEN ftr IS NULL THEN 1 END) as null_ftr,
-                COUNT(CASE WHEN b365h IS NULL THEN 1 END) as null_b365
+                COUNT(CASE WHEN b365h IS NULL THEN 1 END) as null_b365,
+                COUNT(CASE WHEN ftr NOT IN ('1', 'D', '2') THEN 1 END) as invalidos
             FROM matches
-        """, conn)
+        """)).one()
+        
+        print(f"Total de registros: {resumen.total:,}")
         
         print(f"\nValores NULL:")
-        print(f"  HomeTeam: {nulls['null_home'].values[0]}")
-        print(f"  AwayTeam: {nulls['null_away'].values[0]}")
-        print(f"  FTR: {nulls['null_ftr'].values[0]}")
-        print(f"  Cuotas B365: {nulls['null_b365'].values[0]}")
+        print(f"  HomeTeam: {resumen.null_home}")
+        print(f"  AwayTeam: {resumen.null_away}")
+        print(f"  FTR: {resumen.null_ftr}")
+        print(f"  Cuotas B365: {resumen.null_b365}")
         
         # Duplicados
-        dupes = pd.read_sql("""
+        dupes = conn.execute(text("""
             SELECT COUNT(*) as dupes FROM (
                 SELECT date, home_team, away_team, fthg, ftag
                 FROM matches
                 GROUP BY date, home_team, away_team, fthg, ftag
                 HAVING COUNT(*) > 1
             )
-        """, conn)
-        
-        print(f"\nDuplicados: {dupes['dupes'].values[0]}")
+        """)).scalar_one()
         
-        # FTR inválidos
-        ftr_bad = pd.read_sql("""
-            SELECT COUNT(*) as invalidos FROM matches
-            WHERE ftr NOT IN ('1', 'D', '2')
-        """, conn)
+        print(f"\nDuplicados: {dupes}")
         
-        print(f"FTR inválidos: {ftr_bad['invalidos'].values[0]}")
+        print(f"FTR inválidos: {resumen.invalidos}")
         
         print("\n✅ Validación completada")
 
@@ -344,8 +392,9 @@ def main():
         print("  predecir [equipo1] [equipo2] - Predecir probabilidades")
         print("  top_equipos                  - Listar top equipos")
         print("  tendencias                   - Análisis de tendencias")
-        print("  exportar                     - Exportar datos para ML")
+        print("  exportar [--texto]           - Exportar datos para ML (Parquet; --texto suma CSV/Excel)")
         print("  validar                      - Validar integridad de datos")
+        print("  indices                      - Crear índices de la BD")
         print("  todos                        - Ejecutar todos los ejemplos")
         sys.exit(1)
     
@@ -376,11 +425,14 @@ def main():
             ejemplo_6_tendencias()
         
         elif comando == "exportar":
-            ejemplo_7_exportar_entrenamiento()
+            ejemplo_7_exportar_entrenamiento(formatos_texto='--texto' in sys.argv[2:])
         
         elif comando == "validar":
             ejemplo_8_validar_datos()
         
+        elif comando == "indices":
+            preparar_indices()
+        
         elif comando == "todos":
             print("Ejecutando todos los ejemplos...")
             ejemplo_1_descargar_datos()
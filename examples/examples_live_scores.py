@@ -14,10 +14,14 @@ Nota: Requiere FOOTBALL_DATA_API_KEY configurada como variable de entorno
 import sys
 import os
 import time
-import json
+import asyncio
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict
+from itertools import islice
+from typing import Iterator, List, Dict
+
+import numpy as np
 
 # Configurar path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
@@ -56,6 +60,40 @@ def get_api_key() -> str:
     return api_key
 
 
+def ticks(interval: float) -> Iterator[int]:
+    """
+    Genera 0, 1, 2, ... al cumplirse cada `interval` segundos, con deadlines
+    sobre time.monotonic(): el tiempo que tarda el consumidor no se acumula.
+    """
+    start = time.monotonic()
+    i = 0
+    while True:
+        remaining = start + (i + 1) * interval - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        yield i
+        i += 1
+
+
+def poll_competitions(manager: LiveScoresManager, competitions: List[str]) -> Dict[str, Exception]:
+    """
+    Hace un poll de varias competiciones en paralelo (cada poll es I/O de red).
+    El rate limiter del cliente es thread-safe, así que los límites se respetan.
+    Retorna {competición: excepción} de los polls que fallaron.
+    """
+    errores = {}
+    if not competitions:
+        return errores
+    with ThreadPoolExecutor(max_workers=len(competitions)) as executor:
+        futures = {executor.submit(manager.poll_competition, comp): comp for comp in competitions}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errores[futures[future]] = e
+    return errores
+
+
 # ========== EJEMPLO 1: VALIDACIÓN Y ESTADO INICIAL ==========
 
 def example_1_validation_and_status():
@@ -121,20 +159,18 @@ def example_3_current_matches_status():
     print("Obteniendo partidos actuales...\n")
     
     # Hacer un poll único para cada competición
-    for comp in ['PL', 'CL', 'PD']:
-        try:
-            manager.poll_competition(comp)
-        except Exception as e:
-            print(f"⚠️  No se pudo obtener {comp}: {e}")
+    for comp, e in poll_competitions(manager, ['PL', 'CL', 'PD']).items():
+        print(f"⚠️  No se pudo obtener {comp}: {e}")
     
     # Mostrar resultados
     print_section("Partidos Actuales")
     
     live = manager.get_live_matches()
-    scheduled = [m for m in manager.match_snapshots.values() 
-                 if m.status == 'SCHEDULED']
-    finished = [m for m in manager.match_snapshots.values() 
-                if m.status == 'FINISHED']
+    # Filtrar por estado sobre la columna de estados; solo se materializan
+    # los partidos que se van a mostrar
+    snapshots = manager.match_snapshots
+    scheduled = snapshots.match_ids(status='SCHEDULED')
+    finished = snapshots.match_ids(status='FINISHED')
     
     print(f"Total de partidos: {len(manager.match_snapshots)}")
     print(f"  En vivo: {len(live)}")
@@ -152,14 +188,14 @@ def example_3_current_matches_status():
     
     if scheduled:
         print("\n📅 PRÓXIMOS PARTIDOS (Primeros 5):")
-        for match in scheduled[:5]:
+        for match in (snapshots[i].to_dict() for i in scheduled[:5]):
             print(f"  [{match['competition']}] "
                   f"{match['home_team']:<20} vs "
                   f"{match['away_team']:<20}")
     
     if finished:
         print("\n✅ RESULTADOS FINALES (Últimos 5):")
-        for match in finished[-5:]:
+        for match in (snapshots[i].to_dict() for i in finished[-5:]):
             print(f"  [{match['competition']}] "
                   f"{match['home_team']:<20} "
                   f"{match['home_score']}-{match['away_score']} "
@@ -209,10 +245,9 @@ def example_4_monitoring_with_callbacks():
     manager.start_polling(interval=15)
     
     try:
-        # Monitorear 60 segundos
-        for i in range(4):
+        # Monitorear 60 segundos (4 ticks de 15s con cadencia fija)
+        for i in islice(ticks(15), 4):
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Poll #{i+1}")
-            time.sleep(15)
     except KeyboardInterrupt:
         print("\n\nInterrumpido por usuario")
     finally:
@@ -232,11 +267,8 @@ def example_5_detailed_statistics():
     
     # Hacer un poll
     print("Obteniendo datos de competiciones principales...\n")
-    for comp in manager.competitions[:5]:  # Primeras 5
-        try:
-            manager.poll_competition(comp)
-        except Exception as e:
-            print(f"⚠️  {comp}: {e}")
+    for comp, e in poll_competitions(manager, manager.competitions[:5]).items():  # Primeras 5
+        print(f"⚠️  {comp}: {e}")
     
     # Estadísticas generales
     print_section("Estadísticas Generales")
@@ -271,26 +303,20 @@ def example_6_export_data():
     print("Obteniendo datos actuales...\n")
     
     # Hacer polls
-    for comp in manager.competitions[:3]:
-        try:
-            manager.poll_competition(comp)
-        except Exception as e:
-            pass
+    poll_competitions(manager, manager.competitions[:3])
     
     # Exportar
     output_file = 'live_scores_export.json'
     print(f"Exportando a {output_file}...\n")
     
-    manager.export_to_json(output_file)
-    
-    # Mostrar contenido
-    with open(output_file, 'r') as f:
-        data = json.load(f)
+    # Mostrar contenido (el mismo dict que se escribió, sin releer el archivo)
+    data = manager.export_to_json(output_file)
     
     print_section("Datos Exportados")
     print(f"Timestamp: {data['timestamp']}")
     print(f"Partidos en vivo: {len(data['live_matches'])}")
-    print(f"Partidos totales: {len(data.get('all_matches', []))}\n")
+    total = sum(c['total_matches'] for c in data['competitions'].values())
+    print(f"Partidos totales: {total}\n")
     
     # Muestra de partidos en vivo
     if data['live_matches']:
@@ -314,25 +340,20 @@ def example_7_data_analysis():
     
     print("Compilando datos de múltiples competiciones...\n")
     
-    # Recopilar datos
-    total_goals = 0
-    matches_by_status = {'LIVE': 0, 'SCHEDULED': 0, 'FINISHED': 0, 'PAUSED': 0}
-    
-    for comp in manager.competitions[:6]:
-        try:
-            manager.poll_competition(comp)
-        except Exception as e:
-            pass
+    asyncio.run(manager.apoll_competitions(manager.competitions[:6]))
     
     # Analizar
     print_section("Análisis de Datos Compilados")
     
-    for match in manager.match_snapshots.values():
-        # Contar goles
-        total_goals += match.home_score + match.away_score
-        # Contar por estado
-        if match.status in matches_by_status:
-            matches_by_status[match.status] += 1
+    # Agregados vectorizados sobre las columnas del almacén de snapshots
+    snapshots = manager.match_snapshots
+    total_goals = snapshots.goles_totales()
+    goles_equipo = snapshots.goles_por_equipo_id()
+    por_estado = snapshots.conteo_por_estado()
+    matches_by_status = {
+        status: por_estado.get(status, 0)
+        for status in ('LIVE', 'SCHEDULED', 'FINISHED', 'PAUSED')
+    }
     
     print(f"Total de partidos analizados: {len(manager.match_snapshots)}")
     print(f"Total de goles: {total_goals}")
@@ -347,15 +368,11 @@ def example_7_data_analysis():
     # Top equipos goleadores
     print_section("Top 10 Equipos Goleadores")
     
-    teams_goals = {}
-    for match in manager.match_snapshots.values():
-        teams_goals[match.home_team] = teams_goals.get(match.home_team, 0) + match.home_score
-        teams_goals[match.away_team] = teams_goals.get(match.away_team, 0) + match.away_score
-    
-    sorted_teams = sorted(teams_goals.items(), key=lambda x: x[1], reverse=True)
-    
-    for i, (team, goals) in enumerate(sorted_teams[:10], 1):
-        print(f"  {i:2d}. {team:<25} {goals:3d} goles")
+    # Ranking sobre el array indexado por id; solo se resuelven 10 nombres
+    nombres = snapshots.nombres_equipos
+    top_ids = np.argsort(-goles_equipo, kind='stable')[:10]
+    for i, team_id in enumerate(top_ids, 1):
+        print(f"  {i:2d}. {str(nombres[team_id]):<25} {int(goles_equipo[team_id]):3d} goles")
 
 
 # ========== EJEMPLO 8: MANEJO DE ERRORES ==========
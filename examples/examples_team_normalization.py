@@ -10,12 +10,34 @@ Requiere:
 - src/etl_team_integration.py
 - src/etl_football_data.py (ETL existente)
 - src/api_football_enricher.py (API-Football)
+
+Uso:
+    python examples_team_normalization.py          # todos los ejemplos
+    python examples_team_normalization.py 4 8      # solo los indicados
 """
 
+import sys
+import tempfile
+import traceback
+from functools import lru_cache
+from pathlib import Path
+
 from src.team_normalization import TeamNormalizer
 from src.etl_team_integration import TeamETLIntegrator
 
 
+@lru_cache(maxsize=None)
+def _get_normalizer() -> TeamNormalizer:
+    """Normalizador compartido por todos los ejemplos (se inicializa una vez)."""
+    return TeamNormalizer()
+
+
+@lru_cache(maxsize=None)
+def _get_integrator() -> TeamETLIntegrator:
+    """Integrador compartido, sobre el mismo normalizador que los ejemplos."""
+    return TeamETLIntegrator(normalizer=_get_normalizer())
+
+
 # ============================================================================
 # EJEMPLO 1: Setup Inicial - Crear Tabla Maestra
 # ============================================================================
@@ -29,7 +51,7 @@ def ejemplo_1_setup_inicial():
     print("EJEMPLO 1: Setup Inicial - Tabla Maestra")
     print("="*70 + "\n")
     
-    normalizer = TeamNormalizer()
+    normalizer = _get_normalizer()
     
     # Datos: (nombre, país, liga)
     teams = [
@@ -61,9 +83,13 @@ def ejemplo_1_setup_inicial():
     ]
     
     print("Agregando equipos a tabla maestra...\n")
-    for name, country, league in teams:
-        uuid = normalizer.add_team(name, country, league)
-        print(f"  ✓ {name:30} {country:15} {league:15}")
+    # Una sola transacción para los equipos que aún no están en la maestra
+    nuevos = [team for team in teams if normalizer.find_team(team[0]) is None]
+    if nuevos:
+        normalizer.add_teams_bulk(nuevos)
+    print("\n".join(
+        f"  ✓ {name:30} {country:15} {league:15}" for name, country, league in teams
+    ))
     
     # Estadísticas
     stats = normalizer.get_stats()
@@ -82,7 +108,7 @@ def ejemplo_2_aliases():
     print("EJEMPLO 2: Agregar Aliases (Apodos)")
     print("="*70 + "\n")
     
-    normalizer = TeamNormalizer()
+    normalizer = _get_normalizer()
     
     # Obtener UUID de Manchester United
     uuid_mu, _ = normalizer.normalize_team("Manchester United")
@@ -91,27 +117,37 @@ def ejemplo_2_aliases():
     
     print("Agregando aliases...\n")
     
-    normalizer.add_alias(uuid_mu, "Man United", priority=10)
-    normalizer.add_alias(uuid_mu, "Manchester Utd", priority=9)
-    normalizer.add_alias(uuid_mu, "MUFC", priority=8)
-    print("  ✓ Manchester United: Man United, Manchester Utd, MUFC")
+    aliases = [
+        (uuid_mu, "Man United", 10),
+        (uuid_mu, "Manchester Utd", 9),
+        (uuid_mu, "MUFC", 8),
+        (uuid_rm, "Real Madrid", 10),
+        (uuid_rm, "RM", 9),
+        (uuid_fcb, "Barcelona", 10),
+        (uuid_fcb, "Barça", 9),
+        (uuid_fcb, "FCB", 8),
+    ]
     
-    normalizer.add_alias(uuid_rm, "Real Madrid", priority=10)
-    normalizer.add_alias(uuid_rm, "RM", priority=9)
+    # Los aliases que faltan, en una sola transacción
+    nuevos = [
+        (team_uuid, alias, priority) for team_uuid, alias, priority in aliases
+        if normalizer.find_team(alias) != team_uuid
+    ]
+    if nuevos:
+        normalizer.add_aliases_bulk(nuevos)
+    print("  ✓ Manchester United: Man United, Manchester Utd, MUFC")
     print("  ✓ Real Madrid CF: Real Madrid, RM")
-    
-    normalizer.add_alias(uuid_fcb, "Barcelona", priority=10)
-    normalizer.add_alias(uuid_fcb, "Barça", priority=9)
-    normalizer.add_alias(uuid_fcb, "FCB", priority=8)
     print("  ✓ FC Barcelona: Barcelona, Barça, FCB")
     
     # Probar búsquedas
     print("\nProbando búsquedas con aliases:")
     names = ["Man United", "Real Madrid", "Barcelona", "Barça"]
+    lines = []
     for name in names:
         uuid, sim = normalizer.normalize_team(name)
         status = "✓" if uuid else "✗"
-        print(f"  {status} '{name}' → UUID encontrado (similitud: {sim:.0f}%)")
+        lines.append(f"  {status} '{name}' → UUID encontrado (similitud: {sim:.0f}%)")
+    print("\n".join(lines))
 
 
 # ============================================================================
@@ -150,7 +186,7 @@ def ejemplo_3_apifootball():
         },
     ]
     
-    integrator = TeamETLIntegrator()
+    integrator = _get_integrator()
     
     print("Procesando datos de API-Football...\n")
     processed, new = integrator.process_apifootball_teams(apifootball_teams)
@@ -179,7 +215,7 @@ def ejemplo_4_reconciliacion_multisource():
     print("EJEMPLO 4: Reconciliación de Múltiples Fuentes")
     print("="*70 + "\n")
     
-    integrator = TeamETLIntegrator()
+    integrator = _get_integrator()
     
     # Simular datos de Football-Data.org API
     print("1. Procesando Football-Data.org API...\n")
@@ -248,8 +284,14 @@ def ejemplo_5_resolver_conflictos():
     print("EJEMPLO 5: Resolver Conflictos")
     print("="*70 + "\n")
     
-    integrator = TeamETLIntegrator()
-    
+    # BD temporal: los equipos duplicados a propósito no deben quedar en la
+    # tabla maestra compartida por el resto de los ejemplos
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _mostrar_conflictos(TeamETLIntegrator(db_path=str(Path(tmp_dir) / "conflictos.db")))
+
+
+def _mostrar_conflictos(integrator: TeamETLIntegrator):
+    """Crea un conflicto de mapeo en `integrator` y muestra el reporte."""
     # Simular conflicto: mismo external_id mapeado a 2 UUIDs
     normalizer = integrator.normalizer
     
@@ -300,7 +342,7 @@ def ejemplo_6_exportar():
     print("EJEMPLO 6: Exportar Datos Normalizados")
     print("="*70 + "\n")
     
-    integrator = TeamETLIntegrator()
+    integrator = _get_integrator()
     
     # Exportar a CSV
     print("1. Exportando a CSV...")
@@ -333,7 +375,7 @@ def ejemplo_7_validacion():
     print("EJEMPLO 7: Validación de Integridad")
     print("="*70 + "\n")
     
-    integrator = TeamETLIntegrator()
+    integrator = _get_integrator()
     
     print("Ejecutando validación...\n")
     validation = integrator.validate_integrity()
@@ -363,17 +405,23 @@ def ejemplo_8_fuzzy_search():
     print("EJEMPLO 8: Búsquedas Fuzzy en Tiempo Real")
     print("="*70 + "\n")
     
-    normalizer = TeamNormalizer()
+    normalizer = _get_normalizer()
     
-    # Agregar algunos equipos primero
-    normalizer.add_team("Manchester United FC", "England", "Premier League")
-    normalizer.add_team("Liverpool FC", "England", "Premier League")
-    normalizer.add_team("Real Madrid CF", "Spain", "La Liga")
-    normalizer.add_team("FC Barcelona", "Spain", "La Liga")
+    # Agregar algunos equipos primero (los que falten en la maestra)
+    equipos = [
+        ("Manchester United FC", "England", "Premier League"),
+        ("Liverpool FC", "England", "Premier League"),
+        ("Real Madrid CF", "Spain", "La Liga"),
+        ("FC Barcelona", "Spain", "La Liga"),
+    ]
+    nuevos = [team for team in equipos if normalizer.find_team(team[0]) is None]
+    if nuevos:
+        normalizer.add_teams_bulk(nuevos)
     
     # Agregar aliases
-    uuid_mu, _ = normalizer.normalize_team("Manchester United FC")
-    normalizer.add_alias(uuid_mu, "Man United", priority=10)
+    if normalizer.find_team("Man United") is None:
+        uuid_mu, _ = normalizer.normalize_team("Manchester United FC")
+        normalizer.add_alias(uuid_mu, "Man United", priority=10)
     
     print("Probando búsquedas fuzzy:\n")
     
@@ -388,18 +436,19 @@ def ejemplo_8_fuzzy_search():
         ("Liverpool FC", "Otro equipo"),
     ]
     
-    for name, description in test_cases:
-        uuid, similarity = normalizer.normalize_team(name)
-        
+    # Las líneas se juntan y se imprimen de una vez al final
+    lines = []
+    resultados = normalizer.normalize_many([name for name, _ in test_cases])
+    for (name, description), (uuid, similarity, official_name) in zip(test_cases, resultados):
         if uuid:
-            team = normalizer.get_team(uuid)
             status = "✓"
-            print(f"{status} '{name:25}' ({description:20}) "
-                  f"→ {team['official_name']:25} ({similarity:.0f}%)")
+            lines.append(f"{status} '{name:25}' ({description:20}) "
+                         f"→ {official_name:25} ({similarity:.0f}%)")
         else:
             status = "✗"
-            print(f"{status} '{name:25}' ({description:20}) "
-                  f"→ NO ENCONTRADO")
+            lines.append(f"{status} '{name:25}' ({description:20}) "
+                         f"→ NO ENCONTRADO")
+    print("\n".join(lines))
 
 
 # ============================================================================
@@ -426,14 +475,21 @@ if __name__ == "__main__":
     for num, desc, _ in ejemplos:
         print(f"  {num}. {desc}")
     
-    print("\nEjecutando todos los ejemplos...\n")
+    # Los ejemplos comparten BD y normalizador (y algunos dependen de los
+    # equipos creados por los anteriores), así que se ejecutan en orden;
+    # para acortar la demo se pueden elegir por número en la línea de comandos
+    seleccion = set(sys.argv[1:])
+    if seleccion:
+        ejemplos = [e for e in ejemplos if e[0] in seleccion]
+        print(f"\nEjecutando ejemplos: {', '.join(num for num, _, _ in ejemplos)}\n")
+    else:
+        print("\nEjecutando todos los ejemplos...\n")
     
     for num, desc, func in ejemplos:
         try:
             func()
         except Exception as e:
             print(f"\n✗ Error en ejemplo {num}: {e}")
-            import traceback
             traceback.print_exc()
     
     print("\n" + "="*70)
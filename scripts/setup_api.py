@@ -8,25 +8,22 @@ Fecha: 30 de Enero de 2026
 """
 
 import os
+import re
 import sys
 from pathlib import Path
 
+# Línea KEY=VALUE (ignora vacías y comentarios); clave y valor sin espacios alrededor
+_ENV_RE = re.compile(r'(?m)^[^\S\n]*([^#=\s][^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$')
+
+
 # Cargar variables desde .env manualmente
 def load_env_file(env_path):
     """Carga variables de ambiente desde archivo .env"""
     if not env_path.exists():
         return False
     
-    with open(env_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            # Ignorar comentarios y líneas vacías
-            if not line or line.startswith('#'):
-                continue
-            # Parsear KEY=VALUE
-            if '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key.strip()] = value.strip()
+    # Una sola pasada del regex sobre el archivo y un solo update del entorno
+    os.environ.update(dict(_ENV_RE.findall(env_path.read_text())))
     
     return True
 
@@ -8,9 +8,12 @@ Asegura que todas las dependencias estén disponibles.
 
 Uso:
     python setup_etl.py
+    python setup_etl.py --deep   # importa realmente los módulos ETL
 """
 
+import os
 import sys
+import importlib.util
 import subprocess
 from pathlib import Path
 
@@ -34,17 +37,36 @@ def check_required_packages():
         'streamlit'
     ]
     
-    missing = []
+    # find_spec localiza el paquete sin ejecutar su __init__.py
+    missing = [p for p in required if importlib.util.find_spec(p) is None]
     
     for package in required:
-        try:
-            __import__(package)
-            print(f"✅ {package}")
-        except ImportError:
-            print(f"❌ {package}")
-            missing.append(package)
+        print(f"{'✅' if package not in missing else '❌'} {package}")
     
-    return len(missing) == 0, missing
+    return not missing, missing
+
+
+def _index_tree(root, subdirs=()):
+    """
+    Indexa root y los subdirectorios indicados con un os.scandir por carpeta.
+    
+    Devuelve {ruta_relativa: tamaño} para archivos y {'dir/': None} para
+    directorios, de modo que las comprobaciones posteriores son búsquedas
+    en memoria en lugar de un stat() por ruta.
+    """
+    idx = {}
+    for rel in ('', *subdirs):
+        try:
+            with os.scandir(os.path.join(root, rel)) as it:
+                for entry in it:
+                    name = f"{rel}/{entry.name}" if rel else entry.name
+                    if entry.is_dir():
+                        idx[name + '/'] = None
+                    elif entry.is_file():
+                        idx[name] = entry.stat().st_size
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return idx
 
 
 def check_file_structure():
@@ -67,12 +89,15 @@ def check_file_structure():
         'ETL_QUICKSTART.md'
     ]
     
+    # Un único recorrido: solo la raíz y las carpetas con archivos requeridos
+    subdirs = sorted({f.rsplit('/', 1)[0] for f in required_files if '/' in f})
+    tree = _index_tree(base_dir, subdirs)
+    
     all_ok = True
     
     print("\n📁 Estructura de directorios:")
     for dir_name in required_dirs:
-        dir_path = base_dir / dir_name
-        if dir_path.exists():
+        if f"{dir_name}/" in tree:
             print(f"✅ {dir_name}/")
         else:
             print(f"❌ {dir_name}/ (crear con: mkdir {dir_name})")
@@ -80,9 +105,8 @@ def check_file_structure():
     
     print("\n📄 Archivos principales:")
     for file_name in required_files:
-        file_path = base_dir / file_name
-        if file_path.exists():
-            size = file_path.stat().st_size
+        if file_name in tree:
+            size = tree[file_name]
             print(f"✅ {file_name} ({size:,} bytes)")
         else:
             print(f"❌ {file_name}")
@@ -91,8 +115,13 @@ def check_file_structure():
     return all_ok
 
 
-def test_import():
-    """Prueba que los módulos ETL se pueden importar"""
+def test_import(deep=False):
+    """
+    Prueba que los módulos ETL se pueden importar.
+    
+    Por defecto solo comprueba que existen (find_spec); con deep=True
+    los importa de verdad para detectar errores en sus dependencias.
+    """
     sys.path.insert(0, str(Path(__file__).parent / 'src'))
     
     modules = [
@@ -106,6 +135,14 @@ def test_import():
     all_ok = True
     
     for module in modules:
+        if not deep:
+            if importlib.util.find_spec(module) is not None:
+                print(f"✅ {module}")
+            else:
+                print(f"❌ {module}: no encontrado")
+                all_ok = False
+            continue
+        
         try:
             __import__(module)
             print(f"✅ {module}")
@@ -142,7 +179,7 @@ def main():
     
     # 4. Imports
     print("\n")
-    import_ok = test_import()
+    import_ok = test_import(deep='--deep' in sys.argv[1:])
     
     # Resumen
     print("\n" + "="*70)
@@ -32,23 +32,35 @@ Versión: 1.0.0
 """
 
 import os
+import re
 import sys
 import json
+import atexit
+import queue
+import asyncio
+import heapq
 import logging
 import time
 import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, List, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, Dict, List, Any, Tuple
+from dataclasses import dataclass, fields
 from enum import Enum
 import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 
+import numpy as np
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ========== CONFIGURACIÓN ==========
 
 logger = logging.getLogger(__name__)
@@ -66,7 +78,91 @@ DB_PATH = "data/databases/api_football_cache.db"
 DAILY_LIMIT = 100
 FIXTURE_REQUEST_COST = 1
 PREDICTION_REQUEST_COST = 1
+PREDICTION_FETCH_WORKERS = 10  # Hilos de fetch_predictions_async (= pool HTTP)
 STATUS_REQUEST_COST = 0  # Gratuito
+QUOTA_STATUS_TTL = 5.0  # Segundos que se reutiliza la última respuesta de /status
+USAGE_LOG_FLUSH_SIZE = 100  # Filas de api_usage_log que disparan un flush
+USAGE_LOG_FLUSH_INTERVAL = 0.5  # Segundos máximos que una fila espera en memoria
+
+# Número de jornada al final de league.round ("Regular Season - 7" → 7)
+_ROUND_RE = re.compile(r"(\d+)\s*$")
+
+# SQL de APIFootballCache: siempre el mismo texto, así cada conexión
+# reutiliza la sentencia ya compilada de su caché (cached_statements)
+SQLITE_CACHED_STATEMENTS = 256
+
+# Lecturas de la caché vía mmap (sin un pread por página) y caché de páginas
+# de SQLite, ambas por conexión
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # 256 MiB
+SQLITE_CACHE_SIZE_KIB = 64 * 1024  # 64 MiB
+
+_SQL_GET_FIXTURE = "SELECT * FROM fixtures WHERE match_id = ?"
+
+# UPSERT en vez de INSERT OR REPLACE: actualiza la fila en su sitio en lugar
+# de borrarla y reinsertarla (la predicción del partido sigue apuntando a ella)
+_SQL_SAVE_FIXTURE = """
+    INSERT INTO fixtures
+    (match_id, league_id, season, round, date, home_team_id, home_team,
+     away_team_id, away_team, status, venue, referee, cached_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(match_id) DO UPDATE SET
+        league_id = excluded.league_id,
+        season = excluded.season,
+        round = excluded.round,
+        date = excluded.date,
+        home_team_id = excluded.home_team_id,
+        home_team = excluded.home_team,
+        away_team_id = excluded.away_team_id,
+        away_team = excluded.away_team,
+        status = excluded.status,
+        venue = excluded.venue,
+        referee = excluded.referee,
+        cached_at = excluded.cached_at
+"""
+
+_SQL_GET_PREDICTION = "SELECT * FROM predictions WHERE match_id = ?"
+
+_SQL_SAVE_PREDICTION = """
+    INSERT INTO predictions
+    (match_id, home_team, away_team, match_date, prob_home_win,
+     prob_draw, prob_away_win, prob_under_2_5, prob_over_2_5,
+     xg_home, xg_away, prediction, confidence, cached_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(match_id) DO UPDATE SET
+        home_team = excluded.home_team,
+        away_team = excluded.away_team,
+        match_date = excluded.match_date,
+        prob_home_win = excluded.prob_home_win,
+        prob_draw = excluded.prob_draw,
+        prob_away_win = excluded.prob_away_win,
+        prob_under_2_5 = excluded.prob_under_2_5,
+        prob_over_2_5 = excluded.prob_over_2_5,
+        xg_home = excluded.xg_home,
+        xg_away = excluded.xg_away,
+        prediction = excluded.prediction,
+        confidence = excluded.confidence,
+        cached_at = excluded.cached_at
+"""
+
+_SQL_LOG_USAGE = """
+    INSERT INTO api_usage_log
+    (endpoint, cost, success, response_time, timestamp, quota_remaining)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Rango [día, día siguiente) sobre el texto ISO del timestamp (siempre UTC):
+# a diferencia de DATE(timestamp) = ?, puede usar idx_usage_timestamp
+_SQL_TODAY_USAGE = """
+    SELECT SUM(cost) as total FROM api_usage_log
+    WHERE timestamp >= ? AND timestamp < ? AND success = 1
+"""
+
+_SQL_GET_DAILY_QUOTA = "SELECT requests_used FROM daily_quota WHERE date = ?"
+
+_SQL_SAVE_DAILY_QUOTA = """
+    INSERT OR REPLACE INTO daily_quota (date, requests_used, reset_time)
+    VALUES (?, ?, ?)
+"""
 
 
 # ========== ENUMS ==========
@@ -89,7 +185,12 @@ class PredictionType(Enum):
 
 # ========== DATACLASSES ==========
 
-@dataclass
+# __slots__ en los dataclasses (Python 3.10+): sin __dict__ por instancia,
+# que se crean por cada fixture y predicción
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class APIQuotaStatus:
     """Estado de cuota diaria"""
     requests_used: int
@@ -109,7 +210,7 @@ class APIQuotaStatus:
         return self.requests_available >= cost
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MatchPrediction:
     """Predicción de partido"""
     match_id: int
@@ -133,7 +234,7 @@ class MatchPrediction:
             self.timestamp = datetime.now(timezone.utc).isoformat()
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MatchFixture:
     """Fixture de partido"""
     match_id: int
@@ -155,7 +256,7 @@ class MatchFixture:
             self.timestamp = datetime.now(timezone.utc).isoformat()
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MLFeatures:
     """Features para modelo ML"""
     match_id: int
@@ -175,18 +276,74 @@ class MLFeatures:
 # ========== CACHÉ Y PERSISTENCIA ==========
 
 class APIFootballCache:
-    """Gestor de caché SQLite para API-Football"""
+    """
+    Gestor de caché SQLite para API-Football.
+    
+    Cada hilo reutiliza su propia conexión (en modo WAL, autocommit) mientras
+    vive, en lugar de abrir y cerrar una por operación; con WAL los lectores
+    de un hilo no esperan a los escritores de otro. Las conexiones de hilos
+    que ya terminaron se cierran solas (ver `_cerrar_conexiones_huerfanas`).
+    
+    Las filas de api_usage_log no se escriben en el request: se encolan y un
+    hilo de fondo las guarda por lotes (ver `flush_usage_log`).
+    """
     
     def __init__(self, db_path: str = DB_PATH):
         """Inicializa caché"""
         self.db_path = db_path
+        self._local = threading.local()
+        # Conexión de cada hilo vivo, para cerrarlas al terminar el hilo o en close()
+        self._conns: Dict[threading.Thread, sqlite3.Connection] = {}
+        self.lock = threading.RLock()
         self._init_db()
+        
+        # Buffer de api_usage_log, vaciado por lotes en segundo plano
+        self._log_queue = queue.Queue()
+        self._log_lock = threading.Lock()
+        self._log_wakeup = threading.Event()
+        self._log_closed = False
+        self._log_thread = threading.Thread(
+            target=self._log_flush_loop, name="api-usage-log", daemon=True
+        )
+        self._log_thread.start()
+        atexit.register(self.flush_usage_log)
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """Conexión del hilo actual; se crea (y configura) la primera vez"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path, isolation_level=None, check_same_thread=False,
+                cached_statements=SQLITE_CACHED_STATEMENTS
+            )
+            conn.row_factory = sqlite3.Row
+            # Pragmas por conexión: con WAL, synchronous=NORMAL evita un
+            # fsync por commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+            self._local.conn = conn
+            with self.lock:
+                self._cerrar_conexiones_huerfanas()
+                self._conns[threading.current_thread()] = conn
+        return conn
+    
+    def _cerrar_conexiones_huerfanas(self):
+        """
+        Cierra las conexiones de hilos que ya terminaron (p. ej. los workers de
+        un executor ya cerrado), que si no quedarían abiertas hasta close().
+        Llamar con self.lock tomado.
+        """
+        for hilo in [h for h in self._conns if not h.is_alive()]:
+            self._conns.pop(hilo).close()
     
     def _init_db(self):
         """Inicializa base de datos"""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_conn()
         cursor = conn.cursor()
         
         # Tabla de fixtures
@@ -252,53 +409,83 @@ class APIFootballCache:
             )
         """)
         
+        # Índices
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON api_usage_log(timestamp)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fixtures_league_season ON fixtures(league_id, season)"
+        )
+        
         conn.commit()
-        conn.close()
+        
+        # WAL queda guardado en el archivo: vale para todas las conexiones
+        conn.execute("PRAGMA journal_mode=WAL")
+    
+    def close(self):
+        """Vacía el buffer de api_usage_log y cierra las conexiones de todos los hilos"""
+        self._log_closed = True
+        self._log_wakeup.set()
+        self._log_thread.join(timeout=5)
+        atexit.unregister(self.flush_usage_log)
+        self.flush_usage_log()
+        
+        with self.lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
+            self._local = threading.local()
     
     def get_fixture(self, match_id: int) -> Optional[MatchFixture]:
         """Obtiene fixture del caché"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM fixtures WHERE match_id = ?", (match_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = self._get_conn().execute(_SQL_GET_FIXTURE, (match_id,)).fetchone()
         
         if not row:
             return None
         
         return MatchFixture(**dict(row))
     
-    def save_fixture(self, fixture: MatchFixture):
-        """Guarda fixture en caché"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO fixtures
-            (match_id, league_id, season, round, date, home_team_id, home_team,
-             away_team_id, away_team, status, venue, referee, cached_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    @staticmethod
+    def _fixture_row(fixture: MatchFixture, cached_at: datetime) -> tuple:
+        """Fila de `fixtures` para un MatchFixture"""
+        return (
             fixture.match_id, fixture.league_id, fixture.season, fixture.round,
             fixture.date, fixture.home_team_id, fixture.home_team,
             fixture.away_team_id, fixture.away_team, fixture.status,
-            fixture.venue, fixture.referee, datetime.now(timezone.utc)
-        ))
+            fixture.venue, fixture.referee, cached_at
+        )
+    
+    def save_fixture(self, fixture: MatchFixture):
+        """Guarda fixture en caché"""
+        self._get_conn().execute(
+            _SQL_SAVE_FIXTURE, self._fixture_row(fixture, datetime.now(timezone.utc))
+        )
+    
+    def save_fixtures_bulk(self, fixtures: List[MatchFixture],
+                           cached_at: Optional[datetime] = None):
+        """
+        Guarda varios fixtures en una sola transacción (un único commit).
+        Todos comparten `cached_at` (por defecto, ahora).
+        """
+        if not fixtures:
+            return
         
-        conn.commit()
-        conn.close()
+        if cached_at is None:
+            cached_at = datetime.now(timezone.utc)
+        conn = self._get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                _SQL_SAVE_FIXTURE, [self._fixture_row(f, cached_at) for f in fixtures]
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
     
     def get_prediction(self, match_id: int) -> Optional[MatchPrediction]:
         """Obtiene predicción del caché"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM predictions WHERE match_id = ?", (match_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = self._get_conn().execute(_SQL_GET_PREDICTION, (match_id,)).fetchone()
         
         if not row:
             return None
@@ -307,16 +494,7 @@ class APIFootballCache:
     
     def save_prediction(self, prediction: MatchPrediction):
         """Guarda predicción en caché"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO predictions
-            (match_id, home_team, away_team, match_date, prob_home_win,
-             prob_draw, prob_away_win, prob_under_2_5, prob_over_2_5,
-             xg_home, xg_away, prediction, confidence, cached_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self._get_conn().execute(_SQL_SAVE_PREDICTION, (
             prediction.match_id, prediction.home_team, prediction.away_team,
             prediction.match_date, prediction.probability_home_win,
             prediction.probability_draw, prediction.probability_away_win,
@@ -324,61 +502,122 @@ class APIFootballCache:
             prediction.expected_goals_home, prediction.expected_goals_away,
             prediction.prediction, prediction.confidence, datetime.now(timezone.utc)
         ))
-        
-        conn.commit()
-        conn.close()
     
     def log_api_usage(self, endpoint: str, cost: int, success: bool,
                      response_time: float, quota_remaining: int):
-        """Registra uso de API"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO api_usage_log
-            (endpoint, cost, success, response_time, timestamp, quota_remaining)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (endpoint, cost, success, response_time, datetime.now(timezone.utc), quota_remaining))
-        
-        conn.commit()
-        conn.close()
+        """Registra uso de API (se encola; lo escribe `flush_usage_log`)"""
+        self._log_queue.put((
+            endpoint, cost, success, response_time, datetime.now(timezone.utc), quota_remaining
+        ))
+        if self._log_closed:
+            # Caché ya cerrada (sin hilo de flush): se escribe en el momento
+            self.flush_usage_log()
+        elif self._log_queue.qsize() >= USAGE_LOG_FLUSH_SIZE:
+            self._log_wakeup.set()
+    
+    def flush_usage_log(self):
+        """Escribe las filas encoladas de api_usage_log en una sola transacción"""
+        with self._log_lock:
+            rows = []
+            while True:
+                try:
+                    rows.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if not rows:
+                return
+            
+            conn = self._get_conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_SQL_LOG_USAGE, rows)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def _log_flush_loop(self):
+        """
+        Hilo de fondo: flush cada USAGE_LOG_FLUSH_INTERVAL o al llenarse el
+        lote, y cierre de las conexiones de hilos terminados
+        """
+        while not self._log_closed:
+            self._log_wakeup.wait(USAGE_LOG_FLUSH_INTERVAL)
+            self._log_wakeup.clear()
+            try:
+                self.flush_usage_log()
+            except Exception as e:
+                logger.error(f"Error guardando api_usage_log: {e}")
+            
+            with self.lock:
+                self._cerrar_conexiones_huerfanas()
     
     def get_today_usage(self) -> int:
         """Obtiene consumo de hoy"""
+        self.flush_usage_log()
         today = datetime.now(timezone.utc).date()
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT SUM(cost) as total FROM api_usage_log
-            WHERE DATE(timestamp) = ? AND success = 1
-        """, (today,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        tomorrow = today + timedelta(days=1)
+        result = self._get_conn().execute(
+            _SQL_TODAY_USAGE, (today.isoformat(), tomorrow.isoformat())
+        ).fetchone()
         
         return result[0] or 0
+    
+    def get_daily_quota(self, day) -> Optional[int]:
+        """Llamadas usadas registradas para un día UTC (None si no hay registro)"""
+        row = self._get_conn().execute(_SQL_GET_DAILY_QUOTA, (day.isoformat(),)).fetchone()
+        return None if row is None else row[0]
+    
+    def save_daily_quota(self, day, requests_used: int):
+        """Guarda las llamadas usadas de un día UTC (la cuota se reinicia a las 00:00 UTC)"""
+        reset_time = datetime.combine(
+            day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc
+        )
+        self._get_conn().execute(
+            _SQL_SAVE_DAILY_QUOTA, (day.isoformat(), requests_used, reset_time.isoformat())
+        )
 
 
 # ========== CLIENTE API-FOOTBALL ==========
 
+def _parse_json(response: requests.Response) -> Any:
+    """Decodifica el cuerpo JSON de la respuesta (orjson si está instalado)"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
 class APIFootballClient:
     """Cliente para API-Football v3"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, quota_ttl: float = QUOTA_STATUS_TTL):
         """Inicializa cliente"""
         if not api_key or len(api_key) < 10:
             raise ValueError("API Key inválida para API-Football")
         
         self.api_key = api_key
+        self.quota_ttl = quota_ttl
         self.session = self._create_session()
         self.cache = APIFootballCache()
-        self.lock = threading.RLock()
+        
+        # Cuota contada localmente (ver _cuota_disponible). _quota_lock solo
+        # protege el contador, nunca la llamada HTTP del request
+        self._quota_lock = threading.Lock()
+        self._quota_remaining: Optional[int] = None
+        self._quota_day = None
+        
+        # Última respuesta de /status y su instante (time.monotonic)
+        self._quota_cache: Optional[Tuple[APIQuotaStatus, float]] = None
+        
+        # Requests en vuelo por (endpoint, params): los idénticos se comparten
+        self._inflight: Dict[Tuple[str, frozenset], Future] = {}
+        self._inflight_lock = threading.Lock()
         
         logger.info("Cliente API-Football inicializado")
     
     def _create_session(self) -> requests.Session:
-        """Crea sesión con retry strategy"""
+        """Crea sesión con retry strategy, pool keep-alive y API key fija"""
         session = requests.Session()
         
         retry_strategy = Retry(
@@ -387,14 +626,36 @@ class APIFootballClient:
             status_forcelist=[429, 500, 502, 503, 504]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # pool_maxsize cubre la concurrencia de fetch_predictions_async
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=10,
+            pool_maxsize=10
+        )
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         
+        # La API key va una sola vez en la sesión, no en cada llamada
+        session.headers.update({"x-apisports-key": self.api_key})
+        
         return session
     
-    def check_quota_status(self) -> APIQuotaStatus:
-        """Verifica estado de cuota (gratuito)"""
+    def close(self):
+        """Cierra la sesión HTTP y la caché (vacía el buffer de api_usage_log)"""
+        self.session.close()
+        self.cache.close()
+    
+    def check_quota_status(self, force: bool = False) -> APIQuotaStatus:
+        """
+        Verifica estado de cuota (gratuito)
+        
+        Llamadas seguidas dentro de `quota_ttl` segundos reutilizan la última
+        respuesta en vez de volver a pedir /status; `force=True` la ignora.
+        """
+        cached = self._quota_cache
+        if not force and cached is not None and time.monotonic() - cached[1] < self.quota_ttl:
+            return cached[0]
+        
         logger.info("Verificando estado de cuota...")
         
         try:
@@ -402,14 +663,13 @@ class APIFootballClient:
             
             response = self.session.get(
                 f"{API_BASE_URL}/status",
-                headers={"x-apisports-key": self.api_key},
                 timeout=10
             )
             
             response_time = time.time() - start_time
             response.raise_for_status()
             
-            data = response.json().get("response", {})
+            data = _parse_json(response).get("response", {})
             
             status = APIQuotaStatus(
                 requests_used=data.get("requests", 0),
@@ -421,75 +681,174 @@ class APIFootballClient:
             
             logger.info(f"Cuota: {status.requests_available} llamadas disponibles")
             
+            self._quota_cache = (status, time.monotonic())
+            
             return status
         
         except Exception as e:
             logger.error(f"Error verificando cuota: {e}")
             raise
     
+    def _sincronizar_cuota(self, day, force: bool = False):
+        """Toma la cuota disponible de /status y la persiste en daily_quota"""
+        status = self.check_quota_status(force=force)
+        self._quota_remaining = status.requests_available
+        self._quota_day = day
+        self.cache.save_daily_quota(day, DAILY_LIMIT - status.requests_available)
+    
+    def _cuota_disponible(self) -> int:
+        """
+        Llamadas disponibles hoy, según el contador local.
+        
+        Solo se sincroniza al arrancar o al cambiar el día UTC: primero desde
+        daily_quota (si hay registro de hoy) y si no desde /status. Así cada
+        request no paga un round trip extra a /status.
+        """
+        today = datetime.now(timezone.utc).date()
+        if self._quota_remaining is None or self._quota_day != today:
+            used = self.cache.get_daily_quota(today)
+            if used is None:
+                self._sincronizar_cuota(today)
+            else:
+                self._quota_remaining = DAILY_LIMIT - used
+                self._quota_day = today
+        return self._quota_remaining
+    
+    @staticmethod
+    def _es_limite_cuota(error: Exception) -> bool:
+        """True si el error es un 429 (o reintentos agotados por 429/5xx)"""
+        if isinstance(error, requests.exceptions.RetryError):
+            return True
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code == 429
+    
     def request(self, endpoint: str, params: Dict[str, Any],
                 cost: int = 1) -> Dict[str, Any]:
-        """Hace request a API con verificación de cuota"""
-        with self.lock:
-            # Verificar cuota
-            quota = self.check_quota_status()
+        """
+        Hace request a API con verificación de cuota.
+        
+        Si ya hay en vuelo un request idéntico (mismo endpoint y params), se
+        espera su resultado en lugar de hacer otra llamada: ráfagas de
+        schedulers pidiendo lo mismo gastan una sola unidad de cuota. Los
+        que esperan reciben el mismo dict (o la misma excepción).
+        """
+        try:
+            key = (endpoint, frozenset(params.items()))
+        except TypeError:  # params no hashables: sin coalescing
+            return self._request(endpoint, params, cost)
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        
+        if not owner:
+            logger.info(f"Reutilizando request en vuelo a {endpoint}")
+            return future.result()
+        
+        try:
+            data = self._request(endpoint, params, cost)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def _request(self, endpoint: str, params: Dict[str, Any],
+                 cost: int) -> Dict[str, Any]:
+        """
+        Request HTTP con reserva de cuota (ver `request`).
+        
+        _quota_lock solo cubre la verificación y la reserva de cuota: la llamada
+        HTTP corre fuera de él, así varios hilos pueden tener requests en
+        vuelo a la vez sin pasarse de la cuota.
+        """
+        with self._quota_lock:
+            # Verificar cuota (contador local, sin llamar a /status)
+            quota_available = self._cuota_disponible()
             
-            if quota.is_exhausted:
+            if quota_available <= 0:
                 raise Exception("Cuota diaria agotada (100 llamadas/día)")
             
-            if quota.requests_available < cost:
+            if quota_available < cost:
                 logger.warning(
-                    f"Cuota insuficiente: disponibles {quota.requests_available}, "
+                    f"Cuota insuficiente: disponibles {quota_available}, "
                     f"necesarias {cost}"
                 )
                 raise Exception("Cuota insuficiente para esta solicitud")
             
-            # Hacer request
-            logger.info(f"Solicitando {endpoint} (costo: {cost})")
+            # Reservar la cuota antes de soltar el lock
+            self._quota_remaining -= cost
+            quota_day = self._quota_day
+        
+        # Hacer request
+        logger.info(f"Solicitando {endpoint} (costo: {cost})")
+        
+        try:
+            start_time = time.time()
             
-            try:
-                start_time = time.time()
-                
-                response = self.session.get(
-                    f"{API_BASE_URL}{endpoint}",
-                    params=params,
-                    headers={"x-apisports-key": self.api_key},
-                    timeout=30
-                )
-                
-                response_time = time.time() - start_time
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Log de uso
-                self.cache.log_api_usage(
-                    endpoint=endpoint,
-                    cost=cost,
-                    success=True,
-                    response_time=response_time,
-                    quota_remaining=quota.requests_available - cost
-                )
-                
-                logger.info(
-                    f"✓ {endpoint} - Tiempo: {response_time:.2f}s "
-                    f"- Cuota restante: {quota.requests_available - cost}"
-                )
-                
-                return data
+            response = self.session.get(
+                f"{API_BASE_URL}{endpoint}",
+                params=params,
+                timeout=30
+            )
             
-            except Exception as e:
-                logger.error(f"Error en request: {e}")
-                
-                self.cache.log_api_usage(
-                    endpoint=endpoint,
-                    cost=0,
-                    success=False,
-                    response_time=time.time() - start_time,
-                    quota_remaining=quota.requests_available
-                )
+            response_time = time.time() - start_time
+            response.raise_for_status()
+            
+            data = _parse_json(response)
+        
+        except Exception as e:
+            logger.error(f"Error en request: {e}")
+            
+            with self._quota_lock:
+                # Devolver la cuota reservada (si el contador sigue siendo el de ese día)
+                if self._quota_remaining is not None and self._quota_day == quota_day:
+                    self._quota_remaining += cost
                 
-                raise
+                # El contador local se desfasó: resincronizar con /status
+                if self._es_limite_cuota(e):
+                    try:
+                        self._sincronizar_cuota(datetime.now(timezone.utc).date(), force=True)
+                    except Exception:
+                        self._quota_remaining = None
+            
+            self.cache.log_api_usage(
+                endpoint=endpoint,
+                cost=0,
+                success=False,
+                response_time=time.time() - start_time,
+                quota_remaining=quota_available
+            )
+            
+            raise
+        
+        # Persistir el contador local
+        with self._quota_lock:
+            quota_remaining = self._quota_remaining
+            if quota_remaining is not None and self._quota_day == quota_day:
+                self.cache.save_daily_quota(quota_day, DAILY_LIMIT - quota_remaining)
+        
+        # Log de uso
+        self.cache.log_api_usage(
+            endpoint=endpoint,
+            cost=cost,
+            success=True,
+            response_time=response_time,
+            quota_remaining=quota_remaining
+        )
+        
+        logger.info(
+            f"✓ {endpoint} - Tiempo: {response_time:.2f}s "
+            f"- Cuota restante: {quota_remaining}"
+        )
+        
+        return data
 
 
 # ========== ESTRATEGIA DE BATCHING ==========
@@ -544,14 +903,17 @@ class BatchFetcher:
                 cost=FIXTURE_REQUEST_COST
             )
             
-            fixtures = []
+            # Un solo instante para todo el lote: timestamp, cached_at y last_fetch
+            now = datetime.now(timezone.utc)
+            timestamp = now.isoformat()
             
-            for match_data in data.get("response", []):
-                fixture = self._parse_fixture(match_data)
-                self.cache.save_fixture(fixture)
-                fixtures.append(fixture)
+            fixtures = [
+                self._parse_fixture(match_data, timestamp)
+                for match_data in data.get("response", [])
+            ]
+            self.cache.save_fixtures_bulk(fixtures, cached_at=now)
             
-            self.last_fetch = datetime.now(timezone.utc)
+            self.last_fetch = now
             
             logger.info(f"✓ Batch completado: {len(fixtures)} fixtures obtenidos")
             
@@ -561,25 +923,33 @@ class BatchFetcher:
             logger.error(f"Error en batch fetch: {e}")
             return []
     
-    def _parse_fixture(self, data: Dict[str, Any]) -> MatchFixture:
-        """Parsea dato de fixture desde API"""
-        fixture = data.get("fixture", {})
-        league = data.get("league", {})
-        teams = data.get("teams", {})
+    def _parse_fixture(self, data: Dict[str, Any],
+                       timestamp: Optional[str] = None) -> MatchFixture:
+        """Parsea dato de fixture desde API (sin timestamp, lo pone __post_init__)"""
+        fixture = data.get("fixture") or {}
+        league = data.get("league") or {}
+        teams = data.get("teams") or {}
+        home = teams.get("home") or {}
+        away = teams.get("away") or {}
+        venue = fixture.get("venue") or {}
+        
+        # Rondas sin número ("Final", "Quarter-finals") quedan como 1
+        round_match = _ROUND_RE.search(league.get("round") or "1")
         
         return MatchFixture(
             match_id=fixture.get("id"),
             league_id=league.get("id"),
             season=league.get("season"),
-            round=int(league.get("round", "1").split()[-1]),
+            round=int(round_match.group(1)) if round_match else 1,
             date=fixture.get("date"),
-            home_team_id=teams.get("home", {}).get("id"),
-            home_team=teams.get("home", {}).get("name"),
-            away_team_id=teams.get("away", {}).get("id"),
-            away_team=teams.get("away", {}).get("name"),
+            home_team_id=home.get("id"),
+            home_team=home.get("name"),
+            away_team_id=away.get("id"),
+            away_team=away.get("name"),
             status=fixture.get("status"),
-            venue=fixture.get("venue", {}).get("name", ""),
-            referee=data.get("league", {}).get("referee")
+            venue=venue.get("name", ""),
+            referee=league.get("referee"),
+            timestamp=timestamp
         )
 
 
@@ -593,6 +963,29 @@ class PredictionFetcher:
         self.client = client
         self.cache = client.cache
         self.scheduled_matches = {}
+        # (fetch_time, match_id) ordenado por hora: el próximo fetch está en [0]
+        self._heap: List[Tuple[datetime, int]] = []
+        # Executor propio para fetch_predictions_async: con el default de cada
+        # asyncio.run, cada lote abriría hilos (y conexiones SQLite) nuevos
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Executor de los fetch concurrentes; se crea la primera vez"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=PREDICTION_FETCH_WORKERS,
+                    thread_name_prefix="api-football-prediction"
+                )
+            return self._executor
+    
+    def close(self):
+        """Detiene los hilos del executor de fetch_predictions_async"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
     
     def schedule_prediction_fetch(self, match_id: int, match_date: str,
                                   home_team: str, away_team: str):
@@ -606,20 +999,32 @@ class PredictionFetcher:
             'home_team': home_team,
             'away_team': away_team
         }
+        heapq.heappush(self._heap, (fetch_time, match_id))
         
         logger.info(f"Predicción agendada para {home_team} vs {away_team}")
         logger.info(f"  Hora partido: {match_dt.isoformat()}")
         logger.info(f"  Hora fetch: {fetch_time.isoformat()}")
     
     def get_pending_predictions(self) -> List[int]:
-        """Obtiene IDs de partidos listos para fetch"""
+        """
+        Obtiene IDs de partidos listos para fetch.
+        
+        Solo se miran las entradas ya vencidas del heap (no todo lo agendado);
+        cada partido se entrega una vez, y si su ventana de 1 minuto ya pasó
+        se descarta sin fetch.
+        """
         now_utc = datetime.now(timezone.utc)
         pending = []
         
-        for match_id, data in self.scheduled_matches.items():
-            fetch_time = data['fetch_time']
+        while self._heap and self._heap[0][0] <= now_utc:
+            fetch_time, match_id = heapq.heappop(self._heap)
+            
+            # Entrada vieja de un partido re-agendado con otra hora
+            data = self.scheduled_matches.get(match_id)
+            if data is None or data['fetch_time'] != fetch_time:
+                continue
             
-            if now_utc >= fetch_time and now_utc < fetch_time + timedelta(minutes=1):
+            if now_utc < fetch_time + timedelta(minutes=1):
                 pending.append(match_id)
         
         return pending
@@ -667,16 +1072,52 @@ class PredictionFetcher:
             logger.error(f"Error fetching prediction: {e}")
             return None
     
+    async def fetch_predictions_async(self, match_ids: List[int],
+                                      max_concurrency: int = 10) -> Dict[int, Optional[MatchPrediction]]:
+        """
+        Versión async de `fetch_prediction` para varios partidos a la vez.
+        
+        Cada fetch corre en un hilo del executor del fetcher (el cliente HTTP y
+        la caché SQLite son síncronos) y se esperan todos juntos: N partidos que coinciden en la
+        ventana de 30 minutos tardan ~1 round trip en lugar de N. La cuota se
+        reserva en `APIFootballClient.request`, así que no se sobrepasa.
+        
+        Args:
+            match_ids: IDs de partidos
+            max_concurrency: Requests en vuelo como máximo (el pool HTTP
+                del cliente tiene 10 conexiones)
+        
+        Returns:
+            {match_id: predicción o None}
+        """
+        semaforo = asyncio.Semaphore(max_concurrency)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        
+        async def _fetch(match_id: int) -> Optional[MatchPrediction]:
+            async with semaforo:
+                return await loop.run_in_executor(executor, self.fetch_prediction, match_id)
+        
+        resultados = await asyncio.gather(*(_fetch(match_id) for match_id in match_ids))
+        return dict(zip(match_ids, resultados))
+    
     def _parse_prediction(self, match_id: int, data: Dict[str, Any]) -> MatchPrediction:
         """Parsea predicción desde API"""
-        predictions = data.get("predictions", {})
-        teams = data.get("teams", {})
-        fixture = data.get("fixture", {})
+        predictions = data.get("predictions") or {}
+        teams = data.get("teams") or {}
+        fixture = data.get("fixture") or {}
+        
+        # Sub-dicts una sola vez
+        win = predictions.get("win") or {}
+        under_over = predictions.get("under_over") or {}
+        goals = predictions.get("goals") or {}
+        home = teams.get("home") or {}
+        away = teams.get("away") or {}
         
         # Extraer probabilidades
-        prob_home = predictions.get("win", {}).get("home", 0)
+        prob_home = win.get("home", 0)
         prob_draw = predictions.get("draw", 0)
-        prob_away = predictions.get("win", {}).get("away", 0)
+        prob_away = win.get("away", 0)
         
         # Normalizar si es necesario
         total = prob_home + prob_draw + prob_away
@@ -692,16 +1133,16 @@ class PredictionFetcher:
         
         return MatchPrediction(
             match_id=match_id,
-            home_team=teams.get("home", {}).get("name", ""),
-            away_team=teams.get("away", {}).get("name", ""),
+            home_team=home.get("name", ""),
+            away_team=away.get("name", ""),
             match_date=fixture.get("date", ""),
             probability_home_win=prob_home,
             probability_draw=prob_draw,
             probability_away_win=prob_away,
-            under_2_5_probability=predictions.get("under_over", {}).get("under", 0),
-            over_2_5_probability=predictions.get("under_over", {}).get("over", 0),
-            expected_goals_home=predictions.get("goals", {}).get("home", 0),
-            expected_goals_away=predictions.get("goals", {}).get("away", 0),
+            under_2_5_probability=under_over.get("under", 0),
+            over_2_5_probability=under_over.get("over", 0),
+            expected_goals_home=goals.get("home", 0),
+            expected_goals_away=goals.get("away", 0),
             prediction=prediction_label,
             confidence=confidence,
             comparison=data.get("comparison", "")
@@ -713,6 +1154,9 @@ class PredictionFetcher:
 class MLFeatureExtractor:
     """Extrae features para modelo ML"""
     
+    # Nombres de campo de MLFeatures, calculados una vez para features_to_dict
+    _CAMPOS = tuple(f.name for f in fields(MLFeatures))
+    
     @staticmethod
     def extract_features(match_id: int, prediction: MatchPrediction) -> MLFeatures:
         """
@@ -751,10 +1195,68 @@ class MLFeatureExtractor:
             last_updated=datetime.now(timezone.utc).isoformat()
         )
     
+    @staticmethod
+    def extract_features_batch(predictions: List[MatchPrediction]) -> List[MLFeatures]:
+        """
+        Versión vectorizada de `extract_features` para muchas predicciones
+        (p. ej. todos los partidos del día): xg_diff y label se calculan con
+        NumPy sobre todo el lote. Mismo resultado que llamar a
+        `extract_features(p.match_id, p)` para cada una.
+        
+        Args:
+            predictions: Predicciones a convertir
+        
+        Returns:
+            Features para modelo ML, en el mismo orden
+        """
+        if not predictions:
+            return []
+        
+        probs = np.array([
+            (p.probability_home_win, p.probability_draw, p.probability_away_win)
+            for p in predictions
+        ], dtype=np.float64)
+        xg = np.array([
+            (p.expected_goals_home, p.expected_goals_away) for p in predictions
+        ], dtype=np.float64)
+        
+        xg_diff = (xg[:, 0] - xg[:, 1]).tolist()
+        
+        # Misma regla que extract_features: gana quien supera estrictamente a
+        # los otros dos; cualquier empate en el máximo cuenta como DRAW
+        home, draw, away = probs[:, 0], probs[:, 1], probs[:, 2]
+        labels = np.where(
+            home > np.maximum(draw, away), "HOME_WIN",
+            np.where(away > np.maximum(draw, home), "AWAY_WIN", "DRAW")
+        ).tolist()
+        
+        last_updated = datetime.now(timezone.utc).isoformat()
+        
+        return [
+            MLFeatures(
+                match_id=p.match_id,
+                home_win_prob=p.probability_home_win,
+                draw_prob=p.probability_draw,
+                away_win_prob=p.probability_away_win,
+                over_2_5_prob=p.over_2_5_probability,
+                under_2_5_prob=p.under_2_5_probability,
+                xg_home=p.expected_goals_home,
+                xg_away=p.expected_goals_away,
+                xg_diff=diff,
+                prediction_label=label,
+                prediction_confidence=p.confidence,
+                last_updated=last_updated
+            )
+            for p, diff, label in zip(predictions, xg_diff, labels)
+        ]
+    
     @staticmethod
     def features_to_dict(features: MLFeatures) -> Dict[str, Any]:
-        """Convierte features a diccionario"""
-        return asdict(features)
+        """
+        Convierte features a diccionario. Copia superficial: los campos son
+        primitivos, así que no hace falta el deepcopy recursivo de `asdict`.
+        """
+        return {nombre: getattr(features, nombre) for nombre in MLFeatureExtractor._CAMPOS}
 
 
 # ========== CLASE PRINCIPAL ==========
@@ -781,11 +1283,19 @@ class APIFootballEnricher:
         """Fetch de predicción 30 min antes del inicio"""
         return self.prediction_fetcher.fetch_prediction(match_id)
     
+    def fetch_pre_match_predictions_batch(self, match_ids: List[int]) -> Dict[int, Optional[MatchPrediction]]:
+        """Fetch concurrente de varias predicciones (ver `fetch_predictions_async`)"""
+        return asyncio.run(self.prediction_fetcher.fetch_predictions_async(match_ids))
+    
     def extract_ml_features(self, match_id: int,
                           prediction: MatchPrediction) -> MLFeatures:
         """Extrae features para modelo ML"""
         return self.feature_extractor.extract_features(match_id, prediction)
     
+    def extract_ml_features_batch(self, predictions: List[MatchPrediction]) -> List[MLFeatures]:
+        """Extrae features de varias predicciones de una vez"""
+        return self.feature_extractor.extract_features_batch(predictions)
+    
     def schedule_prediction_fetch(self, match_id: int, match_date: str,
                                  home_team: str, away_team: str):
         """Agenda fetch de predicción"""
@@ -800,6 +1310,11 @@ class APIFootballEnricher:
     def get_usage_today(self) -> int:
         """Obtiene consumo de hoy"""
         return self.client.cache.get_today_usage()
+    
+    def close(self):
+        """Libera hilos, sesión HTTP y conexiones SQLite del enricher"""
+        self.prediction_fetcher.close()
+        self.client.close()
 
 
 # ========== UTILIDADES ==========
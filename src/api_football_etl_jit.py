@@ -0,0 +1,67 @@
+"""
+Kernel compilado con Numba para `ETLFootballIntegration.feature_engineering`.
+
+Calcula las features derivadas de cada partido (max prob, entropía, balance
+over/under, ratio y total de xG) en una sola pasada por fila, en lugar de
+una operación NumPy (y un array temporal) por feature.
+
+Numba es opcional: si no está instalado, NUMBA_DISPONIBLE es False y
+`feature_engineering` usa la versión NumPy equivalente.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    NUMBA_DISPONIBLE = False
+
+
+if NUMBA_DISPONIBLE:
+
+    @njit(cache=True)
+    def _fmax(a, b):
+        """Como np.fmax: si uno de los dos es NaN, devuelve el otro."""
+        if a != a:
+            return b
+        if b != b:
+            return a
+        return a if a >= b else b
+
+    # Sin parallel=True (la capa de threading de Numba colgaba el proceso de
+    # Streamlit, ver timba_core_jit) ni fastmath (asume que no hay NaN, y las
+    # filas sin xG u over/under los tienen). error_model='numpy': x/0 da
+    # inf/NaN como en NumPy en vez de ZeroDivisionError.
+    @njit(cache=True, error_model='numpy')
+    def engineer_kernel(probs, xg_home, xg_away, over, under, eps):
+        """
+        Features derivadas por fila. `probs` es (N, 3) con las probabilidades
+        1X2; el resto, arrays (N,). `eps` (1e-10) va con el dtype de los
+        arrays para que las cuentas en float32 no se promuevan a float64.
+        Retorna (max_probability, prediction_entropy, over_under_diff,
+        xg_ratio, xg_total), del mismo dtype que `probs`.
+        """
+        n = probs.shape[0]
+        max_p = np.empty(n, probs.dtype)
+        entropy = np.empty(n, probs.dtype)
+        ou_diff = np.empty(n, probs.dtype)
+        xg_ratio = np.empty(n, probs.dtype)
+        xg_total = np.empty(n, probs.dtype)
+        for i in range(n):
+            p0 = probs[i, 0]
+            p1 = probs[i, 1]
+            p2 = probs[i, 2]
+            max_p[i] = _fmax(_fmax(p0, p1), p2)
+            entropy[i] = -(
+                p0 * np.log(p0 + eps) +
+                p1 * np.log(p1 + eps) +
+                p2 * np.log(p2 + eps)
+            )
+            ou_diff[i] = abs(over[i] - under[i])
+            xg_ratio[i] = xg_home[i] / (xg_away[i] + eps)
+            xg_total[i] = xg_home[i] + xg_away[i]
+        return max_p, entropy, ou_diff, xg_ratio, xg_total
+
+else:
+    engineer_kernel = None
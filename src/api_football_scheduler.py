@@ -33,6 +33,7 @@ import sys
 import logging
 import time
 import threading
+from dataclasses import asdict
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional, Callable, List
@@ -155,27 +156,35 @@ class APIFootballScheduler:
         
         logger.info(f"📊 Predicciones pendientes: {len(pending)}")
         
-        for match_id in pending:
+        # Los fetch van concurrentes; features en lote y callbacks, en orden
+        try:
+            predictions = self.enricher.fetch_pre_match_predictions_batch(pending)
+        except Exception as e:
+            logger.error(f"Error fetching predictions: {e}")
+            return
+        
+        fetched = [p for p in predictions.values() if p]
+        
+        # Extraer features de todo el lote
+        try:
+            features_batch = self.enricher.extract_ml_features_batch(fetched)
+        except Exception as e:
+            logger.error(f"Error extrayendo features: {e}")
+            return
+        
+        for prediction, features in zip(fetched, features_batch):
             try:
-                prediction = self.enricher.fetch_pre_match_predictions(match_id)
+                logger.info(
+                    f"✓ Features extraídas: "
+                    f"{prediction.home_team} vs {prediction.away_team}"
+                )
                 
-                if prediction:
-                    # Extraer features
-                    features = self.enricher.extract_ml_features(
-                        match_id, prediction
-                    )
-                    
-                    logger.info(
-                        f"✓ Features extraídas: "
-                        f"{prediction.home_team} vs {prediction.away_team}"
-                    )
-                    
-                    # Callback
-                    if self.on_prediction_fetched:
-                        self.on_prediction_fetched(prediction, features)
+                # Callback
+                if self.on_prediction_fetched:
+                    self.on_prediction_fetched(prediction, features)
             
             except Exception as e:
-                logger.error(f"Error fetching prediction {match_id}: {e}")
+                logger.error(f"Error procesando predicción {prediction.match_id}: {e}")
     
     def _quota_check_job(self):
         """Job de verificación de cuota"""
@@ -232,7 +241,7 @@ class APIFootballScheduler:
             logger.info("✓ Scheduler iniciado")
     
     def stop(self):
-        """Detiene scheduler"""
+        """Detiene scheduler y libera los recursos del enricher"""
         with self.lock:
             self.running = False
             
@@ -241,6 +250,9 @@ class APIFootballScheduler:
             
             schedule.clear()
             
+            # Hilos, sesión HTTP y conexiones SQLite (vacía el buffer de uso)
+            self.enricher.close()
+            
             logger.info("✓ Scheduler detenido")
     
     def register_batch_callback(self, callback: Callable):
@@ -260,7 +272,7 @@ class APIFootballScheduler:
         return {
             'running': self.running,
             'quota_used': self.enricher.get_usage_today(),
-            'quota_status': self.enricher.get_quota_status().__dict__,
+            'quota_status': asdict(self.enricher.get_quota_status()),
         }
 
 
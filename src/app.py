@@ -5,13 +5,8 @@ sys.path.insert(0, os.path.dirname(__file__))
 import streamlit as st
 import pandas as pd
 import io
-import requests
-from scipy.stats import poisson
-import numpy as np
-from difflib import get_close_matches
-from datetime import datetime, timedelta
-import json
-from timba_core import LIGAS, URLS_FIXTURE, normalizar_csv, calcular_fuerzas, predecir_partido, obtener_h2h, obtener_proximos_partidos, emparejar_equipo, encontrar_equipo_similar, descargar_csv_safe
+from pathlib import Path
+from timba_core import FuerzasSoA, LIGAS, URLS_FIXTURE, calcular_fuerzas, predecir_partido, predecir_partidos_batch, obtener_h2h, obtener_h2h_indexado, construir_indice_h2h, obtener_proximos_partidos, emparejar_equipos_batch, encontrar_equipo_similar, descargar_csv_con_digest
 
 # ========== CONFIGURACIÓN INICIAL ==========
 st.set_page_config(
@@ -22,32 +17,178 @@ st.set_page_config(
 )
 
 # ========== FUNCIONES DE CACHING ==========
+CACHE_DIR = Path(".cache")
+CACHE_MAX_POR_LIGA = 3  # archivos más recientes que se conservan por liga
+
+
+@st.cache_resource
+def _http_session():
+    """
+    Sesión HTTP compartida entre reruns: reutiliza conexiones (keep-alive)
+    y reintenta errores transitorios.
+    Si `requests-cache` está instalado, las respuestas se guardan en disco y
+    se revalidan con ETag/Last-Modified, así un reinicio no vuelve a bajar
+    los CSV completos (el servidor responde 304).
+    """
+    # Import diferido: requests solo se carga cuando hace falta descargar
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    try:
+        import requests_cache
+    except ImportError:
+        requests_cache = None
+
+    if requests_cache is not None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        session = requests_cache.CachedSession(
+            str(CACHE_DIR / 'http'),
+            backend='sqlite',
+            expire_after=3600,
+            stale_if_error=True,
+            cache_control=True,
+            allowable_methods=['GET'],
+            allowable_codes=[200, 203, 300, 301, 308],
+        )
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 @st.cache_data(ttl=3600)
 def descargar_datos_liga(url_csv):
     """
     Descarga y cachea los datos históricos de una liga.
+    Retorna (df, digest); digest es el hash del CSV crudo y se usa como clave de caché.
     """
     # url_csv puede ser string o lista de alternativas
     try:
-        df, ok = descargar_csv_safe(url_csv)
+        df, digest, ok = descargar_csv_con_digest(url_csv, timeout=15, session=_http_session())
         if not ok:
-            return None
-        return df
+            return None, None
+        return df, digest
     except Exception as e:
         st.error(f"❌ Error descargando datos: {e}")
-        return None
+        return None, None
 
 
-@st.cache_data(ttl=3600)
-def calcular_y_cachear_fuerzas(df_csv_string):
+@st.cache_data(ttl=1800, show_spinner=False)
+def _cached_fixture(url):
+    """
+    Cachea el fixture por URL durante 30 minutos para no volver a descargarlo
+    y parsearlo en cada rerun de la pestaña automática.
     """
-    Calcula y cachea las fuerzas de los equipos.
+    return obtener_proximos_partidos(url)
+
+
+# ========== CACHÉ PERSISTENTE EN DISCO ==========
+def _escribir_atomico(path, escribir):
+    """Escribe en un archivo temporal y lo renombra, para no dejar archivos a medias."""
+    tmp = path.with_name(path.name + '.tmp')
+    escribir(tmp)
+    os.replace(tmp, path)
+
+
+def _podar_cache_liga(liga_id):
+    """Elimina las entradas más viejas de una liga (LRU por fecha de modificación)."""
+    for patron in (f"fuerzas_{liga_id}_*.parquet", f"df_{liga_id}_*.parquet"):
+        archivos = sorted(CACHE_DIR.glob(patron), key=lambda p: p.stat().st_mtime, reverse=True)
+        for viejo in archivos[CACHE_MAX_POR_LIGA:]:
+            viejo.unlink(missing_ok=True)
+
+
+def load_or_compute_fuerzas(liga_id, digest, df):
+    """
+    Carga las fuerzas desde la caché en disco o las calcula y las guarda.
+    La clave es (liga_id, digest), así que sobrevive a reinicios del contenedor.
+    Retorna (fuerzas, media_local, media_vis, df_normalizado).
     """
-    df = pd.read_csv(io.StringIO(df_csv_string))
-    df = normalizar_csv(df)
+    path_fuerzas = CACHE_DIR / f"fuerzas_{liga_id}_{digest}.parquet"
+    path_df = CACHE_DIR / f"df_{liga_id}_{digest}.parquet"
+
+    if path_fuerzas.exists() and path_df.exists():
+        try:
+            fuerzas, medias = FuerzasSoA.leer_parquet(path_fuerzas)
+            media_local, media_vis = medias['media_local'], medias['media_vis']
+            df_cache = pd.read_parquet(path_df)
+            # Marcar como usados recientemente para la poda LRU
+            path_fuerzas.touch()
+            path_df.touch()
+            return fuerzas, media_local, media_vis, df_cache
+        except Exception:
+            # Caché corrupta o ilegible: se recalcula
+            pass
+
+    df = df.copy()
     fuerzas, media_local, media_vis = calcular_fuerzas(df)
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _escribir_atomico(path_df, lambda tmp: df.to_parquet(tmp, index=False))
+        _escribir_atomico(
+            path_fuerzas,
+            lambda tmp: fuerzas.guardar_parquet(
+                tmp, {'media_local': float(media_local), 'media_vis': float(media_vis)}
+            )
+        )
+        _podar_cache_liga(liga_id)
+    except Exception:
+        # La caché en disco es opcional: si falla, seguimos con lo calculado
+        pass
+
     return fuerzas, media_local, media_vis, df
 
+
+@st.cache_data(ttl=3600)
+def _fuerzas_by_digest(liga_id, digest, _df):
+    """
+    Calcula y cachea las fuerzas de los equipos (memoria + disco).
+    Solo `liga_id` y `digest` participan en la clave de caché (`_df` no se hashea).
+    """
+    return load_or_compute_fuerzas(liga_id, digest, _df)
+
+
+@st.cache_resource(ttl=3600)
+def _h2h_by_digest(digest, _df):
+    """
+    Construye y cachea el índice H2H (local, visitante) -> partidos.
+    Se arma una vez por CSV y se reutiliza en todos los partidos de la fecha.
+    cache_resource y no cache_data: el índice es de solo lectura y se comparte
+    sin copiar; con cache_data cada rerun deserializaba todos sus DataFrames,
+    más lento que reconstruirlo.
+    """
+    return construir_indice_h2h(_df)
+
+
+def _tabla_h2h(h2h_data):
+    """Arma la tabla de los últimos 5 enfrentamientos para `st.table`."""
+    return pd.DataFrame([
+        {
+            'Fecha': str(p['Fecha']).split()[0],
+            'Local': p['Local'],
+            'Visitante': p['Visitante'],
+            'Resultado': f"{p['Goles_Local']}-{p['Goles_Visitante']}"
+        }
+        for p in h2h_data[:5]
+    ])
+
+
+@st.cache_data(ttl=3600)
+def _h2h_tabla_by_digest(local, visitante, digest, _h2h_index):
+    """
+    Cachea la tabla H2H de un cruce por (local, visitante, digest).
+    Retorna (tabla, total_enfrentamientos). `_h2h_index` no se hashea.
+    """
+    h2h_data = obtener_h2h_indexado(local, visitante, _h2h_index)
+    return _tabla_h2h(h2h_data), len(h2h_data)
+
 # Las funciones auxiliares se importan desde `timba_core.py`.
 
 # ========== FUNCIÓN DE SEMÁFORO VISUAL ==========
@@ -155,17 +296,19 @@ def main():
     
     # ========== CARGAR DATOS ==========
     with st.spinner(f"📥 Descargando datos de {liga_nombre}..."):
-        df = descargar_datos_liga(liga_info.get('alternativas', liga_info.get('url')))
+        df, digest = descargar_datos_liga(liga_info.get('alternativas', liga_info.get('url')))
 
     data_available = True
     if df is None or df.empty:
         data_available = False
         st.warning("⚠️ No se encontraron estadísticas históricas para esta competición. Solo se mostrará el calendario.")
         fuerzas = {}
+        h2h_index = {}
         media_local = media_vis = 0
     else:
         with st.spinner(f"🧠 Calculando fuerzas de los equipos..."):
-            fuerzas, media_local, media_vis = calcular_fuerzas(df)
+            fuerzas, media_local, media_vis, df = _fuerzas_by_digest(liga_seleccionada_id, digest, df)
+            h2h_index = _h2h_by_digest(digest, df)
     
     equipos_validos = sorted(list(fuerzas.keys())) if data_available else []
     
@@ -201,7 +344,7 @@ def main():
                     prediccion = predecir_partido(equipo_local, equipo_visitante, fuerzas, media_local, media_vis)
                     if prediccion:
                         st.success("✅ Predicción calculada")
-                        mostrar_prediccion_streamlit(equipo_local, equipo_visitante, prediccion, fuerzas, df)
+                        mostrar_prediccion_streamlit(equipo_local, equipo_visitante, prediccion, fuerzas, df, h2h_index, digest)
                     else:
                         st.error("❌ Error al calcular la predicción.")
     
@@ -218,7 +361,7 @@ def main():
                 st.error("❌ No se encontró URL de fixture para esta liga.")
             else:
                 with st.spinner(f"⏳ Obteniendo partidos de {liga_nombre}..."):
-                    partidos = obtener_proximos_partidos(fixture_url)
+                    partidos = _cached_fixture(fixture_url)
                 
                 if not partidos:
                     st.warning("⚠️ No se encontraron partidos en los próximos 7 días.")
@@ -229,6 +372,21 @@ def main():
                     datos_para_excel = []
                     fecha_primer_partido = None
                     
+                    # Emparejar nombres y calcular todas las predicciones en un solo batch
+                    emparejados = []
+                    predicciones = []
+                    if data_available:
+                        nombres = emparejar_equipos_batch(
+                            [p['local'] for p in partidos] + [p['visitante'] for p in partidos],
+                            equipos_validos
+                        )
+                        for (local_emp, local_ok), (visitante_emp, visitante_ok) in zip(nombres[:len(partidos)], nombres[len(partidos):]):
+                            emparejados.append((local_emp, visitante_emp, local_ok and visitante_ok))
+                        predicciones = predecir_partidos_batch(
+                            [(local_emp, visitante_emp) for local_emp, visitante_emp, _ in emparejados],
+                            fuerzas, media_local, media_vis
+                        )
+
                     # Procesar cada partido
                     for idx, partido in enumerate(partidos, 1):
                         local = partido['local']
@@ -243,19 +401,18 @@ def main():
                             st.write(f"📅 {fecha.strftime('%d/%m/%Y %H:%M')} - {local} vs {visitante}")
                             continue
 
-                        local_emp, local_ok = emparejar_equipo(local, equipos_validos)
-                        visitante_emp, visitante_ok = emparejar_equipo(visitante, equipos_validos)
+                        local_emp, visitante_emp, emparejado = emparejados[idx - 1]
 
-                        if not local_ok or not visitante_ok:
+                        if not emparejado:
                             st.warning(f"⚠️ No se pudo emparejar {local} vs {visitante}")
                             continue
 
-                        # Calcular predicción
-                        prediccion = predecir_partido(local_emp, visitante_emp, fuerzas, media_local, media_vis)
+                        # Predicción ya calculada en el batch
+                        prediccion = predicciones[idx - 1]
 
                         if prediccion:
                             with st.expander(f"📅 {fecha.strftime('%d/%m/%Y %H:%M')} | {local_emp.upper()} vs {visitante_emp.upper()}"):
-                                mostrar_prediccion_streamlit(local_emp, visitante_emp, prediccion, fuerzas, df)
+                                mostrar_prediccion_streamlit(local_emp, visitante_emp, prediccion, fuerzas, df, h2h_index, digest)
                             
                             # ========== AGREGAR DATOS AL EXCEL ==========
                             # Determinar predicción IA (resultado más probable)
@@ -328,9 +485,14 @@ def main():
                         
                         st.success(f"✅ {len(datos_para_excel)} predicciones listas para exportar")
 
-def mostrar_prediccion_streamlit(local, visitante, prediccion, fuerzas, df):
+@st.fragment
+def mostrar_prediccion_streamlit(local, visitante, prediccion, fuerzas, df, h2h_index=None, digest=None):
     """
     Muestra la predicción en componentes Streamlit (tabs, métricas, gráficos).
+    Si se pasa `h2h_index` (ver `construir_indice_h2h`), el H2H se resuelve
+    con búsquedas en el índice en vez de filtrar `df`; con `digest` además
+    se cachea la tabla H2H del cruce.
+    Es un fragmento: un rerun disparado desde adentro solo re-ejecuta esta vista.
     """
     # ========== SECCIÓN 1: PROBABILIDADES ==========
     st.subheader("📊 Probabilidades y Cuotas")
@@ -514,25 +676,22 @@ def mostrar_prediccion_streamlit(local, visitante, prediccion, fuerzas, df):
     # ========== SECCIÓN 7: H2H ==========
     st.subheader("🥊 Historial Directo (H2H)")
     
-    h2h_data = obtener_h2h(local, visitante, df) if df is not None else []
+    if h2h_index is not None and digest is not None:
+        h2h_df, total_h2h = _h2h_tabla_by_digest(local, visitante, digest, h2h_index)
+    else:
+        if h2h_index is not None:
+            h2h_data = obtener_h2h_indexado(local, visitante, h2h_index)
+        else:
+            h2h_data = obtener_h2h(local, visitante, df) if df is not None else []
+        h2h_df, total_h2h = _tabla_h2h(h2h_data), len(h2h_data)
     
-    if h2h_data:
-        st.write(f"**Últimos {min(5, len(h2h_data))} enfrentamientos:**")
-        
-        h2h_df = pd.DataFrame([
-            {
-                'Fecha': str(p['Fecha']).split()[0],
-                'Local': p['Local'],
-                'Visitante': p['Visitante'],
-                'Resultado': f"{p['Goles_Local']}-{p['Goles_Visitante']}"
-            }
-            for p in h2h_data[:5]
-        ])
+    if total_h2h:
+        st.write(f"**Últimos {min(5, total_h2h)} enfrentamientos:**")
         
         st.table(h2h_df)
         
-        if len(h2h_data) > 5:
-            st.info(f"ℹ️ Hay {len(h2h_data) - 5} encuentro(s) más en el historial.")
+        if total_h2h > 5:
+            st.info(f"ℹ️ Hay {total_h2h - 5} encuentro(s) más en el historial.")
     else:
         st.info("📌 Sin historial directo previo entre estos equipos.")
     
@@ -15,11 +15,107 @@ Autor: Data Engineering Team
 
 import pandas as pd
 import numpy as np
+import math
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Goles por equipo que se consideran en la grilla de Poisson (0..GOLES_MAX_GRILLA-1)
+GOLES_MAX_GRILLA = 5
+_LOG_FACT = np.array([math.lgamma(k + 1) for k in range(GOLES_MAX_GRILLA)])
+
+# Una fila por equipo y partido (local y visitante) para los rankings
+_PARTIDOS_POR_EQUIPO = """
+    SELECT home_team AS equipo, fthg AS goles_favor, ftag AS goles_contra,
+           CASE WHEN ftr = '1' THEN 1 ELSE 0 END AS gano
+    FROM matches
+    UNION ALL
+    SELECT away_team, ftag, fthg,
+           CASE WHEN ftr = '2' THEN 1 ELSE 0 END
+    FROM matches
+"""
+
+# Métricas de `obtener_top_equipos`: nombre -> (expresión SQL, orden).
+# Solo se interpolan expresiones de esta tabla, nunca texto del llamador.
+METRICAS_TOP = {
+    'goles_promedio': ('ROUND(AVG(goles_favor), 2)', 'DESC'),
+    'victorias': ('SUM(gano)', 'DESC'),
+    'defensa': ('ROUND(AVG(goles_contra), 2)', 'ASC'),
+}
+
+
+@lru_cache(maxsize=None)
+def _kernel_1x2_jit():
+    """
+    Import diferido del kernel Numba de `timba_core_jit` (numba tarda en
+    importarse). Retorna None si Numba no está instalado.
+    """
+    try:
+        from timba_core_jit import NUMBA_DISPONIBLE, predict_kernel
+    except ImportError:
+        return None
+    return predict_kernel if NUMBA_DISPONIBLE else None
+
+
+def _probabilidades_1x2(goles_esp_local: float, goles_esp_visitante: float) -> Tuple[float, float, float]:
+    """
+    Suma la grilla de Poisson (GOLES_MAX_GRILLA x GOLES_MAX_GRILLA) en
+    probabilidades (local, empate, visitante). Usa el kernel compilado si
+    hay Numba; si no, la grilla se arma con SciPy en un solo producto externo.
+    """
+    kernel = _kernel_1x2_jit()
+    if kernel is not None:
+        p_local, p_empate, p_visitante, _ = kernel(
+            float(goles_esp_local), float(goles_esp_visitante), _LOG_FACT, GOLES_MAX_GRILLA
+        )
+        return p_local, p_empate, p_visitante
+    
+    from scipy.stats import poisson
+    
+    goles = np.arange(GOLES_MAX_GRILLA)
+    grilla = np.outer(poisson.pmf(goles, goles_esp_local), poisson.pmf(goles, goles_esp_visitante))
+    return np.tril(grilla, k=-1).sum(), np.trace(grilla), np.triu(grilla, k=1).sum()
+
+
+@lru_cache(maxsize=None)
+def _kernel_1x2_batch_jit():
+    """Como `_kernel_1x2_jit`, para el kernel batch de `timba_core_jit`."""
+    try:
+        from timba_core_jit import NUMBA_DISPONIBLE, predict_batch_kernel
+    except ImportError:
+        return None
+    return predict_batch_kernel if NUMBA_DISPONIBLE else None
+
+
+def _probabilidades_1x2_batch(goles_esp_local: np.ndarray, goles_esp_visitante: np.ndarray) -> np.ndarray:
+    """
+    Versión vectorizada de `_probabilidades_1x2` para N partidos.
+    Retorna un array (N, 3) con columnas (local, empate, visitante).
+    """
+    # Contiguos: las columnas de un array (N, 2) llegan como vistas con stride
+    goles_esp_local = np.ascontiguousarray(goles_esp_local, dtype=np.float64)
+    goles_esp_visitante = np.ascontiguousarray(goles_esp_visitante, dtype=np.float64)
+    
+    kernel = _kernel_1x2_batch_jit()
+    if kernel is not None:
+        p_local, p_empate, p_visitante, _ = kernel(
+            goles_esp_local, goles_esp_visitante, _LOG_FACT, GOLES_MAX_GRILLA
+        )
+        return np.column_stack((p_local, p_empate, p_visitante))
+    
+    from scipy.stats import poisson
+    
+    goles = np.arange(GOLES_MAX_GRILLA)
+    grillas = (poisson.pmf(goles, goles_esp_local[:, None])[:, :, None] *
+               poisson.pmf(goles, goles_esp_visitante[:, None])[:, None, :])
+    return np.column_stack((
+        np.tril(grillas, k=-1).sum(axis=(1, 2)),
+        np.trace(grillas, axis1=1, axis2=2),
+        np.triu(grillas, k=1).sum(axis=(1, 2)),
+    ))
+
 
 class FootballDataAnalyzer:
     """
@@ -46,42 +142,37 @@ class FootballDataAnalyzer:
         Returns:
             Diccionario con estadísticas
         """
+        from sqlalchemy import text
+        
+        # Una sola consulta agrupada por lado: a lo sumo dos filas (casa/fuera)
+        query = text("""
+            SELECT 
+                CASE WHEN home_team = :equipo THEN 'casa' ELSE 'fuera' END AS lado,
+                COUNT(*) AS partidos,
+                ROUND(AVG(CASE WHEN home_team = :equipo THEN fthg ELSE ftag END), 2) AS goles_marcados,
+                ROUND(AVG(CASE WHEN home_team = :equipo THEN ftag ELSE fthg END), 2) AS goles_recibidos,
+                ROUND(AVG(CASE WHEN home_team = :equipo THEN hs ELSE as_shots END), 2) AS tiros_promedio,
+                ROUND(AVG(CASE WHEN home_team = :equipo THEN hst ELSE ast END), 2) AS tiros_arco_promedio,
+                SUM(CASE WHEN (home_team = :equipo AND ftr = '1') OR
+                              (away_team = :equipo AND ftr = '2') THEN 1 ELSE 0 END) AS victorias,
+                SUM(CASE WHEN ftr = 'D' THEN 1 ELSE 0 END) AS empates,
+                SUM(CASE WHEN (home_team = :equipo AND ftr = '2') OR
+                              (away_team = :equipo AND ftr = '1') THEN 1 ELSE 0 END) AS derrotas
+            FROM matches
+            WHERE home_team = :equipo OR away_team = :equipo
+            GROUP BY lado
+        """)
+        
         with self.engine.connect() as conn:
-            # Casa
-            casa = pd.read_sql(f"""
-                SELECT 
-                    COUNT(*) as partidos,
-                    ROUND(AVG(fthg), 2) as goles_marcados,
-                    ROUND(AVG(ftag), 2) as goles_recibidos,
-                    ROUND(AVG(hs), 2) as tiros_promedio,
-                    ROUND(AVG(hst), 2) as tiros_arco_promedio,
-                    SUM(CASE WHEN ftr = '1' THEN 1 ELSE 0 END) as victorias,
-                    SUM(CASE WHEN ftr = 'D' THEN 1 ELSE 0 END) as empates,
-                    SUM(CASE WHEN ftr = '2' THEN 1 ELSE 0 END) as derrotas
-                FROM matches
-                WHERE home_team = '{equipo}'
-            """, conn)
-            
-            # Fuera
-            fuera = pd.read_sql(f"""
-                SELECT 
-                    COUNT(*) as partidos,
-                    ROUND(AVG(ftag), 2) as goles_marcados,
-                    ROUND(AVG(fthg), 2) as goles_recibidos,
-                    ROUND(AVG(as_shots), 2) as tiros_promedio,
-                    ROUND(AVG(ast), 2) as tiros_arco_promedio,
-                    SUM(CASE WHEN ftr = '2' THEN 1 ELSE 0 END) as victorias,
-                    SUM(CASE WHEN ftr = 'D' THEN 1 ELSE 0 END) as empates,
-                    SUM(CASE WHEN ftr = '1' THEN 1 ELSE 0 END) as derrotas
-                FROM matches
-                WHERE away_team = '{equipo}'
-            """, conn)
-            
-            return {
-                'equipo': equipo,
-                'casa': casa.to_dict(orient='records')[0] if not casa.empty else {},
-                'fuera': fuera.to_dict(orient='records')[0] if not fuera.empty else {}
-            }
+            filas = conn.execute(query, {'equipo': equipo}).mappings().all()
+        
+        por_lado = {fila['lado']: {k: v for k, v in fila.items() if k != 'lado'} for fila in filas}
+        
+        return {
+            'equipo': equipo,
+            'casa': por_lado.get('casa', {}),
+            'fuera': por_lado.get('fuera', {})
+        }
     
     def obtener_enfrentamientos_directos(self, equipo1: str, equipo2: str,
                                         limit: int = 10) -> pd.DataFrame:
@@ -120,51 +211,74 @@ class FootballDataAnalyzer:
             
             return df
     
+    def obtener_h2h_resumen(self, equipo1: str, equipo2: str, limit: int = 10) -> Dict:
+        """
+        Resume en SQL los últimos `limit` enfrentamientos directos
+        (mismos partidos que `obtener_enfrentamientos_directos`).
+        
+        Args:
+            equipo1: Primer equipo
+            equipo2: Segundo equipo
+            limit: Número máximo de enfrentamientos
+        
+        Returns:
+            Diccionario con partidos y victorias de local de cada equipo
+        """
+        from sqlalchemy import text
+        
+        query = text("""
+            SELECT 
+                COUNT(*) AS partidos,
+                SUM(CASE WHEN home_team = :e1 THEN 1 ELSE 0 END) AS e1_local,
+                SUM(CASE WHEN home_team = :e1 AND ftr = '1' THEN 1 ELSE 0 END) AS e1_gana_local,
+                SUM(CASE WHEN home_team = :e2 THEN 1 ELSE 0 END) AS e2_local,
+                SUM(CASE WHEN home_team = :e2 AND ftr = '1' THEN 1 ELSE 0 END) AS e2_gana_local
+            FROM (
+                SELECT home_team, ftr
+                FROM matches
+                WHERE (
+                    (home_team = :e1 AND away_team = :e2) OR
+                    (home_team = :e2 AND away_team = :e1)
+                )
+                ORDER BY date DESC
+                LIMIT :limit
+            )
+        """)
+        
+        with self.engine.connect() as conn:
+            fila = conn.execute(query, {'e1': equipo1, 'e2': equipo2, 'limit': limit}).mappings().one()
+        
+        return {clave: int(valor or 0) for clave, valor in fila.items()}
+    
     def obtener_top_equipos(self, metrica: str = 'goles_promedio',
                            limit: int = 10) -> pd.DataFrame:
         """
         Obtiene ranking de equipos por métrica.
         
         Args:
-            metrica: 'goles_promedio', 'defensa', 'victorias', etc
+            metrica: Una de METRICAS_TOP ('goles_promedio', 'victorias', 'defensa')
             limit: Top N equipos
         
         Returns:
             DataFrame con ranking
         """
-        metricas_disponibles = {
-            'goles_promedio': """
-                SELECT home_team as equipo, ROUND(AVG(fthg + ftag), 2) as valor
-                FROM matches
-                GROUP BY home_team
-                ORDER BY valor DESC
-                LIMIT {limit}
-            """,
-            'victorias': """
-                SELECT home_team as equipo, COUNT(*) as valor
-                FROM matches
-                WHERE ftr = '1'
-                GROUP BY home_team
-                ORDER BY valor DESC
-                LIMIT {limit}
-            """,
-            'defensa': """
-                SELECT home_team as equipo, ROUND(AVG(ftag), 2) as valor
-                FROM matches
-                GROUP BY home_team
-                ORDER BY valor ASC
-                LIMIT {limit}
-            """
-        }
-        
-        if metrica not in metricas_disponibles:
+        if metrica not in METRICAS_TOP:
             raise ValueError(f"Métrica desconocida: {metrica}")
         
-        query = metricas_disponibles[metrica].format(limit=limit)
+        from sqlalchemy import text
+        
+        # Agregación, orden y corte en SQL: solo viajan `limit` filas
+        expresion, orden = METRICAS_TOP[metrica]
+        query = text(f"""
+            SELECT equipo, {expresion} AS valor
+            FROM ({_PARTIDOS_POR_EQUIPO})
+            GROUP BY equipo
+            ORDER BY valor {orden}
+            LIMIT :limit
+        """)
         
         with self.engine.connect() as conn:
-            df = pd.read_sql(query, conn)
-            return df
+            return pd.read_sql(query, conn, params={'limit': limit})
     
     def obtener_fixture_proximo(self, dias_adelante: int = 7) -> pd.DataFrame:
         """
@@ -192,8 +306,6 @@ class FootballDataAnalyzer:
         Returns:
             Diccionario con probabilidades
         """
-        from scipy.stats import poisson
-        
         stats_local = self.obtener_estadisticas_equipo(home_team)
         stats_visitante = self.obtener_estadisticas_equipo(away_team)
         
@@ -202,18 +314,8 @@ class FootballDataAnalyzer:
         goles_esp_visitante = stats_visitante['fuera'].get('goles_marcados', 1.0)
         
         # Calcular probabilidades usando Poisson
-        probs = {}
-        
-        for g_l in range(5):
-            for g_v in range(5):
-                prob = poisson.pmf(g_l, goles_esp_local) * poisson.pmf(g_v, goles_esp_visitante)
-                
-                if g_l > g_v:
-                    probs['1'] = probs.get('1', 0) + prob
-                elif g_l == g_v:
-                    probs['D'] = probs.get('D', 0) + prob
-                else:
-                    probs['2'] = probs.get('2', 0) + prob
+        p_local, p_empate, p_visitante = _probabilidades_1x2(goles_esp_local, goles_esp_visitante)
+        probs = {'1': p_local, 'D': p_empate, '2': p_visitante}
         
         return {
             'local': round(probs.get('1', 0), 3),
@@ -223,6 +325,70 @@ class FootballDataAnalyzer:
             'goles_esp_visitante': round(goles_esp_visitante, 2)
         }
     
+    def goles_esperados_batch(self, pares: List[Tuple[str, str]]) -> np.ndarray:
+        """
+        Goles esperados de muchos partidos con una sola consulta: promedio de
+        goles como local del equipo de casa y como visitante del de fuera
+        (mismos valores que `calcular_probabilidades_match`). Equipos sin
+        partidos usan 1.5 / 1.0.
+        
+        Args:
+            pares: Lista de (equipo_local, equipo_visitante)
+        
+        Returns:
+            Array (N, 2) con columnas (local, visitante)
+        """
+        if not pares:
+            return np.empty((0, 2))
+        
+        from sqlalchemy import bindparam, text
+        
+        locales = sorted({local for local, _ in pares})
+        visitantes = sorted({visitante for _, visitante in pares})
+        
+        query = text("""
+            SELECT 'casa' AS lado, home_team AS equipo, ROUND(AVG(fthg), 2) AS goles
+            FROM matches
+            WHERE home_team IN :locales
+            GROUP BY home_team
+            UNION ALL
+            SELECT 'fuera', away_team, ROUND(AVG(ftag), 2)
+            FROM matches
+            WHERE away_team IN :visitantes
+            GROUP BY away_team
+        """).bindparams(
+            bindparam('locales', expanding=True),
+            bindparam('visitantes', expanding=True),
+        )
+        
+        with self.engine.connect() as conn:
+            filas = conn.execute(query, {'locales': locales, 'visitantes': visitantes}).all()
+        
+        goles = {(lado, equipo): valor for lado, equipo, valor in filas if valor is not None}
+        return np.array(
+            [(goles.get(('casa', local), 1.5), goles.get(('fuera', visitante), 1.0))
+             for local, visitante in pares],
+            dtype=np.float64
+        )
+    
+    def calcular_probabilidades_batch(self, pares: List[Tuple[str, str]]) -> np.ndarray:
+        """
+        Probabilidades 1X2 de muchos partidos a la vez (p. ej. una fecha o
+        una temporada entera de fixtures). Los goles esperados de los que
+        salen se obtienen con `goles_esperados_batch`.
+        
+        Args:
+            pares: Lista de (equipo_local, equipo_visitante)
+        
+        Returns:
+            Array (N, 3) con columnas (local, empate, visitante)
+        """
+        if not pares:
+            return np.empty((0, 3))
+        
+        goles = self.goles_esperados_batch(pares)
+        return _probabilidades_1x2_batch(goles[:, 0], goles[:, 1])
+    
     def obtener_tendencias_mercado(self, dias: int = 30) -> Dict:
         """
         Obtiene tendencias de mercado (Over/Under, BTTS, etc).
@@ -233,26 +399,38 @@ class FootballDataAnalyzer:
         Returns:
             Diccionario con tendencias
         """
+        from sqlalchemy import text
+        
+        # Agregado en SQL: una sola fila en vez de traer la ventana completa
+        query = text("""
+            SELECT 
+                COUNT(*) AS partidos,
+                AVG(over_25) AS over_25,
+                AVG(total_goles) AS promedio_goles
+            FROM matches
+            WHERE date >= date('now', :desde)
+        """)
+        
         with self.engine.connect() as conn:
-            df = pd.read_sql(f"""
-                SELECT 
-                    total_goles,
-                    over_25,
-                    date
-                FROM matches
-                WHERE date >= date('now', '-{dias} days')
-            """, conn)
-            
-            if df.empty:
-                return {}
-            
-            tendencias = {
-                'over_25_pct': round(df['over_25'].mean() * 100, 1),
-                'promedio_goles': round(df['total_goles'].mean(), 2),
-                'partidos_analizados': len(df)
-            }
-            
-            return tendencias
+            fila = conn.execute(query, {'desde': f'-{int(dias)} days'}).mappings().one()
+        
+        if not fila['partidos']:
+            return {}
+        
+        # AVG es NULL si ninguna fila de la ventana tiene valor (p. ej. partidos
+        # aún sin jugar): NaN, como daba el mean() de pandas
+        over_25 = fila['over_25'] if fila['over_25'] is not None else float('nan')
+        promedio_goles = (
+            fila['promedio_goles'] if fila['promedio_goles'] is not None else float('nan')
+        )
+        
+        tendencias = {
+            'over_25_pct': round(over_25 * 100, 1),
+            'promedio_goles': round(promedio_goles, 2),
+            'partidos_analizados': fila['partidos']
+        }
+        
+        return tendencias
 
 
 class FootballDataExporter:
@@ -284,6 +462,62 @@ class FootballDataExporter:
         """Exporta DataFrame a Parquet"""
         df.to_parquet(archivo, index=False)
         logger.info(f"✓ Exportado a {archivo}")
+    
+    @staticmethod
+    def exportar_por_chunks(chunks, archivo_parquet: str, archivo_csv: Optional[str] = None,
+                            archivo_excel: Optional[str] = None, sheet_name: str = 'data',
+                            row_group_size: Optional[int] = None,
+                            compression_level: Optional[int] = None) -> int:
+        """
+        Exporta un iterable de DataFrames (p. ej. `pd.read_sql(..., chunksize=N)`)
+        a Parquet (zstd) y opcionalmente a CSV y Excel, chunk por chunk, sin
+        materializar el resultado completo en memoria.
+        
+        Los chunks posteriores se castean al esquema del primero.
+        
+        Returns:
+            Cantidad total de filas exportadas
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        parquet_writer = None
+        libro = hoja = None
+        total = 0
+        try:
+            for i, chunk in enumerate(chunks):
+                tabla = pa.Table.from_pandas(chunk, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(archivo_parquet, tabla.schema, compression='zstd',
+                                                      compression_level=compression_level)
+                else:
+                    tabla = tabla.cast(parquet_writer.schema)
+                parquet_writer.write_table(tabla, row_group_size=row_group_size)
+                
+                if archivo_csv:
+                    chunk.to_csv(archivo_csv, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+                
+                if archivo_excel:
+                    if libro is None:
+                        from openpyxl import Workbook
+                        libro = Workbook(write_only=True)
+                        hoja = libro.create_sheet(sheet_name)
+                        hoja.append(tabla.column_names)
+                    for fila in zip(*(columna.to_pylist() for columna in tabla.columns)):
+                        hoja.append(fila)
+                
+                total += len(chunk)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+        
+        if libro is not None:
+            libro.save(archivo_excel)
+        
+        for archivo in (archivo_parquet, archivo_csv, archivo_excel):
+            if archivo and total:
+                logger.info(f"✓ Exportado a {archivo}")
+        return total
 
 
 class FootballDataValidator:
@@ -29,6 +29,7 @@ Usage:
     report = integrator.get_mapping_report()
 """
 
+import csv
 import pandas as pd
 import sqlite3
 import logging
@@ -53,15 +54,21 @@ class TeamETLIntegrator:
     Normaliza todos a UUIDs internos únicos.
     """
     
-    def __init__(self, db_path: str = "data/databases/football_data.db"):
+    def __init__(
+        self,
+        db_path: str = "data/databases/football_data.db",
+        normalizer: Optional[TeamNormalizer] = None
+    ):
         """
         Inicializa el integrador.
         
         Args:
             db_path: Ruta a la base de datos
+            normalizer: Normalizador ya inicializado a reutilizar (usa su BD
+                en lugar de db_path)
         """
-        self.normalizer = TeamNormalizer(db_path)
-        self.db_path = db_path
+        self.normalizer = normalizer or TeamNormalizer(db_path)
+        self.db_path = self.normalizer.db_path
         self._init_integration_table()
         logger.info("TeamETLIntegrator initialized")
     
@@ -117,9 +124,7 @@ class TeamETLIntegrator:
         # Buscar columnas de nombre del equipo
         team_cols = [col for col in df.columns if 'team' in col or 'name' in col]
         
-        processed = 0
-        new_teams = 0
-        
+        filas = []
         for idx, row in df.iterrows():
             # Extraer nombre del equipo
             team_name = None
@@ -128,33 +133,10 @@ class TeamETLIntegrator:
                     team_name = str(row[col]).strip()
                     break
             
-            if not team_name:
-                continue
-            
-            # Normalizar
-            team_uuid, similarity = self.normalizer.normalize_team(
-                team_name=team_name,
-                source="footballdata",
-                external_id=str(idx),
-                create_if_missing=True
-            )
-            
-            if similarity == 0.0:
-                new_teams += 1
-            
-            self._log_integration(
-                source="footballdata",
-                external_id=str(idx),
-                external_name=team_name,
-                team_uuid=team_uuid,
-                similarity_score=similarity,
-                status="success"
-            )
-            
-            processed += 1
+            if team_name:
+                filas.append((str(idx), team_name))
         
-        logger.info(f"Processed {processed} teams ({new_teams} new)")
-        return processed, new_teams
+        return self._procesar_lote("footballdata", filas)
     
     def process_apifootball_teams(
         self,
@@ -175,45 +157,13 @@ class TeamETLIntegrator:
         """
         logger.info(f"Processing API-Football teams (season={season})")
         
-        processed = 0
-        new_teams = 0
-        
-        for team_data in teams_data:
-            if not isinstance(team_data, dict):
-                continue
-            
-            # Extraer campos de API-Football
-            team_id = team_data.get('id')
-            team_name = team_data.get('name')
-            country = team_data.get('country', 'Unknown')
-            
-            if not team_id or not team_name:
-                continue
-            
-            # Normalizar
-            team_uuid, similarity = self.normalizer.normalize_team(
-                team_name=team_name,
-                source="apifootball",
-                external_id=str(team_id),
-                create_if_missing=True
-            )
-            
-            if similarity == 0.0:
-                new_teams += 1
-            
-            self._log_integration(
-                source="apifootball",
-                external_id=str(team_id),
-                external_name=team_name,
-                team_uuid=team_uuid,
-                similarity_score=similarity,
-                status="success"
-            )
-            
-            processed += 1
+        filas = [
+            (str(team_data['id']), team_data['name'])
+            for team_data in teams_data
+            if isinstance(team_data, dict) and team_data.get('id') and team_data.get('name')
+        ]
         
-        logger.info(f"Processed {processed} teams ({new_teams} new)")
-        return processed, new_teams
+        return self._procesar_lote("apifootball", filas)
     
     def process_footballdataorg_api(
         self,
@@ -230,72 +180,70 @@ class TeamETLIntegrator:
         """
         logger.info("Processing Football-Data.org API response")
         
-        processed = 0
-        new_teams = 0
+        filas = [
+            (str(team['id']), team['name'])
+            for team in teams_response.get('teams', [])
+            if team.get('id') and team.get('name')
+        ]
         
-        teams = teams_response.get('teams', [])
+        return self._procesar_lote("footballdataorg", filas)
+    
+    def _procesar_lote(self, source: str, filas: List[Tuple[str, str]]) -> Tuple[int, int]:
+        """
+        Normaliza un lote de (external_id, nombre) de una fuente y registra
+        cada integración.
         
-        for team in teams:
-            team_id = team.get('id')
-            team_name = team.get('name')
-            country = team.get('area', {}).get('name', 'Unknown')
-            
-            if not team_id or not team_name:
-                continue
-            
-            # Normalizar
-            team_uuid, similarity = self.normalizer.normalize_team(
-                team_name=team_name,
-                source="footballdataorg",
-                external_id=str(team_id),
-                create_if_missing=True
-            )
-            
-            if similarity == 0.0:
-                new_teams += 1
-            
-            self._log_integration(
-                source="footballdataorg",
-                external_id=str(team_id),
-                external_name=team_name,
-                team_uuid=team_uuid,
-                similarity_score=similarity,
-                status="success"
-            )
-            
-            processed += 1
+        El fuzzy matching del lote se resuelve con una sola matriz de scores
+        (`TeamNormalizer.normalize_teams_batch`) y el log se escribe en una
+        sola transacción.
+        
+        Returns:
+            (total_procesados, total_nuevos)
+        """
+        external_ids = [external_id for external_id, _ in filas]
+        names = [name for _, name in filas]
+        
+        resultados = self.normalizer.normalize_teams_batch(
+            names,
+            source=source,
+            external_ids=external_ids,
+            create_if_missing=True
+        )
+        
+        new_teams = sum(1 for _, similarity in resultados if similarity == 0.0)
         
-        logger.info(f"Processed {processed} teams ({new_teams} new)")
-        return processed, new_teams
+        self._log_integrations([
+            (source, external_id, name, team_uuid, similarity, "success", None)
+            for (external_id, name), (team_uuid, similarity) in zip(filas, resultados)
+        ])
+        
+        logger.info(f"Processed {len(filas)} teams ({new_teams} new)")
+        return len(filas), new_teams
     
-    def _log_integration(
-        self,
-        source: str,
-        external_id: str,
-        external_name: str,
-        team_uuid: Optional[str],
-        similarity_score: float,
-        status: str,
-        error_message: Optional[str] = None
-    ):
-        """Registra una integración en la tabla de logs."""
+    def _log_integrations(self, registros: List[Tuple]):
+        """
+        Registra varias integraciones en una sola transacción.
+        
+        Args:
+            registros: Tuplas (source, external_id, external_name, team_uuid,
+                similarity_score, status, error_message)
+        """
         import uuid as uuid_lib
         
-        log_id = str(uuid_lib.uuid4())
+        if not registros:
+            return
+        
         now = datetime.utcnow().isoformat()
+        rows = [(str(uuid_lib.uuid4()), *registro, now) for registro in registros]
         
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO team_integration_log
-            (log_id, source, external_id, external_name, team_uuid, 
-             similarity_score, status, error_message, processed_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (log_id, source, external_id, external_name, team_uuid,
-              similarity_score, status, error_message, now))
-        
-        conn.commit()
+        with conn:
+            conn.executemany("""
+                INSERT INTO team_integration_log
+                (log_id, source, external_id, external_name, team_uuid, 
+                 similarity_score, status, error_message, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
         conn.close()
     
     def get_mapping_report(self) -> Dict:
@@ -303,7 +251,8 @@ class TeamETLIntegrator:
         Genera un reporte de mapeos y conflictos.
         
         Returns:
-            Dict con estadísticas de mapeos
+            Dict con estadísticas de mapeos; 'conflicts' es una ConflictView
+            (secuencia perezosa de dicts) y 'conflicts_count' su longitud
         """
         conn = sqlite3.connect(self.db_path)
         
@@ -329,26 +278,21 @@ class TeamETLIntegrator:
             HAVING source_count < 2
         """, conn)
         
-        # Conflictos (mismo external_id mapeado a diferentes UUIDs)
-        df_conflicts = pd.read_sql("""
-            SELECT source, external_id,
-                   COUNT(DISTINCT team_uuid) as conflicting_uuids,
-                   GROUP_CONCAT(team_uuid) as team_uuids
-            FROM external_team_mappings
-            GROUP BY source, external_id
-            HAVING conflicting_uuids > 1
-        """, conn)
-        
         conn.close()
         
+        # Conflictos (mismo external_id mapeado a diferentes UUIDs), desde el
+        # índice que mantiene el normalizador; la vista es perezosa: el
+        # conteo no construye los dicts, que se generan al recorrerla
+        conflicts = self.normalizer.conflicts_view()
+        
         report = {
             'timestamp': datetime.utcnow().isoformat(),
             'summary': stats,
             'mappings_by_source': df_mappings.to_dict('records') if not df_mappings.empty else [],
             'unmapped_count': len(df_unmapped),
             'unmapped_teams': df_unmapped.to_dict('records') if not df_unmapped.empty else [],
-            'conflicts_count': len(df_conflicts),
-            'conflicts': df_conflicts.to_dict('records') if not df_conflicts.empty else []
+            'conflicts_count': len(conflicts),
+            'conflicts': conflicts
         }
         
         return report
@@ -368,7 +312,7 @@ class TeamETLIntegrator:
         """
         conn = sqlite3.connect(self.db_path)
         
-        df = pd.read_sql("""
+        cursor = conn.execute("""
             SELECT 
                 mt.team_uuid,
                 mt.official_name,
@@ -382,11 +326,18 @@ class TeamETLIntegrator:
             LEFT JOIN team_aliases ta ON mt.team_uuid = ta.team_uuid
             GROUP BY mt.team_uuid
             ORDER BY mt.official_name
-        """, conn)
+        """)
         
-        conn.close()
+        # Las filas van del cursor al writer sin pasar por un DataFrame
+        try:
+            with open(output_file, 'w', newline='', encoding='utf-8',
+                      buffering=1 << 20) as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow([desc[0] for desc in cursor.description])
+                writer.writerows(cursor)
+        finally:
+            conn.close()
         
-        df.to_csv(output_file, index=False, encoding='utf-8')
         logger.info(f"Normalized data exported to {output_file}")
         
         return output_file
@@ -399,7 +350,6 @@ class TeamETLIntegrator:
             Dict con resultados de validación
         """
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
         issues = {
             'orphaned_mappings': 0,
@@ -408,31 +358,32 @@ class TeamETLIntegrator:
             'details': []
         }
         
-        # Mapeos sin team_uuid válido
-        cursor.execute("""
-            SELECT COUNT(*) FROM external_team_mappings
-            WHERE team_uuid NOT IN (SELECT team_uuid FROM master_teams)
-        """)
-        issues['orphaned_mappings'] = cursor.fetchone()[0]
-        
-        # Aliases sin team_uuid válido
-        cursor.execute("""
-            SELECT COUNT(*) FROM team_aliases
-            WHERE team_uuid NOT IN (SELECT team_uuid FROM master_teams)
-        """)
-        issues['orphaned_aliases'] = cursor.fetchone()[0]
-        
-        # Duplicados de aliases
-        cursor.execute("""
-            SELECT COUNT(*) FROM (
-                SELECT alias_id, COUNT(*) FROM team_aliases
-                GROUP BY alias_name HAVING COUNT(*) > 1
-            )
-        """)
-        issues['duplicate_aliases'] = cursor.fetchone()[0]
-        
-        conn.close()
-        
+        try:
+            # Sin mapeos ni aliases no puede haber huérfanos ni duplicados
+            hay_filas = conn.execute("""
+                SELECT EXISTS (SELECT 1 FROM external_team_mappings)
+                    OR EXISTS (SELECT 1 FROM team_aliases)
+            """).fetchone()[0]
+            if not hay_filas:
+                return issues
+            
+            # Los tres conteos en una sola consulta: mapeos y aliases sin
+            # team_uuid válido, y alias_name repetidos
+            row = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM external_team_mappings
+                     WHERE team_uuid NOT IN (SELECT team_uuid FROM master_teams)),
+                    (SELECT COUNT(*) FROM team_aliases
+                     WHERE team_uuid NOT IN (SELECT team_uuid FROM master_teams)),
+                    (SELECT COUNT(*) FROM (
+                        SELECT 1 FROM team_aliases
+                        GROUP BY alias_name HAVING COUNT(*) > 1
+                    ))
+            """).fetchone()
+        finally:
+            conn.close()
+        
+        issues['orphaned_mappings'], issues['orphaned_aliases'], issues['duplicate_aliases'] = row
         return issues
 
 
@@ -17,6 +17,7 @@ Versión: 1.0.0
 """
 
 import time
+import asyncio
 import logging
 import json
 import threading
@@ -27,6 +28,13 @@ from dataclasses import dataclass, asdict, field
 from pathlib import Path
 import sqlite3
 from collections import defaultdict
+from collections.abc import MutableMapping
+
+import numpy as np
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from football_api_client import (
     FootballDataClient, Competition, MatchStatus,
@@ -131,6 +139,191 @@ class MatchChangeDetection:
         return self.events
 
 
+# ========== ALMACÉN COLUMNAR DE SNAPSHOTS ==========
+class SnapshotStore(MutableMapping):
+    """
+    Snapshots de partidos en layout SoA: un array NumPy por campo más un
+    índice match_id -> fila. Se usa igual que el dict {match_id: MatchSnapshot}
+    (`store[match_id]` devuelve un MatchSnapshot construido al vuelo), pero los
+    agregados (goles, conteos por estado/competición) se calculan con
+    reducciones vectorizadas sobre las columnas en vez de recorrer objetos.
+
+    Los textos (estado, competición, equipos) se guardan como códigos enteros
+    con su vocabulario. Modificar un MatchSnapshot devuelto no altera el
+    almacén: hay que reasignarlo con `store[match_id] = snapshot`.
+    """
+
+    CAPACIDAD_INICIAL = 256
+
+    # campo -> (dtype, valor que representa None)
+    _COLUMNAS = {
+        'match_id': (np.int64, 0),
+        'home_score': (np.int16, 0),
+        'away_score': (np.int16, 0),
+        'status_id': (np.int8, 0),
+        'competition_id': (np.int16, 0),
+        'home_team_id': (np.int32, 0),
+        'away_team_id': (np.int32, 0),
+        'minute': (np.int16, -1),
+        'second_half': (np.int8, -1),
+        'home_possession': (np.float64, np.nan),
+        'timestamp': (np.float64, 0.0),
+    }
+
+    def __init__(self, capacidad: int = CAPACIDAD_INICIAL):
+        self._fila: Dict[int, int] = {}
+        self._cols = {
+            campo: np.full(capacidad, nulo, dtype=dtype)
+            for campo, (dtype, nulo) in self._COLUMNAS.items()
+        }
+        # Vocabularios: texto -> código y código -> texto
+        self._estados: Dict[str, int] = {}
+        self._competiciones: Dict[str, int] = {}
+        self._equipos: Dict[str, int] = {}
+        self._nombres = {'status_id': [], 'competition_id': [], 'team_id': []}
+
+    # ---------- interfaz de dict ----------
+    def __getitem__(self, match_id):
+        i = self._fila[match_id]
+        c = self._cols
+        equipos = self._nombres['team_id']
+        minuto = int(c['minute'][i])
+        segunda = int(c['second_half'][i])
+        posesion = float(c['home_possession'][i])
+        return MatchSnapshot(
+            match_id=int(c['match_id'][i]),
+            home_team=equipos[c['home_team_id'][i]],
+            away_team=equipos[c['away_team_id'][i]],
+            status=self._nombres['status_id'][c['status_id'][i]],
+            home_score=int(c['home_score'][i]),
+            away_score=int(c['away_score'][i]),
+            timestamp=float(c['timestamp'][i]),
+            competition=self._nombres['competition_id'][c['competition_id'][i]],
+            minute=None if minuto < 0 else minuto,
+            second_half=None if segunda < 0 else bool(segunda),
+            home_possession=None if np.isnan(posesion) else posesion,
+        )
+
+    def __setitem__(self, match_id, snapshot: MatchSnapshot):
+        i = self._fila.get(match_id)
+        if i is None:
+            i = len(self._fila)
+            if i == len(self._cols['match_id']):
+                self._crecer()
+            self._fila[match_id] = i
+
+        c = self._cols
+        c['match_id'][i] = match_id
+        c['home_score'][i] = snapshot.home_score
+        c['away_score'][i] = snapshot.away_score
+        c['status_id'][i] = self._codigo(self._estados, 'status_id', snapshot.status)
+        c['competition_id'][i] = self._codigo(self._competiciones, 'competition_id', snapshot.competition)
+        c['home_team_id'][i] = self._codigo(self._equipos, 'team_id', snapshot.home_team)
+        c['away_team_id'][i] = self._codigo(self._equipos, 'team_id', snapshot.away_team)
+        c['minute'][i] = -1 if snapshot.minute is None else snapshot.minute
+        c['second_half'][i] = -1 if snapshot.second_half is None else int(snapshot.second_half)
+        c['home_possession'][i] = np.nan if snapshot.home_possession is None else snapshot.home_possession
+        c['timestamp'][i] = snapshot.timestamp
+
+    def __delitem__(self, match_id):
+        # Mover la última fila al hueco para mantener las columnas compactas
+        i = self._fila.pop(match_id)
+        ultima = len(self._fila)
+        if i != ultima:
+            for columna in self._cols.values():
+                columna[i] = columna[ultima]
+            self._fila[int(self._cols['match_id'][i])] = i
+
+    def __contains__(self, match_id):
+        return match_id in self._fila
+
+    def __iter__(self):
+        return iter(self._fila)
+
+    def __len__(self):
+        return len(self._fila)
+
+    # ---------- columnas ----------
+    def _crecer(self):
+        """Duplica la capacidad de todas las columnas"""
+        for campo, columna in self._cols.items():
+            dtype, nulo = self._COLUMNAS[campo]
+            extra = np.full(len(columna), nulo, dtype=dtype)
+            self._cols[campo] = np.concatenate([columna, extra])
+
+    def _codigo(self, vocabulario: Dict[str, int], clave: str, texto: str) -> int:
+        codigo = vocabulario.get(texto)
+        if codigo is None:
+            codigo = vocabulario[texto] = len(self._nombres[clave])
+            self._nombres[clave].append(texto)
+        return codigo
+
+    def columna(self, campo: str) -> np.ndarray:
+        """Vista de solo las filas ocupadas de una columna"""
+        return self._cols[campo][:len(self._fila)]
+
+    # ---------- agregados vectorizados ----------
+    def _conteo(self, campo: str, clave: str) -> Dict[str, int]:
+        nombres = self._nombres[clave]
+        conteos = np.bincount(self.columna(campo), minlength=len(nombres))
+        return {nombres[i]: int(n) for i, n in enumerate(conteos) if n}
+
+    def conteo_por_estado(self) -> Dict[str, int]:
+        """Número de partidos por estado"""
+        return self._conteo('status_id', 'status_id')
+
+    def conteo_por_competicion(self) -> Dict[str, int]:
+        """Número de partidos por competición"""
+        return self._conteo('competition_id', 'competition_id')
+
+    def goles_totales(self) -> int:
+        """Suma de goles de todos los partidos"""
+        return int(self.columna('home_score').sum(dtype=np.int64) +
+                   self.columna('away_score').sum(dtype=np.int64))
+
+    @property
+    def nombres_equipos(self) -> List[str]:
+        """Nombres de equipo indexados por id (orden de primera aparición)"""
+        return self._nombres['team_id']
+
+    def team_id(self, nombre: str) -> Optional[int]:
+        """Id entero de un equipo, o None si nunca apareció"""
+        return self._equipos.get(nombre)
+
+    def goles_por_equipo_id(self) -> np.ndarray:
+        """
+        Goles marcados por cada equipo (como local y como visitante) en un
+        array indexado por id de equipo (ver `nombres_equipos`).
+        """
+        n = len(self._nombres['team_id'])
+        goles = (
+            np.bincount(self.columna('home_team_id'), weights=self.columna('home_score'), minlength=n) +
+            np.bincount(self.columna('away_team_id'), weights=self.columna('away_score'), minlength=n)
+        )
+        return goles.astype(np.int64)
+
+    def goles_por_equipo(self) -> Dict[str, int]:
+        """Goles marcados por cada equipo (como local y como visitante)"""
+        goles = self.goles_por_equipo_id()
+        return dict(zip(self._nombres['team_id'], goles.tolist()))
+
+    def match_ids(self, status: Optional[str] = None,
+                  competition: Optional[str] = None) -> List[int]:
+        """IDs de los partidos que cumplen los filtros, en orden de fila"""
+        mascara = np.ones(len(self._fila), dtype=bool)
+        for texto, vocabulario, campo in (
+            (status, self._estados, 'status_id'),
+            (competition, self._competiciones, 'competition_id'),
+        ):
+            if texto is None:
+                continue
+            codigo = vocabulario.get(texto)
+            if codigo is None:
+                return []
+            mascara &= self.columna(campo) == codigo
+        return self.columna('match_id')[mascara].tolist()
+
+
 # ========== LIVE SCORES MANAGER ==========
 class LiveScoresManager:
     """
@@ -166,7 +359,7 @@ class LiveScoresManager:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Estado
-        self.match_snapshots: Dict[int, MatchSnapshot] = {}
+        self.match_snapshots = SnapshotStore()
         self.live_matches: Set[int] = set()
         self.callbacks: List[Callable] = []
         
@@ -175,6 +368,10 @@ class LiveScoresManager:
         self.polling_thread = None
         self.lock = threading.RLock()
         
+        # Caché de get_statistics: se invalida cuando cambia algún snapshot
+        self._stats_dirty = True
+        self._stats_cache = None
+        
         # Inicializar BD
         self._init_database()
         
@@ -359,6 +556,10 @@ class LiveScoresManager:
         for event in events:
             self._save_event(match_id, event, current.to_dict())
         
+        # Snapshot y eventos ya persistidos: recalcular estadísticas en la próxima consulta
+        with self.lock:
+            self._stats_dirty = True
+        
         # Disparar callbacks
         for event in events:
             self._trigger_callbacks(event, current.to_dict(), events)
@@ -394,6 +595,25 @@ class LiveScoresManager:
             logger.error(f"Error polling {competition}: {e}")
             return []
     
+    async def apoll_competitions(self, competitions: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Versión async de `poll_competition` para varias competiciones a la vez.
+        
+        Cada poll corre en un thread (el cliente HTTP es síncrono y su rate
+        limiter es thread-safe) y se esperan todos juntos, sin bloquear el
+        event loop del llamador.
+        
+        Args:
+            competitions: Códigos de competición
+        
+        Returns:
+            {competición: partidos encontrados}
+        """
+        resultados = await asyncio.gather(*(
+            asyncio.to_thread(self.poll_competition, comp) for comp in competitions
+        ))
+        return dict(zip(competitions, resultados))
+    
     def start_polling(self, interval: int = 30):
         """
         Inicia polling automático en thread separado.
@@ -484,8 +704,8 @@ class LiveScoresManager:
         """Obtiene estado resumido de una competición"""
         with self.lock:
             matches = [
-                s for s in self.match_snapshots.values()
-                if s.competition == competition
+                self.match_snapshots[match_id]
+                for match_id in self.match_snapshots.match_ids(competition=competition)
             ]
         
         by_status = defaultdict(list)
@@ -504,8 +724,13 @@ class LiveScoresManager:
             }
         }
     
-    def export_to_json(self, output_file: str):
-        """Exporta estado actual a JSON"""
+    def export_to_json(self, output_file: str) -> Dict:
+        """
+        Exporta estado actual a JSON y retorna el dict exportado.
+        
+        Con orjson instalado se serializa directo a bytes (mucho más rápido
+        que `json.dump` con miles de partidos); si no, se usa `json`.
+        """
         with self.lock:
             data = {
                 'timestamp': datetime.now().isoformat(),
@@ -516,27 +741,58 @@ class LiveScoresManager:
                 }
             }
         
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(
+                    data, default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                ))
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
         
         logger.info(f"✓ Exportado a {output_file}")
+        return data
+    
+    def _count_events(self) -> int:
+        """Cuenta los eventos guardados en la base de datos"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            total = conn.execute("SELECT COUNT(*) FROM match_events").fetchone()[0]
+            conn.close()
+            return total
+        except Exception as e:
+            logger.error(f"Error contando eventos: {e}")
+            return 0
     
     def get_statistics(self) -> Dict:
-        """Obtiene estadísticas de estado actual"""
+        """
+        Obtiene estadísticas de estado actual.
+        
+        Los agregados por estado/competición y el conteo de eventos se
+        recalculan solo si cambió algún snapshot desde la última consulta;
+        los totales y el rate limit se leen siempre.
+        """
         with self.lock:
-            total = len(self.match_snapshots)
-            live = len(self.live_matches)
+            if self._stats_dirty or self._stats_cache is None:
+                self._stats_cache = {
+                    'total_events': self._count_events(),
+                    'by_status': self.match_snapshots.conteo_por_estado(),
+                    'by_competition': self.match_snapshots.conteo_por_competicion(),
+                }
+                self._stats_dirty = False
             
-            by_status = defaultdict(int)
-            for snapshot in self.match_snapshots.values():
-                by_status[snapshot.status] += 1
+            cache = self._stats_cache
+            stats = {
+                'total_matches': len(self.match_snapshots),
+                'live_matches': len(self.live_matches),
+                **cache,
+                'by_status': dict(cache['by_status']),
+                'by_competition': dict(cache['by_competition']),
+            }
         
-        return {
-            'total_matches': total,
-            'live_matches': live,
-            'by_status': dict(by_status),
-            'rate_limit': self.api_client.get_rate_limit_status()
-        }
+        stats['rate_limit'] = self.api_client.get_rate_limit_status()
+        return stats
 
 
 # ========== CALLBACKS PREDEFINIDOS ==========
@@ -0,0 +1,133 @@
+"""
+Fuzzy matching de nombres de equipo sin rapidfuzz.
+
+Reimplementa `rapidfuzz.fuzz.token_set_ratio` con `default_process` (mismos
+scores) para que `team_normalization` funcione cuando rapidfuzz no está
+instalado. La parte cara, la distancia InDel entre las diferencias de tokens,
+se calcula para todos los pares de una vez con un kernel Numba sobre los code
+points concatenados en un buffer uint32 + offsets.
+
+Numba también es opcional: si no está instalado, NUMBA_DISPONIBLE es False y
+el mismo kernel corre como Python puro (correcto, pero lento).
+"""
+
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    NUMBA_DISPONIBLE = False
+
+
+_NO_ALNUM = re.compile(r"(?ui)[\W_]")
+
+
+def default_process(nombre: str) -> str:
+    """Como `rapidfuzz.utils.default_process`: no alfanuméricos → espacio, strip y minúsculas."""
+    return _NO_ALNUM.sub(" ", nombre).strip().lower()
+
+
+def _indel_batch(a_flat, a_off, b_flat, b_off):
+    """
+    Distancia InDel (len(a) + len(b) - 2 * LCS) de cada par (a_k, b_k).
+    Las cadenas van concatenadas en a_flat/b_flat; la k-ésima es
+    flat[off[k]:off[k + 1]]. La LCS usa una sola fila de la DP.
+    """
+    n = a_off.shape[0] - 1
+    out = np.empty(n, np.int64)
+    for k in range(n):
+        a = a_flat[a_off[k]:a_off[k + 1]]
+        b = b_flat[b_off[k]:b_off[k + 1]]
+        lb = b.shape[0]
+        fila = np.zeros(lb + 1, np.int64)
+        for i in range(a.shape[0]):
+            diag = 0
+            for j in range(lb):
+                arriba = fila[j + 1]
+                if a[i] == b[j]:
+                    fila[j + 1] = diag + 1
+                elif fila[j] > arriba:
+                    fila[j + 1] = fila[j]
+                diag = arriba
+        out[k] = a.shape[0] + lb - 2 * fila[lb]
+    return out
+
+
+# parallel=True no compensa con nombres de equipo (pocos caracteres por par) y
+# la capa de threading de Numba ya dio problemas con Streamlit (ver timba_core_jit)
+indel_batch_kernel = njit(cache=True)(_indel_batch) if NUMBA_DISPONIBLE else _indel_batch
+
+
+def _codificar(cadenas: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Code points de las cadenas concatenados (uint32) y sus offsets (int64)."""
+    offsets = np.zeros(len(cadenas) + 1, np.int64)
+    np.cumsum([len(c) for c in cadenas], out=offsets[1:])
+    flat = np.frombuffer(''.join(cadenas).encode('utf-32-le'), dtype=np.uint32)
+    return flat, offsets
+
+
+def token_set_ratio_matrix(nombres: Sequence[str], candidatos: Sequence[str]) -> np.ndarray:
+    """
+    Matriz (len(nombres), len(candidatos)) de token_set_ratio (0-100), con
+    los mismos valores que `rapidfuzz.process.cdist(..., scorer=
+    fuzz.token_set_ratio, processor=default_process)`.
+    """
+    tokens_n = [set(default_process(n).split()) for n in nombres]
+    tokens_c = [set(default_process(c).split()) for c in candidatos]
+    scores = np.zeros((len(nombres), len(candidatos)))
+
+    # Pares que necesitan la distancia InDel entre sus diferencias de tokens
+    filas: List[int] = []
+    columnas: List[int] = []
+    difs_ab: List[str] = []
+    difs_ba: List[str] = []
+    sect_lens: List[int] = []
+
+    for i, tokens_a in enumerate(tokens_n):
+        if not tokens_a:
+            continue
+        for j, tokens_b in enumerate(tokens_c):
+            if not tokens_b:
+                continue
+            interseccion = tokens_a & tokens_b
+            dif_ab = tokens_a - tokens_b
+            dif_ba = tokens_b - tokens_a
+            # Un nombre contiene al otro
+            if interseccion and (not dif_ab or not dif_ba):
+                scores[i, j] = 100.0
+                continue
+            filas.append(i)
+            columnas.append(j)
+            difs_ab.append(" ".join(sorted(dif_ab)))
+            difs_ba.append(" ".join(sorted(dif_ba)))
+            sect_lens.append(len(" ".join(interseccion)))
+
+    if not filas:
+        return scores
+
+    dist = indel_batch_kernel(*_codificar(difs_ab), *_codificar(difs_ba))
+
+    ab_len = np.fromiter(map(len, difs_ab), np.int64, len(difs_ab))
+    ba_len = np.fromiter(map(len, difs_ba), np.int64, len(difs_ba))
+    sect_len = np.asarray(sect_lens, np.int64)
+    hay_sect = (sect_len != 0).astype(np.int64)
+    sect_ab_len = sect_len + hay_sect + ab_len
+    sect_ba_len = sect_len + hay_sect + ba_len
+
+    # Sin intersección la suma de largos nunca es 0 (ambos conjuntos no vacíos)
+    resultado = 100 - 100 * dist / (sect_ab_len + sect_ba_len)
+
+    # sect+ab <-> sect y sect+ba <-> sect solo difieren en el largo
+    con_sect = sect_len != 0
+    sect_ab_ratio = 100 - 100 * (hay_sect + ab_len) / np.where(con_sect, sect_len + sect_ab_len, 1)
+    sect_ba_ratio = 100 - 100 * (hay_sect + ba_len) / np.where(con_sect, sect_len + sect_ba_len, 1)
+    resultado = np.where(
+        con_sect, np.maximum.reduce([resultado, sect_ab_ratio, sect_ba_ratio]), resultado
+    )
+
+    scores[filas, columnas] = resultado
+    return scores
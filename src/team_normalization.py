@@ -3,8 +3,8 @@ Team Normalization System
 =========================
 
 Sistema de normalización de nombres de equipos usando Levenshtein fuzzy matching
-y tabla maestra con UUIDs únicos internos para reconciliar datos de múltiples
-fuentes (Football-Data.org, API-Football, CSVs históricos).
+(rapidfuzz) y tabla maestra con UUIDs únicos internos para reconciliar datos de
+múltiples fuentes (Football-Data.org, API-Football, CSVs históricos).
 
 Features:
 - Tabla maestra de equipos con UUID único interno
@@ -32,15 +32,31 @@ Usage:
     )
 """
 
+import re
 import sqlite3
+import sys
+import unicodedata
 import uuid
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
-from thefuzz import fuzz, process
+import numpy as np
+try:
+    from rapidfuzz import fuzz, process
+    from rapidfuzz.utils import default_process
+except ImportError:
+    # Sin rapidfuzz: mismo token_set_ratio, con kernel Numba si está instalado
+    process = None
+    from src.team_fuzzy_jit import token_set_ratio_matrix
 from pathlib import Path
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configurar logging
 logging.basicConfig(
@@ -50,6 +66,47 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Puntuación y marcas combinantes (las deja NFKD al separar los diacríticos)
+_PUNTUACION = re.compile(r'[^\w\s]')
+
+
+@lru_cache(maxsize=4096)
+def _clave_nombre(nombre: str) -> str:
+    """
+    Clave de búsqueda exacta: NFKD + casefold + strip. Cacheada: los mismos
+    nombres se buscan una y otra vez al ingerir partidos.
+    """
+    return unicodedata.normalize('NFKD', nombre).casefold().strip()
+
+
+def _sin_puntuacion(clave: str) -> str:
+    """Variante de la clave sin puntuación ni diacríticos ("barça" → "barca")."""
+    return _PUNTUACION.sub('', clave)
+
+
+def _puntuar(nombres: List[str], candidatos: List[str]) -> np.ndarray:
+    """Matriz (len(nombres), len(candidatos)) de token_set_ratio (0-100)."""
+    if process is None:
+        return token_set_ratio_matrix(nombres, candidatos)
+    return process.cdist(
+        nombres, candidatos,
+        scorer=fuzz.token_set_ratio, processor=default_process,
+        dtype=np.float64, workers=-1
+    )
+
+
+def _extraer_mejor(nombre: str, candidatos: List[str]) -> Optional[Tuple[str, float, int]]:
+    """(candidato, similitud, índice) con mayor token_set_ratio; ante empate, el primero."""
+    if process is None:
+        fila = token_set_ratio_matrix([nombre], candidatos)[0]
+        idx = int(fila.argmax())
+        return candidatos[idx], float(fila[idx]), idx
+    return process.extractOne(
+        nombre, candidatos,
+        scorer=fuzz.token_set_ratio, processor=default_process
+    )
+
+
 @dataclass
 class MasterTeam:
     """Representa un equipo en la tabla maestra."""
@@ -99,6 +156,41 @@ class TeamAlias:
             self.created_at = datetime.utcnow().isoformat()
 
 
+class ConflictView(Sequence):
+    """
+    Vista perezosa de los conflictos de mapeo de un TeamNormalizer.
+    
+    `len()` sale del índice de conflictos sin construir nada; los dicts de
+    cada conflicto se generan al iterar o indexar, en orden (source,
+    external_id). Las claves se fijan al crear la vista.
+    """
+    
+    def __init__(self, normalizer: "TeamNormalizer"):
+        self._normalizer = normalizer
+        self._keys = list(normalizer._conflicts)
+        self._sorted = False
+    
+    def _claves(self) -> List[Tuple[str, str]]:
+        if not self._sorted:
+            self._keys.sort()
+            self._sorted = True
+        return self._keys
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._normalizer._conflicto(key) for key in self._claves()[index]]
+        return self._normalizer._conflicto(self._claves()[index])
+    
+    def __iter__(self):
+        return (self._normalizer._conflicto(key) for key in self._claves())
+    
+    def __repr__(self) -> str:
+        return f"ConflictView({len(self)} conflictos)"
+
+
 class TeamNormalizer:
     """
     Gestor central de normalización de equipos con tabla maestra.
@@ -124,6 +216,15 @@ class TeamNormalizer:
         self.db_path = db_path
         self._cache = {}  # {team_name: team_uuid}
         self._external_cache = {}  # {(source, external_id): team_uuid}
+        # Índice invertido para detectar conflictos sin escanear los mapeos
+        self._ext_to_uuids = {}  # {(source, external_id): {team_uuid, ...}}
+        self._conflicts = set()  # claves con más de un team_uuid
+        # Índices de nombres normalizados (ver _clave_nombre) → team_uuid
+        self._norm_index = {}  # nombres oficiales
+        self._alias_index = {}  # aliases: {clave: (priority, team_uuid)}
+        # Candidatos del fuzzy matching, alineados por índice
+        self._fuzzy_names: List[str] = []  # official_name
+        self._fuzzy_uuids: List[str] = []  # team_uuid
         self._initialized = False
         
         # Crear directorio si no existe
@@ -207,7 +308,12 @@ class TeamNormalizer:
         # Cargar teams
         cursor.execute("SELECT official_name, team_uuid FROM master_teams")
         for name, uuid_val in cursor.fetchall():
-            self._cache[name.lower()] = uuid_val
+            self._index_team(name, uuid_val)
+        
+        # Cargar aliases
+        cursor.execute("SELECT alias_name, team_uuid, priority FROM team_aliases")
+        for alias_name, uuid_val, priority in cursor.fetchall():
+            self._index_alias(alias_name, uuid_val, priority or 0)
         
         # Cargar external mappings
         cursor.execute("""
@@ -215,11 +321,62 @@ class TeamNormalizer:
             FROM external_team_mappings
         """)
         for source, ext_id, uuid_val in cursor.fetchall():
-            self._external_cache[(source, ext_id)] = uuid_val
+            self._index_external(source, ext_id, uuid_val)
         
         conn.close()
         logger.info(f"Cache loaded: {len(self._cache)} teams, {len(self._external_cache)} mappings")
     
+    def _index_team(self, official_name: str, team_uuid: str):
+        """Registra un equipo en la caché, el índice normalizado y los candidatos fuzzy."""
+        # UUIDs y fuentes se internan: cada fila de SQLite trae su propia copia
+        # del string y el mismo UUID queda referenciado desde varios índices
+        team_uuid = sys.intern(team_uuid)
+        self._cache[official_name.lower()] = team_uuid
+        clave = _clave_nombre(official_name)
+        self._norm_index[clave] = team_uuid
+        variante = _sin_puntuacion(clave)
+        if variante:
+            self._norm_index.setdefault(variante, team_uuid)
+        self._fuzzy_names.append(official_name)
+        self._fuzzy_uuids.append(team_uuid)
+    
+    def _index_alias(self, alias_name: str, team_uuid: str, priority: int):
+        """Registra un alias; ante claves repetidas gana la mayor prioridad."""
+        team_uuid = sys.intern(team_uuid)
+        clave = _clave_nombre(alias_name)
+        for k in {clave, _sin_puntuacion(clave)} - {''}:
+            actual = self._alias_index.get(k)
+            if actual is None or priority > actual[0]:
+                self._alias_index[k] = (priority, team_uuid)
+    
+    def _index_external(self, source: str, external_id: str, team_uuid: str):
+        """Registra un mapeo externo en la caché y en el índice de conflictos."""
+        team_uuid = sys.intern(team_uuid)
+        key = (sys.intern(source), external_id)
+        self._external_cache[key] = team_uuid
+        uuids = self._ext_to_uuids.setdefault(key, set())
+        uuids.add(team_uuid)
+        if len(uuids) > 1:
+            self._conflicts.add(key)
+    
+    def _buscar_indexado(self, team_name: str) -> Optional[Tuple[str, str]]:
+        """
+        Busca un nombre en los índices normalizados, sin tocar la BD.
+        Orden: nombre oficial, alias, y luego las variantes sin puntuación.
+        
+        Returns:
+            (team_uuid, 'exact' | 'alias') o None
+        """
+        clave = _clave_nombre(team_name)
+        for k in (clave, _sin_puntuacion(clave)):
+            if not k:
+                continue
+            if k in self._norm_index:
+                return self._norm_index[k], 'exact'
+            if k in self._alias_index:
+                return self._alias_index[k][1], 'alias'
+        return None
+    
     def add_team(
         self,
         official_name: str,
@@ -266,6 +423,11 @@ class TeamNormalizer:
             """, (team.team_uuid, team.official_name, team.country, team.league, 
                   team.created_at, team.updated_at))
             
+            # Confirmar antes del mapeo: add_external_mapping abre su propia
+            # conexión y con el INSERT pendiente la BD queda bloqueada
+            conn.commit()
+            conn.close()
+            
             # Agregar mapeo externo si se proporciona
             if source and external_id:
                 similarity = 100.0  # Nombre nuevo, 100% confianza
@@ -278,19 +440,60 @@ class TeamNormalizer:
                     is_automatic=False
                 )
             
-            conn.commit()
-            conn.close()
-            
             # Actualizar caché
-            self._cache[official_name.lower()] = team_uuid
+            self._index_team(official_name, team_uuid)
             
             logger.info(f"Team added: {official_name} ({team_uuid})")
             return team_uuid
             
         except sqlite3.IntegrityError as e:
+            # Cerrar la conexión: con la transacción abierta bloquea la BD
+            conn.close()
             logger.error(f"Error adding team {official_name}: {e}")
             raise
     
+    def add_teams_bulk(self, teams: Iterable[Tuple[str, str, Optional[str]]]) -> List[str]:
+        """
+        Agrega varios equipos a la tabla maestra en una sola transacción.
+        
+        Args:
+            teams: Iterable de (official_name, country, league)
+        
+        Returns:
+            UUIDs de los equipos, en el mismo orden
+        
+        Raises:
+            sqlite3.IntegrityError: Si algún nombre ya existe (no se inserta ninguno)
+        """
+        teams = list(teams)
+        now = datetime.utcnow().isoformat()
+        team_uuids = [str(uuid.uuid4()) for _ in teams]
+        rows = [
+            (team_uuid, name, country, league, now, now)
+            for team_uuid, (name, country, league) in zip(team_uuids, teams)
+        ]
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO master_teams 
+                    (team_uuid, official_name, country, league, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+        except sqlite3.IntegrityError as e:
+            logger.error(f"Error adding {len(rows)} teams in bulk: {e}")
+            raise
+        finally:
+            conn.close()
+        
+        # Actualizar caché
+        for team_uuid, (name, _, _) in zip(team_uuids, teams):
+            self._index_team(name, team_uuid)
+        
+        logger.info(f"Teams added in bulk: {len(rows)}")
+        return team_uuids
+    
     def add_external_mapping(
         self,
         team_uuid: str,
@@ -345,16 +548,29 @@ class TeamNormalizer:
             conn.close()
             
             # Actualizar caché
-            self._external_cache[(source, external_id)] = team_uuid
+            self._index_external(source, external_id, team_uuid)
             
             action = "auto-mapped" if is_automatic else "manually-mapped"
             logger.info(f"External mapping added: {source}/{external_id} → {team_uuid} ({action})")
             return mapping_id
             
         except sqlite3.IntegrityError as e:
+            # Cerrar la conexión: con la transacción abierta bloquea la BD
+            conn.close()
             logger.error(f"Error adding mapping {source}/{external_id}: {e}")
             raise
     
+    def find_team(self, team_name: str) -> Optional[str]:
+        """
+        Busca un equipo por nombre oficial o alias exacto (claves normalizadas),
+        sin fuzzy matching ni creación.
+        
+        Returns:
+            UUID del equipo o None
+        """
+        encontrado = self._buscar_indexado(team_name)
+        return encontrado[0] if encontrado else None
+    
     def normalize_team(
         self,
         team_name: str,
@@ -369,6 +585,8 @@ class TeamNormalizer:
         1. Si (source, external_id) existe en mappings → return UUID
         2. Si nombre exacto existe → return UUID
         3. Si alias exacto existe → return UUID
+           (2 y 3 comparan claves normalizadas en memoria: NFKD + casefold,
+           con variante sin puntuación; no consultan la BD)
         4. Fuzzy match con threshold 90% → auto-map y return UUID
         5. Si no encontrado y create_if_missing → crear nuevo equipo
         6. Si no encontrado y no create_if_missing → return None
@@ -382,7 +600,105 @@ class TeamNormalizer:
         Returns:
             Tuple (team_uuid, similarity_score)
         """
+        return self._normalize_team(team_name, source, external_id, create_if_missing)
+    
+    def normalize_teams_batch(
+        self,
+        team_names: List[str],
+        source: Optional[str] = None,
+        external_ids: Optional[List[Optional[str]]] = None,
+        create_if_missing: bool = True
+    ) -> List[Tuple[Optional[str], float]]:
+        """
+        Normaliza varios nombres; mismo resultado que llamar a `normalize_team`
+        por cada uno, en orden.
         
+        Los scores fuzzy contra los candidatos existentes se calculan de una
+        vez con `rapidfuzz.process.cdist` (multi-thread; sin rapidfuzz, con el
+        kernel de `team_fuzzy_jit`); los equipos creados durante el lote se
+        comparan aparte, así un nombre repetido en el lote sigue encontrando
+        al equipo creado por una fila anterior.
+        
+        Args:
+            team_names: Nombres de equipo
+            source: Fuente de datos (opcional)
+            external_ids: IDs externos alineados con team_names (opcional)
+            create_if_missing: Crear nuevos equipos si no existen
+        
+        Returns:
+            Lista de (team_uuid, similarity_score)
+        """
+        team_names = list(team_names)
+        if external_ids is None:
+            external_ids = [None] * len(team_names)
+        
+        # Solo llegan al paso fuzzy los nombres sin mapeo externo ni match exacto
+        pendientes = [
+            i for i, (name, ext_id) in enumerate(zip(team_names, external_ids))
+            if not (source and ext_id and (source, ext_id) in self._external_cache)
+            and self._buscar_indexado(name) is None
+        ]
+        
+        scores = {}
+        if pendientes and self._fuzzy_names:
+            matriz = _puntuar([team_names[i] for i in pendientes], self._fuzzy_names)
+            scores = dict(zip(pendientes, matriz))
+        
+        return [
+            self._normalize_team(name, source, ext_id, create_if_missing, scores.get(i))
+            for i, (name, ext_id) in enumerate(zip(team_names, external_ids))
+        ]
+    
+    def normalize_many(
+        self,
+        team_names: List[str],
+        create_if_missing: bool = True
+    ) -> List[Tuple[Optional[str], float, Optional[str]]]:
+        """
+        Como `normalize_teams_batch`, pero añade el nombre oficial de cada
+        equipo encontrado, tomado de los candidatos en memoria (sin `get_team`).
+        
+        Returns:
+            Lista de (team_uuid, similarity_score, official_name)
+        """
+        resultados = self.normalize_teams_batch(team_names, create_if_missing=create_if_missing)
+        nombres = dict(zip(self._fuzzy_uuids, self._fuzzy_names))
+        return [(uuid_val, sim, nombres.get(uuid_val)) for uuid_val, sim in resultados]
+    
+    def _mejor_candidato(
+        self,
+        team_name: str,
+        scores: Optional[np.ndarray] = None
+    ) -> Optional[Tuple[str, float, int]]:
+        """
+        Mejor candidato fuzzy para un nombre: (official_name, similitud, índice).
+        
+        `scores` son los scores ya calculados contra los primeros len(scores)
+        candidatos; el resto se puntúa con `_extraer_mejor`. Ante empate gana
+        el de menor índice, como en extractOne.
+        """
+        n = 0 if scores is None else len(scores)
+        mejor = None
+        if n:
+            idx = int(scores.argmax())
+            mejor = (self._fuzzy_names[idx], float(scores[idx]), idx)
+        
+        if len(self._fuzzy_names) > n:
+            match = _extraer_mejor(team_name, self._fuzzy_names[n:])
+            if match and (mejor is None or match[1] > mejor[1]):
+                mejor = (match[0], match[1], n + match[2])
+        
+        return mejor
+    
+    def _normalize_team(
+        self,
+        team_name: str,
+        source: Optional[str],
+        external_id: Optional[str],
+        create_if_missing: bool,
+        scores: Optional[np.ndarray] = None
+    ) -> Tuple[Optional[str], float]:
+        """Implementación de `normalize_team`; `scores` como en `_mejor_candidato`."""
         # 1. Buscar por mapeo externo
         if source and external_id:
             cache_key = (source, external_id)
@@ -391,62 +707,42 @@ class TeamNormalizer:
                 logger.info(f"Found in external cache: {source}/{external_id} → {uuid_val}")
                 return uuid_val, 100.0
         
-        # 2. Buscar por nombre exacto
-        team_name_lower = team_name.lower()
-        if team_name_lower in self._cache:
-            uuid_val = self._cache[team_name_lower]
-            logger.info(f"Found exact match: {team_name} → {uuid_val}")
+        # 2-3. Buscar por nombre exacto o alias (índices normalizados en memoria)
+        encontrado = self._buscar_indexado(team_name)
+        if encontrado:
+            uuid_val, tipo = encontrado
+            if tipo == 'exact':
+                logger.info(f"Found exact match: {team_name} → {uuid_val}")
+            else:
+                logger.info(f"Found alias match: {team_name} → {uuid_val}")
             return uuid_val, 100.0
         
-        # 3. Buscar por alias exacto
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT team_uuid FROM team_aliases 
-            WHERE LOWER(alias_name) = ? 
-            ORDER BY priority DESC LIMIT 1
-        """, (team_name_lower,))
-        
-        result = cursor.fetchone()
-        if result:
-            uuid_val = result[0]
-            logger.info(f"Found alias match: {team_name} → {uuid_val}")
-            conn.close()
-            return uuid_val, 100.0
+        # 4. Fuzzy match contra tabla maestra (rapidfuzz, candidatos en memoria)
+        match = self._mejor_candidato(team_name, scores)
         
-        # 4. Fuzzy match contra tabla maestra
-        cursor.execute("SELECT official_name, team_uuid FROM master_teams")
-        teams = cursor.fetchall()
-        conn.close()
-        
-        if teams:
-            names = [t[0] for t in teams]
-            matches = process.extract(team_name, names, scorer=fuzz.token_set_ratio, limit=3)
+        if match:
+            best_name, similarity, idx = match
+            team_uuid = self._fuzzy_uuids[idx]
+            
+            logger.info(f"Fuzzy match: {team_name} → {best_name} (similarity: {similarity:.1f}%)")
             
-            if matches:
-                best_name, similarity = matches[0]
-                team_uuid = next(t[1] for t in teams if t[0] == best_name)
+            # Auto-mapear si similitud > threshold
+            if similarity >= self.SIMILARITY_THRESHOLD:
+                logger.info(f"Auto-mapping: {team_name} → {team_uuid} ({similarity:.1f}%)")
                 
-                logger.info(f"Fuzzy match: {team_name} → {best_name} (similarity: {similarity}%)")
+                if source and external_id:
+                    self.add_external_mapping(
+                        team_uuid=team_uuid,
+                        source=source,
+                        external_id=external_id,
+                        external_name=team_name,
+                        similarity_score=float(similarity),
+                        is_automatic=True
+                    )
                 
-                # Auto-mapear si similitud > threshold
-                if similarity >= self.SIMILARITY_THRESHOLD:
-                    logger.info(f"Auto-mapping: {team_name} → {team_uuid} ({similarity}%)")
-                    
-                    if source and external_id:
-                        self.add_external_mapping(
-                            team_uuid=team_uuid,
-                            source=source,
-                            external_id=external_id,
-                            external_name=team_name,
-                            similarity_score=float(similarity),
-                            is_automatic=True
-                        )
-                    
-                    return team_uuid, float(similarity)
-                else:
-                    logger.warning(f"Similarity {similarity}% below threshold ({self.SIMILARITY_THRESHOLD}%)")
+                return team_uuid, float(similarity)
+            else:
+                logger.warning(f"Similarity {similarity:.1f}% below threshold ({self.SIMILARITY_THRESHOLD}%)")
         
         # 5. Crear nuevo equipo si es necesario
         if create_if_missing:
@@ -508,13 +804,86 @@ class TeamNormalizer:
             conn.commit()
             conn.close()
             
+            self._index_alias(alias_name, team_uuid, priority)
+            
             logger.info(f"Alias added: {alias_name} → {team_uuid}")
             return alias_id
             
         except sqlite3.IntegrityError as e:
+            # Cerrar la conexión: con la transacción abierta bloquea la BD
+            conn.close()
             logger.error(f"Error adding alias {alias_name}: {e}")
             raise
     
+    def add_aliases_bulk(
+        self,
+        aliases: Iterable[Tuple[str, str, int]],
+        source: Optional[str] = None
+    ) -> List[str]:
+        """
+        Agrega varios aliases en una sola transacción.
+        
+        Args:
+            aliases: Iterable de (team_uuid, alias_name, priority)
+            source: Fuente de los aliases
+        
+        Returns:
+            IDs de los aliases, en el mismo orden
+        
+        Raises:
+            sqlite3.IntegrityError: Si algún alias ya existe (no se inserta ninguno)
+        """
+        aliases = list(aliases)
+        now = datetime.utcnow().isoformat()
+        alias_ids = [str(uuid.uuid4()) for _ in aliases]
+        rows = [
+            (alias_id, team_uuid, alias_name, priority, source, now)
+            for alias_id, (team_uuid, alias_name, priority) in zip(alias_ids, aliases)
+        ]
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO team_aliases
+                    (alias_id, team_uuid, alias_name, priority, source, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+        except sqlite3.IntegrityError as e:
+            logger.error(f"Error adding {len(rows)} aliases in bulk: {e}")
+            raise
+        finally:
+            conn.close()
+        
+        for team_uuid, alias_name, priority in aliases:
+            self._index_alias(alias_name, team_uuid, priority)
+        
+        logger.info(f"Aliases added in bulk: {len(rows)}")
+        return alias_ids
+    
+    def get_conflicts(self) -> List[Dict]:
+        """
+        Mapeos externos (source, external_id) asociados a más de un UUID.
+        
+        Sale del índice invertido que se mantiene al cargar y agregar mapeos:
+        no recorre la tabla de mapeos.
+        """
+        return list(self.conflicts_view())
+    
+    def conflicts_view(self) -> ConflictView:
+        """Como `get_conflicts`, pero sin materializar la lista (ver ConflictView)."""
+        return ConflictView(self)
+    
+    def _conflicto(self, key: Tuple[str, str]) -> Dict:
+        """Dict de un conflicto del índice invertido."""
+        uuids = self._ext_to_uuids[key]
+        return {
+            'source': key[0],
+            'external_id': key[1],
+            'conflicting_uuids': len(uuids),
+            'team_uuids': ','.join(sorted(uuids))
+        }
+    
     def get_team(self, team_uuid: str) -> Optional[Dict]:
         """Obtiene información completa de un equipo."""
         conn = sqlite3.connect(self.db_path)
@@ -638,7 +1007,12 @@ class TeamNormalizer:
         }
     
     def export_mappings(self, output_file: str = "team_mappings.json"):
-        """Exporta todos los mapeos a JSON para auditoría."""
+        """
+        Exporta todos los mapeos a JSON para auditoría.
+        
+        Usa orjson si está instalado (serializa directo a bytes UTF-8);
+        si no, `json.dump`.
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -662,8 +1036,12 @@ class TeamNormalizer:
         
         conn.close()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(export, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(export, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(export, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Mappings exported to {output_file}")
         return output_file
@@ -1,10 +1,19 @@
 import pandas as pd
 import io
-import requests
-from scipy.stats import poisson
+import csv
+import json
+import hashlib
+from collections.abc import Mapping
+import math
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import numpy as np
 from difflib import get_close_matches
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 # ========== DICCIONARIO DE LIGAS ==========
 LIGAS = {
@@ -220,10 +229,88 @@ def normalizar_csv(df):
     return df
 
 
-def descargar_csv_safe(url_or_list, timeout=10):
+# Columnas que usan normalizar_csv, calcular_fuerzas y el H2H (incluye los
+# nombres alternativos que normalizar_csv renombra). El resto no se parsea.
+COLUMNAS_CSV = frozenset({
+    'Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'HTHG', 'HTAG',
+    'HST', 'AST', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR',
+    'Team 1', 'Team 2', 'Team1', 'Team2', 'Home Team', 'Away Team', 'Score', 'FT',
+})
+
+
+def _parsear_csv(content):
     """
-    Intenta descargar un CSV desde una URL o una lista de URLs alternativas.
-    Retorna (df, True) si tuvo éxito, o (None, False) si todas fallaron.
+    Parsea el CSV crudo (bytes) a DataFrame.
+    Usa el lector multihilo de PyArrow proyectando solo COLUMNAS_CSV; si
+    PyArrow no está instalado o no puede leer el archivo, usa pandas.
+    """
+    # Try utf-8 then latin1
+    try:
+        text = content.decode('utf-8')
+        encoding = 'utf8'
+    except UnicodeDecodeError:
+        text = content.decode('latin1')
+        encoding = 'latin1'
+
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pacsv = None
+
+    if pacsv is not None:
+        try:
+            encabezado = next(csv.reader([text.split('\n', 1)[0].lstrip('\ufeff').rstrip('\r')]))
+            columnas = [c for c in encabezado if c in COLUMNAS_CSV]
+            if len(set(encabezado)) == len(encabezado) and columnas:
+                # Fechas y marcadores como texto, igual que pandas (sin inferir date32)
+                tipos = {c: pa.string() for c in ('Date', 'Score', 'FT') if c in columnas}
+                tabla = pacsv.read_csv(
+                    io.BytesIO(content),
+                    read_options=pacsv.ReadOptions(use_threads=True, encoding=encoding),
+                    convert_options=pacsv.ConvertOptions(
+                        include_columns=columnas,
+                        column_types=tipos,
+                        strings_can_be_null=True,
+                    ),
+                )
+                return tabla.to_pandas()
+        except Exception:
+            # p.ej. filas con distinta cantidad de campos: pandas es más tolerante
+            pass
+
+    return pd.read_csv(io.StringIO(text))
+
+
+def _descargar_un_csv(url, http, timeout):
+    """
+    Descarga y parsea un único CSV.
+    Retorna (df, digest) o None si la URL falla o el CSV está vacío.
+    """
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    try:
+        r = http.get(url, headers=headers, timeout=timeout)
+        r.raise_for_status()
+        content = r.content
+        df = _parsear_csv(content)
+        if df is None or df.empty:
+            # treat as failure
+            return None
+        df = normalizar_csv(df)
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        return df, digest
+    except Exception:
+        return None
+
+
+def descargar_csv_con_digest(url_or_list, timeout=10, session=None):
+    """
+    Igual que `descargar_csv_safe`, pero además retorna un digest corto
+    (blake2b, 16 bytes) del contenido crudo descargado.
+    Retorna (df, digest, True) si tuvo éxito, o (None, None, False) si todas fallaron.
+    El digest sirve como clave de caché: mismo digest ⇒ mismo CSV.
+    Si se pasa `session` (requests.Session), se reutilizan sus conexiones.
+    Con varias URLs alternativas se descargan en paralelo y gana la primera válida.
     """
     urls = []
     if isinstance(url_or_list, (list, tuple)):
@@ -231,38 +318,42 @@ def descargar_csv_safe(url_or_list, timeout=10):
     elif isinstance(url_or_list, str):
         urls = [url_or_list]
     else:
-        return None, False
+        return None, None, False
 
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    for url in urls:
-        try:
-            r = requests.get(url, headers=headers, timeout=timeout)
-            r.raise_for_status()
-            content = r.content
-            # Try utf-8 then latin1
-            text = None
-            try:
-                text = content.decode('utf-8')
-            except Exception:
-                try:
-                    text = content.decode('latin1')
-                except Exception:
-                    text = content.decode('utf-8', errors='replace')
-
-            df = pd.read_csv(io.StringIO(text))
-            if df is None or df.empty:
-                # treat as failure and try next
-                continue
-            df = normalizar_csv(df)
-            return df, True
-        except Exception:
-            # try next URL
-            continue
+    if session is None:
+        import requests
+    http = session if session is not None else requests
+    if len(urls) == 1:
+        resultado = _descargar_un_csv(urls[0], http, timeout)
+        return (*resultado, True) if resultado else (None, None, False)
+
+    executor = ThreadPoolExecutor(max_workers=min(4, len(urls)))
+    pendientes = {executor.submit(_descargar_un_csv, url, http, timeout) for url in urls}
+    try:
+        while pendientes:
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                resultado = futuro.result()
+                if resultado:
+                    return (*resultado, True)
+    finally:
+        # No esperar a los mirrors lentos una vez que hay respuesta
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    return None, False
+    return None, None, False
+
+
+def descargar_csv_safe(url_or_list, timeout=10, session=None):
+    """
+    Intenta descargar un CSV desde una URL o una lista de URLs alternativas.
+    Retorna (df, True) si tuvo éxito, o (None, False) si todas fallaron.
+    """
+    df, _, ok = descargar_csv_con_digest(url_or_list, timeout=timeout, session=session)
+    return df, ok
 
 
 def obtener_proximos_partidos(url_fixture):
+    import requests
     headers = {'User-Agent': 'Mozilla/5.0'}
     try:
         response = requests.get(url_fixture, headers=headers, timeout=10)
@@ -299,30 +390,86 @@ def obtener_proximos_partidos(url_fixture):
         return []
 
 
-def emparejar_equipo(nombre_fixture, equipos_validos):
+def _indexar_alias_por_minuscula(alias_teams):
+    """Agrupa los valores de `alias_teams` por su forma en minúsculas (en orden de aparición)."""
+    indice = {}
+    for alias_value in alias_teams.values():
+        valores = indice.setdefault(alias_value.lower(), [])
+        if alias_value not in valores:
+            valores.append(alias_value)
+    return indice
+
+
+# Se arma una vez al importar en lugar de bajar a minúsculas todo ALIAS_TEAMS por nombre
+_ALIAS_POR_MINUSCULA = _indexar_alias_por_minuscula(ALIAS_TEAMS)
+
+
+def _emparejar_por_alias(nombre_fixture, equipos_validos):
     """
-    Empareja el nombre del equipo con el más similar.
-    Primero intenta usar ALIAS_TEAMS, luego usa difflib con fuzzy matching.
-    Retorna (nombre_normalizado, exito_bool).
+    Pasos 1 y 2 de `emparejar_equipo`: resolución exacta vía ALIAS_TEAMS.
+    `equipos_validos` debería ser un set (se consulta por pertenencia).
     """
     # Paso 1: Buscar en ALIAS_TEAMS
     if nombre_fixture in ALIAS_TEAMS:
         nombre_normalizado = ALIAS_TEAMS[nombre_fixture]
         if nombre_normalizado in equipos_validos:
-            return nombre_normalizado, True
-    
+            return nombre_normalizado
+
     # Paso 2: Buscar alias de nombres ya normalizados
-    for alias_key, alias_value in ALIAS_TEAMS.items():
-        if nombre_fixture.lower() == alias_value.lower():
-            if alias_value in equipos_validos:
-                return alias_value, True
-    
-    # Paso 3: Usar difflib con fuzzy matching
-    coincidencias = get_close_matches(nombre_fixture, equipos_validos, n=1, cutoff=0.6)
-    if coincidencias:
-        return coincidencias[0], True
-    
-    return None, False
+    for alias_value in _ALIAS_POR_MINUSCULA.get(nombre_fixture.lower(), ()):
+        if alias_value in equipos_validos:
+            return alias_value
+
+    return None
+
+
+def emparejar_equipos_batch(nombres_fixture, equipos_validos):
+    """
+    Empareja varios nombres de fixture a la vez.
+    Retorna una lista de (nombre_normalizado, exito_bool) alineada con `nombres_fixture`.
+    Los nombres que no se resuelven por alias se comparan contra todos los
+    equipos en una sola llamada a `rapidfuzz.process.cdist` (si está instalado).
+    """
+    equipos_validos = list(equipos_validos)
+    conjunto_validos = set(equipos_validos)
+    resultados = [(None, False)] * len(nombres_fixture)
+    pendientes = []
+    for i, nombre in enumerate(nombres_fixture):
+        por_alias = _emparejar_por_alias(nombre, conjunto_validos)
+        if por_alias is not None:
+            resultados[i] = (por_alias, True)
+        else:
+            pendientes.append(i)
+
+    if not pendientes or not equipos_validos:
+        return resultados
+
+    # Paso 3: fuzzy matching (similitud >= 60%, como el cutoff=0.6 de difflib)
+    if process is not None:
+        puntajes = process.cdist(
+            [nombres_fixture[i] for i in pendientes], equipos_validos,
+            scorer=fuzz.ratio, score_cutoff=60, workers=-1
+        )
+        mejores = puntajes.argmax(axis=1)
+        for fila, i in enumerate(pendientes):
+            if puntajes[fila, mejores[fila]] > 0:
+                resultados[i] = (equipos_validos[mejores[fila]], True)
+    else:
+        for i in pendientes:
+            coincidencias = get_close_matches(nombres_fixture[i], equipos_validos, n=1, cutoff=0.6)
+            if coincidencias:
+                resultados[i] = (coincidencias[0], True)
+
+    return resultados
+
+
+def emparejar_equipo(nombre_fixture, equipos_validos):
+    """
+    Empareja el nombre del equipo con el más similar.
+    Primero intenta usar ALIAS_TEAMS, luego usa fuzzy matching (rapidfuzz o difflib).
+    Retorna (nombre_normalizado, exito_bool).
+    """
+    return emparejar_equipos_batch([nombre_fixture], equipos_validos)[0]
 
 
 def encontrar_equipo_similar(nombre, equipos_validos):
@@ -336,274 +483,430 @@ def imprimir_barra(valor, maximo=100, ancho=25):
     return barra, porcentaje
 
 
+# Cantidad de partidos que definen la "forma reciente" de un equipo
+PARTIDOS_FORMA = 5
+
+# Las métricas se muestran con 1-2 decimales y alimentan tasas de Poisson:
+# float32 alcanza y reduce a la mitad la memoria de cada columna
+DTYPE_FUERZAS = np.float32
+
+
+class TeamView(Mapping):
+    """Vista de solo lectura de un equipo dentro de `FuerzasSoA` (como un dict de métricas)."""
+
+    __slots__ = ('_soa', '_idx')
+
+    def __init__(self, soa, idx):
+        self._soa = soa
+        self._idx = idx
+
+    def __getitem__(self, campo):
+        # float de Python: las columnas son float32 y no todo consumidor lo acepta
+        return float(self._soa.columnas[campo][self._idx])
+
+    def __iter__(self):
+        return iter(self._soa.columnas)
+
+    def __len__(self):
+        return len(self._soa.columnas)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class FuerzasSoA(Mapping):
+    """
+    Fuerzas de los equipos en layout SoA: un array NumPy por métrica más un
+    índice equipo -> fila. Se usa igual que el dict {equipo: {métrica: valor}}
+    (`fuerzas['Liverpool']['Ataque_Casa']`), pero permite leer una métrica
+    para muchos equipos con un único gather (`columna(...)[indices(...)]`).
+    """
+
+    def __init__(self, equipos, columnas):
+        self.team_index = {equipo: i for i, equipo in enumerate(equipos)}
+        self.columnas = columnas
+
+    def __getitem__(self, equipo):
+        return TeamView(self, self.team_index[equipo])
+
+    def __contains__(self, equipo):
+        return equipo in self.team_index
+
+    def __iter__(self):
+        return iter(self.team_index)
+
+    def __len__(self):
+        return len(self.team_index)
+
+    @classmethod
+    def desde_dict(cls, fuerzas):
+        """Convierte el formato dict {equipo: {métrica: valor}} a SoA."""
+        equipos = list(fuerzas)
+        campos = list(fuerzas[equipos[0]]) if equipos else []
+        columnas = {
+            campo: np.array([fuerzas[e].get(campo, 0) for e in equipos], dtype=DTYPE_FUERZAS)
+            for campo in campos
+        }
+        return cls(equipos, columnas)
+
+    def guardar_parquet(self, path, metadatos=None):
+        """
+        Guarda las columnas en Parquet (zstd, nombres de equipo con diccionario).
+        `metadatos` (dict serializable a JSON) va en los metadatos del esquema.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tabla = pa.Table.from_pydict({'Equipo': list(self.team_index), **self.columnas})
+        if metadatos:
+            tabla = tabla.replace_schema_metadata({'timba': json.dumps(metadatos)})
+        pq.write_table(tabla, path, compression='zstd', use_dictionary=['Equipo'])
+
+    @classmethod
+    def leer_parquet(cls, path):
+        """Inverso de `guardar_parquet`. Retorna (fuerzas, metadatos)."""
+        import pyarrow.parquet as pq
+
+        tabla = pq.read_table(path)
+        metadatos = json.loads((tabla.schema.metadata or {}).get(b'timba', b'{}'))
+        equipos = tabla.column('Equipo').to_pylist()
+        columnas = {
+            campo: tabla.column(campo).to_numpy()
+            for campo in tabla.column_names if campo != 'Equipo'
+        }
+        return cls(equipos, columnas), metadatos
+
+    def indices(self, equipos):
+        """Filas de `equipos` como array de enteros."""
+        return np.fromiter((self.team_index[e] for e in equipos), dtype=np.intp, count=len(equipos))
+
+    def columna(self, campo):
+        return self.columnas[campo]
+
+
+def _media_por_equipo(df, col_equipo, col_valor, equipos):
+    """Media de `col_valor` agrupada por `col_equipo`; 0 para equipos sin partidos."""
+    return df.groupby(col_equipo)[col_valor].mean().reindex(equipos, fill_value=0)
+
+
+def _ratio_liga(serie, promedio_liga):
+    """Divide por el promedio de la liga (0 si el promedio no es positivo)."""
+    if promedio_liga > 0:
+        return serie / promedio_liga
+    return pd.Series(0.0, index=serie.index)
+
+
+def _forma_reciente(partidos_largo, equipos, n=PARTIDOS_FORMA):
+    """
+    Promedio de goles a favor/en contra de los últimos `n` partidos de cada equipo,
+    en un solo groupby + tail sobre la vista larga ya ordenada por fecha.
+    Retorna un DataFrame indexado por equipo con columnas GF y GC.
+    """
+    ultimos = partidos_largo.groupby('Equipo').tail(n)
+    # Un NaN en cualquiera de los últimos partidos invalida el promedio (como sum()/len())
+    return ultimos.groupby('Equipo')[['GF', 'GC']].mean().mask(
+        ultimos[['GF', 'GC']].isna().groupby(ultimos['Equipo']).any()
+    ).reindex(equipos, fill_value=0)
+
+
 def calcular_fuerzas(df):
     df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
     df = df.sort_values('Date').reset_index(drop=True)
     promedio_goles_local_liga = df['FTHG'].mean()
     promedio_goles_visitante_liga = df['FTAG'].mean()
-    fuerzas = {}
     equipos = sorted(df['HomeTeam'].unique())
-    for equipo in equipos:
-        partidos_casa_global = df[df['HomeTeam'] == equipo]
-        partidos_fuera_global = df[df['AwayTeam'] == equipo]
-        goles_a_favor_casa_global = partidos_casa_global['FTHG'].mean() if len(partidos_casa_global) > 0 else 0
-        goles_en_contra_casa_global = partidos_casa_global['FTAG'].mean() if len(partidos_casa_global) > 0 else 0
-        goles_a_favor_fuera_global = partidos_fuera_global['FTAG'].mean() if len(partidos_fuera_global) > 0 else 0
-        goles_en_contra_fuera_global = partidos_fuera_global['FTHG'].mean() if len(partidos_fuera_global) > 0 else 0
-        ataque_casa_global = goles_a_favor_casa_global / promedio_goles_local_liga if promedio_goles_local_liga > 0 else 0
-        defensa_casa_global = goles_en_contra_casa_global / promedio_goles_visitante_liga if promedio_goles_visitante_liga > 0 else 0
-        ataque_fuera_global = goles_a_favor_fuera_global / promedio_goles_visitante_liga if promedio_goles_visitante_liga > 0 else 0
-        defensa_fuera_global = goles_en_contra_fuera_global / promedio_goles_local_liga if promedio_goles_local_liga > 0 else 0
-        todos_partidos = []
-        for _, row in partidos_casa_global.iterrows():
-            todos_partidos.append({'Fecha': row['Date'], 'Tipo': 'Casa', 'GF': row['FTHG'], 'GC': row['FTAG']})
-        for _, row in partidos_fuera_global.iterrows():
-            todos_partidos.append({'Fecha': row['Date'], 'Tipo': 'Fuera', 'GF': row['FTAG'], 'GC': row['FTHG']})
-        todos_partidos_sorted = sorted(todos_partidos, key=lambda x: x['Fecha'])
-        ultimos_5 = todos_partidos_sorted[-5:] if len(todos_partidos_sorted) >= 5 else todos_partidos_sorted
-        if len(ultimos_5) > 0:
-            goles_favor_reciente = sum(p['GF'] for p in ultimos_5) / len(ultimos_5)
-            goles_contra_reciente = sum(p['GC'] for p in ultimos_5) / len(ultimos_5)
-        else:
-            goles_favor_reciente = goles_contra_reciente = 0
-        ataque_reciente = goles_favor_reciente / promedio_goles_local_liga if promedio_goles_local_liga > 0 else 0
-        defensa_reciente = goles_contra_reciente / promedio_goles_visitante_liga if promedio_goles_visitante_liga > 0 else 0
-        ataque_casa_final = (ataque_reciente * 0.6) + (ataque_casa_global * 0.4)
-        defensa_casa_final = (defensa_reciente * 0.6) + (defensa_casa_global * 0.4)
-        ataque_fuera_final = (ataque_reciente * 0.6) + (ataque_fuera_global * 0.4)
-        defensa_fuera_final = (defensa_reciente * 0.6) + (defensa_fuera_global * 0.4)
-        # Cálculo de CÓRNERS (ponderado 75% reciente + 25% histórico)
-        # DEFENSIVA: Verificar disponibilidad de columnas HC y AC
-        tiene_datos_corners = 'HC' in df.columns and 'AC' in df.columns
-        
-        if tiene_datos_corners:
-            corners_casa_global = partidos_casa_global['HC'].mean() if len(partidos_casa_global) > 0 else 0
-            corners_fuera_global = partidos_fuera_global['AC'].mean() if len(partidos_fuera_global) > 0 else 0
-            corners_casa_contra = partidos_casa_global['AC'].mean() if len(partidos_casa_global) > 0 else 0
-            corners_fuera_contra = partidos_fuera_global['HC'].mean() if len(partidos_fuera_global) > 0 else 0
-        else:
-            corners_casa_global = corners_fuera_global = corners_casa_contra = corners_fuera_contra = 0
-        
-        # Cálculo reciente de córners (si hay datos disponibles)
-        if len(ultimos_5) > 0 and tiene_datos_corners:
-            corners_casa_reciente = corners_casa_global  # Use historical as proxy for recent
-            corners_fuera_reciente = corners_fuera_global
-        else:
-            corners_casa_reciente = corners_casa_global
-            corners_fuera_reciente = corners_fuera_global
-        
-        # Ponderar: 75% reciente + 25% histórico
-        corners_casa_ponderado = (corners_casa_reciente * 0.75) + (corners_casa_global * 0.25)
-        corners_fuera_ponderado = (corners_fuera_reciente * 0.75) + (corners_fuera_global * 0.25)
-        
-        corners_casa = corners_casa_ponderado
-        corners_fuera = corners_fuera_ponderado
-        tarjetas_am_casa = partidos_casa_global['HY'].mean() if 'HY' in df.columns and len(partidos_casa_global) > 0 else 0
-        tarjetas_am_fuera = partidos_fuera_global['AY'].mean() if 'AY' in df.columns and len(partidos_fuera_global) > 0 else 0
-        tarjetas_ro_casa = partidos_casa_global['HR'].mean() if 'HR' in df.columns and len(partidos_casa_global) > 0 else 0
-        tarjetas_ro_fuera = partidos_fuera_global['AR'].mean() if 'AR' in df.columns and len(partidos_fuera_global) > 0 else 0
-        fuerzas[equipo] = {
-            'Ataque_Casa': ataque_casa_final,
-            'Defensa_Casa': defensa_casa_final,
-            'Ataque_Fuera': ataque_fuera_final,
-            'Defensa_Fuera': defensa_fuera_final,
-            'Ataque_Casa_Global': ataque_casa_global,
-            'Defensa_Casa_Global': defensa_casa_global,
-            'Ataque_Fuera_Global': ataque_fuera_global,
-            'Defensa_Fuera_Global': defensa_fuera_global,
-            'Ataque_Reciente': ataque_reciente,
-            'Defensa_Reciente': defensa_reciente,
-            'Goles_Favor_Reciente': goles_favor_reciente,
-            'Goles_Contra_Reciente': goles_contra_reciente,
-            'Corners_Casa': corners_casa,
-            'Corners_Fuera': corners_fuera,
-            'Corners_Casa_Contra': corners_casa_contra,
-            'Corners_Fuera_Contra': corners_fuera_contra,
-            'Corners_Promedio': (corners_casa + corners_fuera) / 2,
-            'Tarjetas_Am_Casa': tarjetas_am_casa,
-            'Tarjetas_Am_Fuera': tarjetas_am_fuera,
-            'Tarjetas_Am_Promedio': (tarjetas_am_casa + tarjetas_am_fuera) / 2,
-            'Tarjetas_Ro_Casa': tarjetas_ro_casa,
-            'Tarjetas_Ro_Fuera': tarjetas_ro_fuera,
-            'Tarjetas_Ro_Promedio': (tarjetas_ro_casa + tarjetas_ro_fuera) / 2,
-        }
-        # métricas adicionales
-        try:
-            hst_media_casa = partidos_casa_global['HST'].mean() if 'HST' in df.columns and len(partidos_casa_global) > 0 else 0
-            ast_media_fuera = partidos_fuera_global['AST'].mean() if 'AST' in df.columns and len(partidos_fuera_global) > 0 else 0
-            eficiencia_casa = (goles_a_favor_casa_global / hst_media_casa) * 100 if hst_media_casa > 0 else 0
-            eficiencia_fuera = (goles_a_favor_fuera_global / ast_media_fuera) * 100 if ast_media_fuera > 0 else 0
-            eficiencia_promedio = (eficiencia_casa + eficiencia_fuera) / 2
-        except Exception:
-            eficiencia_casa = eficiencia_fuera = eficiencia_promedio = 0
-        try:
-            partidos_equipo = pd.concat([partidos_casa_global, partidos_fuera_global], ignore_index=True)
-            total_partidos_equipo = len(partidos_equipo)
-            if total_partidos_equipo > 0:
-                btts_count = ((partidos_equipo['FTHG'] > 0) & (partidos_equipo['FTAG'] > 0)).sum()
-                over25_count = ((partidos_equipo['FTHG'] + partidos_equipo['FTAG']) > 2.5).sum()
-                btts_pct = (btts_count / total_partidos_equipo) * 100
-                over25_pct = (over25_count / total_partidos_equipo) * 100
-            else:
-                btts_pct = 0
-                over25_pct = 0
-        except Exception:
-            btts_pct = 0
-            over25_pct = 0
-        try:
-            goles_2t_list = []
-            if len(partidos_casa_global) > 0 and 'HTHG' in df.columns:
-                goles_2t_casa = (partidos_casa_global['FTHG'] - partidos_casa_global['HTHG']).dropna()
-                goles_2t_list.extend(goles_2t_casa.tolist())
-            if len(partidos_fuera_global) > 0 and 'HTAG' in df.columns:
-                goles_2t_fuera = (partidos_fuera_global['FTAG'] - partidos_fuera_global['HTAG']).dropna()
-                goles_2t_list.extend(goles_2t_fuera.tolist())
-            goles_2t_promedio = float(np.mean(goles_2t_list)) if len(goles_2t_list) > 0 else 0.0
-        except Exception:
-            goles_2t_promedio = 0.0
-        fuerzas[equipo].update({
-            'Eficiencia_Tiro_Casa_pct': eficiencia_casa,
-            'Eficiencia_Tiro_Fuera_pct': eficiencia_fuera,
-            'Eficiencia_Tiro_Promedio_pct': eficiencia_promedio,
-            'BTTS_pct': btts_pct,
-            'Over25_pct': over25_pct,
-            'Goles_2T_Promedio': goles_2t_promedio,
-        })
+    columnas = df.columns
+
+    # ========== ESTADÍSTICAS GLOBALES (un groupby por condición) ==========
+    goles_a_favor_casa_global = _media_por_equipo(df, 'HomeTeam', 'FTHG', equipos)
+    goles_en_contra_casa_global = _media_por_equipo(df, 'HomeTeam', 'FTAG', equipos)
+    goles_a_favor_fuera_global = _media_por_equipo(df, 'AwayTeam', 'FTAG', equipos)
+    goles_en_contra_fuera_global = _media_por_equipo(df, 'AwayTeam', 'FTHG', equipos)
+    ataque_casa_global = _ratio_liga(goles_a_favor_casa_global, promedio_goles_local_liga)
+    defensa_casa_global = _ratio_liga(goles_en_contra_casa_global, promedio_goles_visitante_liga)
+    ataque_fuera_global = _ratio_liga(goles_a_favor_fuera_global, promedio_goles_visitante_liga)
+    defensa_fuera_global = _ratio_liga(goles_en_contra_fuera_global, promedio_goles_local_liga)
+
+    # ========== FORMA RECIENTE (últimos 5 partidos, casa + fuera) ==========
+    # Vista "larga": una fila por (equipo, partido) con goles a favor/en contra.
+    # Orden: fecha y, en la misma fecha, partidos de casa antes que de fuera.
+    partidos_casa = pd.DataFrame({
+        'Equipo': df['HomeTeam'], 'Fecha': df['Date'], 'Tipo': 0,
+        'GF': df['FTHG'], 'GC': df['FTAG'],
+        'G2T': df['FTHG'] - df['HTHG'] if 'HTHG' in columnas else np.nan,
+    })
+    partidos_fuera = pd.DataFrame({
+        'Equipo': df['AwayTeam'], 'Fecha': df['Date'], 'Tipo': 1,
+        'GF': df['FTAG'], 'GC': df['FTHG'],
+        'G2T': df['FTAG'] - df['HTAG'] if 'HTAG' in columnas else np.nan,
+    })
+    partidos_largo = pd.concat([partidos_casa, partidos_fuera])
+    partidos_largo = partidos_largo[partidos_largo['Equipo'].isin(equipos)]
+    partidos_largo = partidos_largo.rename_axis('Orden').sort_values(['Fecha', 'Tipo', 'Orden'], kind='stable')
+
+    recientes = _forma_reciente(partidos_largo, equipos)
+    goles_favor_reciente = recientes['GF']
+    goles_contra_reciente = recientes['GC']
+    ataque_reciente = _ratio_liga(goles_favor_reciente, promedio_goles_local_liga)
+    defensa_reciente = _ratio_liga(goles_contra_reciente, promedio_goles_visitante_liga)
+    ataque_casa_final = (ataque_reciente * 0.6) + (ataque_casa_global * 0.4)
+    defensa_casa_final = (defensa_reciente * 0.6) + (defensa_casa_global * 0.4)
+    ataque_fuera_final = (ataque_reciente * 0.6) + (ataque_fuera_global * 0.4)
+    defensa_fuera_final = (defensa_reciente * 0.6) + (defensa_fuera_global * 0.4)
+
+    # Cálculo de CÓRNERS (ponderado 75% reciente + 25% histórico)
+    # DEFENSIVA: Verificar disponibilidad de columnas HC y AC
+    cero = pd.Series(0.0, index=equipos)
+    tiene_datos_corners = 'HC' in columnas and 'AC' in columnas
+    if tiene_datos_corners:
+        corners_casa_global = _media_por_equipo(df, 'HomeTeam', 'HC', equipos)
+        corners_fuera_global = _media_por_equipo(df, 'AwayTeam', 'AC', equipos)
+        corners_casa_contra = _media_por_equipo(df, 'HomeTeam', 'AC', equipos)
+        corners_fuera_contra = _media_por_equipo(df, 'AwayTeam', 'HC', equipos)
+    else:
+        corners_casa_global = corners_fuera_global = corners_casa_contra = corners_fuera_contra = cero
+
+    # Se usa el histórico como proxy del reciente
+    corners_casa_reciente = corners_casa_global
+    corners_fuera_reciente = corners_fuera_global
+    corners_casa = (corners_casa_reciente * 0.75) + (corners_casa_global * 0.25)
+    corners_fuera = (corners_fuera_reciente * 0.75) + (corners_fuera_global * 0.25)
+
+    tarjetas_am_casa = _media_por_equipo(df, 'HomeTeam', 'HY', equipos) if 'HY' in columnas else cero
+    tarjetas_am_fuera = _media_por_equipo(df, 'AwayTeam', 'AY', equipos) if 'AY' in columnas else cero
+    tarjetas_ro_casa = _media_por_equipo(df, 'HomeTeam', 'HR', equipos) if 'HR' in columnas else cero
+    tarjetas_ro_fuera = _media_por_equipo(df, 'AwayTeam', 'AR', equipos) if 'AR' in columnas else cero
+
+    # métricas adicionales
+    try:
+        hst_media_casa = _media_por_equipo(df, 'HomeTeam', 'HST', equipos) if 'HST' in columnas else cero
+        ast_media_fuera = _media_por_equipo(df, 'AwayTeam', 'AST', equipos) if 'AST' in columnas else cero
+        eficiencia_casa = ((goles_a_favor_casa_global / hst_media_casa) * 100).where(hst_media_casa > 0, 0)
+        eficiencia_fuera = ((goles_a_favor_fuera_global / ast_media_fuera) * 100).where(ast_media_fuera > 0, 0)
+        eficiencia_promedio = (eficiencia_casa + eficiencia_fuera) / 2
+    except Exception:
+        eficiencia_casa = eficiencia_fuera = eficiencia_promedio = cero
+    try:
+        por_equipo = partidos_largo.groupby('Equipo')
+        total_partidos_equipo = por_equipo.size().reindex(equipos, fill_value=0)
+        btts_count = ((partidos_largo['GF'] > 0) & (partidos_largo['GC'] > 0)).groupby(partidos_largo['Equipo']).sum()
+        over25_count = ((partidos_largo['GF'] + partidos_largo['GC']) > 2.5).groupby(partidos_largo['Equipo']).sum()
+        btts_pct = ((btts_count.reindex(equipos, fill_value=0) / total_partidos_equipo) * 100).where(total_partidos_equipo > 0, 0)
+        over25_pct = ((over25_count.reindex(equipos, fill_value=0) / total_partidos_equipo) * 100).where(total_partidos_equipo > 0, 0)
+    except Exception:
+        btts_pct = over25_pct = cero
+    try:
+        goles_2t_promedio = partidos_largo.groupby('Equipo')['G2T'].mean().reindex(equipos).fillna(0.0).astype(float)
+    except Exception:
+        goles_2t_promedio = cero
+
+    tabla = pd.DataFrame({
+        'Ataque_Casa': ataque_casa_final,
+        'Defensa_Casa': defensa_casa_final,
+        'Ataque_Fuera': ataque_fuera_final,
+        'Defensa_Fuera': defensa_fuera_final,
+        'Ataque_Casa_Global': ataque_casa_global,
+        'Defensa_Casa_Global': defensa_casa_global,
+        'Ataque_Fuera_Global': ataque_fuera_global,
+        'Defensa_Fuera_Global': defensa_fuera_global,
+        'Ataque_Reciente': ataque_reciente,
+        'Defensa_Reciente': defensa_reciente,
+        'Goles_Favor_Reciente': goles_favor_reciente,
+        'Goles_Contra_Reciente': goles_contra_reciente,
+        'Corners_Casa': corners_casa,
+        'Corners_Fuera': corners_fuera,
+        'Corners_Casa_Contra': corners_casa_contra,
+        'Corners_Fuera_Contra': corners_fuera_contra,
+        'Corners_Promedio': (corners_casa + corners_fuera) / 2,
+        'Tarjetas_Am_Casa': tarjetas_am_casa,
+        'Tarjetas_Am_Fuera': tarjetas_am_fuera,
+        'Tarjetas_Am_Promedio': (tarjetas_am_casa + tarjetas_am_fuera) / 2,
+        'Tarjetas_Ro_Casa': tarjetas_ro_casa,
+        'Tarjetas_Ro_Fuera': tarjetas_ro_fuera,
+        'Tarjetas_Ro_Promedio': (tarjetas_ro_casa + tarjetas_ro_fuera) / 2,
+        'Eficiencia_Tiro_Casa_pct': eficiencia_casa,
+        'Eficiencia_Tiro_Fuera_pct': eficiencia_fuera,
+        'Eficiencia_Tiro_Promedio_pct': eficiencia_promedio,
+        'BTTS_pct': btts_pct,
+        'Over25_pct': over25_pct,
+        'Goles_2T_Promedio': goles_2t_promedio,
+    }, index=equipos)
+    fuerzas = FuerzasSoA(equipos, {campo: tabla[campo].to_numpy(dtype=DTYPE_FUERZAS) for campo in tabla.columns})
     return fuerzas, promedio_goles_local_liga, promedio_goles_visitante_liga
 
 
-def predecir_partido(local, visitante, fuerzas, media_liga_local, media_liga_visitante):
-    if local not in fuerzas or visitante not in fuerzas:
-        return None
-    fuerza_ataque_local = fuerzas[local]['Ataque_Casa']
-    fuerza_defensa_visitante = fuerzas[visitante]['Defensa_Fuera']
-    lambda_local = fuerza_ataque_local * fuerza_defensa_visitante * media_liga_local
-    fuerza_ataque_visitante = fuerzas[visitante]['Ataque_Fuera']
-    fuerza_defensa_local = fuerzas[local]['Defensa_Casa']
-    lambda_visitante = fuerza_ataque_visitante * fuerza_defensa_local * media_liga_visitante
-    prob_local = [poisson.pmf(i, lambda_local) for i in range(6)]
-    prob_visitante = [poisson.pmf(i, lambda_visitante) for i in range(6)]
-    victoria_local = empate = victoria_visitante = 0
-    marcadores_exactos = []
-    for goles_l in range(6):
-        for goles_v in range(6):
-            prob = prob_local[goles_l] * prob_visitante[goles_v]
-            if goles_l > goles_v:
-                victoria_local += prob
-            elif goles_l == goles_v:
-                empate += prob
-            else:
-                victoria_visitante += prob
-            marcadores_exactos.append({'marcador': f'{goles_l}-{goles_v}', 'prob': prob})
-    marcadores_exactos.sort(key=lambda x: x['prob'], reverse=True)
-    top_3_marcadores = marcadores_exactos[:3]
-    
-    # ========== MERCADOS DE GOLES (Over/Under) ==========
-    # λ_total = λ_local + λ_visitante (suma de Poisson es Poisson)
-    lambda_total = lambda_local + lambda_visitante
-    
-    # Over/Under usando Poisson CDF (probabilidad acumulada)
-    # P(X > n) = 1 - P(X <= n)
-    over_15 = 1 - poisson.cdf(1, lambda_total)  # P(goles > 1.5) = P(goles >= 2)
-    over_25 = 1 - poisson.cdf(2, lambda_total)  # P(goles > 2.5) = P(goles >= 3)
-    under_35 = poisson.cdf(3, lambda_total)     # P(goles <= 3.5) = P(goles < 3.5)
-    
-    # ========== DOBLE OPORTUNIDAD ==========
-    prob_1x = victoria_local + empate  # Local o Empate
-    prob_x2 = empate + victoria_visitante  # Empate o Visitante
-    prob_12 = victoria_local + victoria_visitante  # Sin Empate (1 o 2)
-    
-    # ========== MERCADOS DE CÓRNERS (Corners Expected) ==========
-    # Calculamos lambdas de córners para cada equipo
-    # Córners Local: promedio de córners que saca en casa
-    # Córners Visitante: promedio de córners que saca fuera
-    # Esperamos que córners siga una distribución de Poisson
-    
-    corners_lambda_local = fuerzas[local]['Corners_Casa']  # Córners que saca local en casa
-    corners_lambda_vis = fuerzas[visitante]['Corners_Fuera']  # Córners que saca visitante fuera
-    
-    # Ajuste por capacidad defensiva (defensa que recibe córners)
-    # Si la defensa es fuerte, menos córners pueden llegar a ella
-    # Aplicamos factor defensivo simple (no es predicción perfecta, pero ayuda)
-    corners_lambda_total = corners_lambda_local + corners_lambda_vis
-    
-    # Mercados Over/Under usando Poisson CDF
-    over_85 = 1 - poisson.cdf(8, corners_lambda_total)    # P(córners > 8.5) = P(córners >= 9)
-    over_95 = 1 - poisson.cdf(9, corners_lambda_total)    # P(córners > 9.5) = P(córners >= 10)
-    under_105 = poisson.cdf(10, corners_lambda_total)      # P(córners <= 10.5) = P(córners < 10.5)
-    
-    # ========== GANADOR DE CÓRNERS (1X2 Corners) ==========
-    # Comparar lambdas para estimar quién saca más córners
-    # Calculamos probabilidad de que local saque más, empate, o visitante saque más
-    # Simplificación: si lambda_local > lambda_vis, hay más probabilidad de que local saque más
-    
-    # Para una aproximación simple, usamos la razón de lambdas
+# Goles por equipo considerados en la grilla de marcadores exactos (0..GOLES_MAX-1)
+GOLES_MAX = 6
+
+# log(k!) precalculado; alcanza para la grilla de goles y las líneas de córners (hasta 10)
+_LOG_FACT = np.array([math.lgamma(k + 1) for k in range(12)])
+
+
+def _poisson_pmf(mu, k_max):
+    """
+    P(X = k) de una Poisson para k = 0..k_max-1, evaluada con la tabla de log(k!).
+    `mu` es un array (M,); retorna una matriz (M, k_max).
+    """
+    k = np.arange(k_max)
+    mu = np.asarray(mu, dtype=float)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # k*log(mu) con 0*log(0) = 0, para que P(X=0 | mu=0) = 1
+        k_log_mu = np.where(k == 0, 0.0, k * np.log(mu))
+    return np.exp(k_log_mu - mu - _LOG_FACT[:k_max])
+
+
+@lru_cache(maxsize=None)
+def _kernel_batch_jit():
+    """
+    Import diferido del kernel Numba (numba tarda en importarse y solo hace
+    falta al predecir). Retorna None si Numba no está instalado.
+    """
+    from timba_core_jit import NUMBA_DISPONIBLE, predict_batch_kernel
+    return predict_batch_kernel if NUMBA_DISPONIBLE else None
+
+
+def _poisson_cdf(n, mu):
+    """P(X <= n) para cada mu del array."""
+    return _poisson_pmf(mu, n + 1).sum(axis=1)
+
+
+def _probabilidades_ganador_corners(corners_lambda_local, corners_lambda_vis):
+    """
+    Aproximación de quién saca más córners a partir de la razón de lambdas.
+    Retorna (prob_local_mas, prob_empate, prob_vis_mas).
+    """
     if corners_lambda_local > 0 and corners_lambda_vis > 0:
         ratio_corners = corners_lambda_local / corners_lambda_vis
         # Si ratio > 1.2, local saca más córners con alta probabilidad
         # Si ratio < 0.83, visitante saca más córners
         # Si 0.83 <= ratio <= 1.2, es más probable un empate técnico
-        
         if ratio_corners > 1.2:
-            prob_local_mas_corners = 0.65
-            prob_empate_corners = 0.25
-            prob_vis_mas_corners = 0.10
+            return 0.65, 0.25, 0.10
         elif ratio_corners < 0.83:
-            prob_local_mas_corners = 0.10
-            prob_empate_corners = 0.25
-            prob_vis_mas_corners = 0.65
+            return 0.10, 0.25, 0.65
         else:
-            prob_local_mas_corners = 0.35
-            prob_empate_corners = 0.40
-            prob_vis_mas_corners = 0.25
+            return 0.35, 0.40, 0.25
+    # Si no hay datos de córners, asumimos equilibrio
+    return 0.33, 0.34, 0.33
+
+
+def predecir_partidos_batch(pares, fuerzas, media_liga_local, media_liga_visitante):
+    """
+    Predice varios partidos a la vez.
+    `pares` es una lista de (local, visitante). Retorna una lista alineada con
+    `pares` con el mismo dict que `predecir_partido` (o None si falta algún equipo).
+    Las grillas de Poisson de todos los partidos se evalúan en un único
+    broadcast de NumPy en lugar de un loop por partido.
+    `fuerzas` puede ser un `FuerzasSoA` o el dict clásico por equipo.
+    """
+    resultados = [None] * len(pares)
+    validos = [i for i, (local, visitante) in enumerate(pares) if local in fuerzas and visitante in fuerzas]
+    if not validos:
+        return resultados
+    if not isinstance(fuerzas, FuerzasSoA):
+        fuerzas = FuerzasSoA.desde_dict(fuerzas)
+    idx_local = fuerzas.indices([pares[i][0] for i in validos])
+    idx_visitante = fuerzas.indices([pares[i][1] for i in validos])
+    locales = [fuerzas[pares[i][0]] for i in validos]
+    visitantes = [fuerzas[pares[i][1]] for i in validos]
+    # Las columnas se guardan en float32; el cálculo de probabilidades se hace en float64
+    def columna(campo, idx):
+        return fuerzas.columna(campo)[idx].astype(np.float64)
+
+    lambda_local = columna('Ataque_Casa', idx_local) * columna('Defensa_Fuera', idx_visitante) * media_liga_local
+    lambda_visitante = columna('Ataque_Fuera', idx_visitante) * columna('Defensa_Casa', idx_local) * media_liga_visitante
+
+    # ========== GRILLA DE MARCADORES (M, GOLES_MAX, GOLES_MAX) ==========
+    kernel_jit = _kernel_batch_jit()
+    if kernel_jit is not None:
+        victoria_local, empate, victoria_visitante, grilla = kernel_jit(
+            lambda_local, lambda_visitante, _LOG_FACT, GOLES_MAX
+        )
     else:
-        # Si no hay datos de córners, asumimos equilibrio
-        prob_local_mas_corners = 0.33
-        prob_empate_corners = 0.34
-        prob_vis_mas_corners = 0.33
-    
-    return {
-        'Goles_Esp_Local': lambda_local,
-        'Goles_Esp_Vis': lambda_visitante,
-        'Prob_Local': victoria_local,
-        'Prob_Empate': empate,
-        'Prob_Vis': victoria_visitante,
-        'Goles_Favor_Local': fuerzas[local]['Goles_Favor_Reciente'],
-        'Goles_Contra_Local': fuerzas[local]['Goles_Contra_Reciente'],
-        'Goles_Favor_Vis': fuerzas[visitante]['Goles_Favor_Reciente'],
-        'Goles_Contra_Vis': fuerzas[visitante]['Goles_Contra_Reciente'],
-        'Corners_Local': fuerzas[local]['Corners_Promedio'],
-        'Corners_Vis': fuerzas[visitante]['Corners_Promedio'],
-        'Tarjetas_Am_Local': fuerzas[local]['Tarjetas_Am_Promedio'],
-        'Tarjetas_Am_Vis': fuerzas[visitante]['Tarjetas_Am_Promedio'],
-        'Tarjetas_Ro_Local': fuerzas[local]['Tarjetas_Ro_Promedio'],
-        'Tarjetas_Ro_Vis': fuerzas[visitante]['Tarjetas_Ro_Promedio'],
-        'Eficiencia_Tiro_Local_pct': fuerzas[local].get('Eficiencia_Tiro_Promedio_pct', 0),
-        'Eficiencia_Tiro_Vis_pct': fuerzas[visitante].get('Eficiencia_Tiro_Promedio_pct', 0),
-        'BTTS_Local_pct': fuerzas[local].get('BTTS_pct', 0),
-        'BTTS_Vis_pct': fuerzas[visitante].get('BTTS_pct', 0),
-        'Over25_Local_pct': fuerzas[local].get('Over25_pct', 0),
-        'Over25_Vis_pct': fuerzas[visitante].get('Over25_pct', 0),
-        'Goles_2T_Local': fuerzas[local].get('Goles_2T_Promedio', 0),
-        'Goles_2T_Vis': fuerzas[visitante].get('Goles_2T_Promedio', 0),
-        'Top_3_Marcadores': top_3_marcadores,
-        # Mercados de goles
-        'Over_15': over_15,
-        'Over_25': over_25,
-        'Under_35': under_35,
-        # Doble oportunidad
-        'Prob_1X': prob_1x,
-        'Prob_X2': prob_x2,
-        'Prob_12': prob_12,
-        # Mercados de córners
-        'Corners_Lambda_Total': corners_lambda_total,
-        'Over_85': over_85,
-        'Over_95': over_95,
-        'Under_105': under_105,
-        'Prob_Local_Mas_Corners': prob_local_mas_corners,
-        'Prob_Empate_Corners': prob_empate_corners,
-        'Prob_Vis_Mas_Corners': prob_vis_mas_corners,
-    }
+        prob_local = _poisson_pmf(lambda_local, GOLES_MAX)
+        prob_visitante = _poisson_pmf(lambda_visitante, GOLES_MAX)
+        grilla = prob_local[:, :, None] * prob_visitante[:, None, :]
+        victoria_local = np.tril(grilla, k=-1).sum(axis=(1, 2))
+        empate = np.trace(grilla, axis1=1, axis2=2)
+        victoria_visitante = np.triu(grilla, k=1).sum(axis=(1, 2))
+    # Orden estable: ante empates se respeta el orden (goles_l, goles_v)
+    orden_marcadores = np.argsort(-grilla.reshape(len(validos), -1), axis=1, kind='stable')[:, :3]
+
+    # ========== MERCADOS DE GOLES (Over/Under) ==========
+    # λ_total = λ_local + λ_visitante (suma de Poisson es Poisson)
+    # P(X > n) = 1 - P(X <= n)
+    lambda_total = lambda_local + lambda_visitante
+    over_15 = 1 - _poisson_cdf(1, lambda_total)  # P(goles > 1.5) = P(goles >= 2)
+    over_25 = 1 - _poisson_cdf(2, lambda_total)  # P(goles > 2.5) = P(goles >= 3)
+    under_35 = _poisson_cdf(3, lambda_total)     # P(goles <= 3.5) = P(goles < 3.5)
+
+    # ========== MERCADOS DE CÓRNERS (Corners Expected) ==========
+    # Córners Local: promedio de córners que saca en casa
+    # Córners Visitante: promedio de córners que saca fuera
+    corners_lambda_local = columna('Corners_Casa', idx_local)
+    corners_lambda_vis = columna('Corners_Fuera', idx_visitante)
+    corners_lambda_total = corners_lambda_local + corners_lambda_vis
+    over_85 = 1 - _poisson_cdf(8, corners_lambda_total)    # P(córners > 8.5) = P(córners >= 9)
+    over_95 = 1 - _poisson_cdf(9, corners_lambda_total)    # P(córners > 9.5) = P(córners >= 10)
+    under_105 = _poisson_cdf(10, corners_lambda_total)      # P(córners <= 10.5) = P(córners < 10.5)
+
+    for m, i in enumerate(validos):
+        local, visitante = pares[i]
+        fl, fv = locales[m], visitantes[m]
+        top_3_marcadores = [
+            {'marcador': f'{celda // GOLES_MAX}-{celda % GOLES_MAX}', 'prob': grilla[m].flat[celda]}
+            for celda in orden_marcadores[m]
+        ]
+        prob_local_mas_corners, prob_empate_corners, prob_vis_mas_corners = _probabilidades_ganador_corners(
+            corners_lambda_local[m], corners_lambda_vis[m]
+        )
+        resultados[i] = {
+            'Goles_Esp_Local': lambda_local[m],
+            'Goles_Esp_Vis': lambda_visitante[m],
+            'Prob_Local': victoria_local[m],
+            'Prob_Empate': empate[m],
+            'Prob_Vis': victoria_visitante[m],
+            'Goles_Favor_Local': fl['Goles_Favor_Reciente'],
+            'Goles_Contra_Local': fl['Goles_Contra_Reciente'],
+            'Goles_Favor_Vis': fv['Goles_Favor_Reciente'],
+            'Goles_Contra_Vis': fv['Goles_Contra_Reciente'],
+            'Corners_Local': fl['Corners_Promedio'],
+            'Corners_Vis': fv['Corners_Promedio'],
+            'Tarjetas_Am_Local': fl['Tarjetas_Am_Promedio'],
+            'Tarjetas_Am_Vis': fv['Tarjetas_Am_Promedio'],
+            'Tarjetas_Ro_Local': fl['Tarjetas_Ro_Promedio'],
+            'Tarjetas_Ro_Vis': fv['Tarjetas_Ro_Promedio'],
+            'Eficiencia_Tiro_Local_pct': fl.get('Eficiencia_Tiro_Promedio_pct', 0),
+            'Eficiencia_Tiro_Vis_pct': fv.get('Eficiencia_Tiro_Promedio_pct', 0),
+            'BTTS_Local_pct': fl.get('BTTS_pct', 0),
+            'BTTS_Vis_pct': fv.get('BTTS_pct', 0),
+            'Over25_Local_pct': fl.get('Over25_pct', 0),
+            'Over25_Vis_pct': fv.get('Over25_pct', 0),
+            'Goles_2T_Local': fl.get('Goles_2T_Promedio', 0),
+            'Goles_2T_Vis': fv.get('Goles_2T_Promedio', 0),
+            'Top_3_Marcadores': top_3_marcadores,
+            # Mercados de goles
+            'Over_15': over_15[m],
+            'Over_25': over_25[m],
+            'Under_35': under_35[m],
+            # Doble oportunidad
+            'Prob_1X': victoria_local[m] + empate[m],  # Local o Empate
+            'Prob_X2': empate[m] + victoria_visitante[m],  # Empate o Visitante
+            'Prob_12': victoria_local[m] + victoria_visitante[m],  # Sin Empate (1 o 2)
+            # Mercados de córners
+            'Corners_Lambda_Total': corners_lambda_total[m],
+            'Over_85': over_85[m],
+            'Over_95': over_95[m],
+            'Under_105': under_105[m],
+            'Prob_Local_Mas_Corners': prob_local_mas_corners,
+            'Prob_Empate_Corners': prob_empate_corners,
+            'Prob_Vis_Mas_Corners': prob_vis_mas_corners,
+        }
+    return resultados
+
+
+def predecir_partido(local, visitante, fuerzas, media_liga_local, media_liga_visitante):
+    return predecir_partidos_batch([(local, visitante)], fuerzas, media_liga_local, media_liga_visitante)[0]
 
 
 def obtener_h2h(local, visitante, df):
@@ -633,3 +936,56 @@ def obtener_h2h(local, visitante, df):
     except:
         pass
     return h2h
+
+
+def _clave_h2h(equipo_a, equipo_b):
+    """Clave del índice H2H: el par de equipos sin orden (local/visitante)."""
+    return (equipo_a, equipo_b) if equipo_a <= equipo_b else (equipo_b, equipo_a)
+
+
+def construir_indice_h2h(df):
+    """
+    Agrupa los partidos por par de equipos (sin importar quién fue local)
+    en una sola pasada sobre df.
+    Retorna dict[(equipo_a, equipo_b)] -> DataFrame con esos partidos, con
+    equipo_a <= equipo_b (ver `_clave_h2h`).
+    Se usa con `obtener_h2h_indexado` para evitar escanear df en cada partido.
+    """
+    if df is None or df.empty:
+        return {}
+    df = df[df['HomeTeam'].notna() & df['AwayTeam'].notna()]
+    casa = df['HomeTeam'].to_numpy(dtype=object)
+    fuera = df['AwayTeam'].to_numpy(dtype=object)
+    local_primero = casa <= fuera
+    par_a = np.where(local_primero, casa, fuera)
+    par_b = np.where(local_primero, fuera, casa)
+    return {clave: grupo for clave, grupo in df.groupby([par_a, par_b], sort=False)}
+
+
+def obtener_h2h_indexado(local, visitante, indice_h2h):
+    """
+    Igual que `obtener_h2h`, pero consulta el índice de `construir_indice_h2h`
+    (una búsqueda O(1) cubre ambas localías) en lugar de filtrar el DataFrame completo.
+    """
+    partidos = indice_h2h.get(_clave_h2h(local, visitante))
+    if partidos is None:
+        return []
+    # Como en `obtener_h2h`: primero los partidos con `local` en casa, luego los invertidos
+    directos, invertidos = [], []
+    for fecha, casa, goles_casa, goles_fuera in zip(partidos['Date'], partidos['HomeTeam'], partidos['FTHG'], partidos['FTAG']):
+        if casa == local:
+            try:
+                directos.append({'Fecha': fecha, 'Local': local, 'Visitante': visitante, 'Goles_Local': int(goles_casa), 'Goles_Visitante': int(goles_fuera)})
+            except:
+                pass
+        if casa == visitante:
+            try:
+                invertidos.append({'Fecha': fecha, 'Local': local, 'Visitante': visitante, 'Goles_Local': int(goles_fuera), 'Goles_Visitante': int(goles_casa)})
+            except:
+                pass
+    h2h = directos + invertidos
+    try:
+        h2h.sort(key=lambda x: pd.to_datetime(x['Fecha']), reverse=True)
+    except:
+        pass
+    return h2h
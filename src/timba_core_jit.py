@@ -0,0 +1,71 @@
+"""
+Kernels compilados con Numba para la grilla de Poisson de `timba_core`.
+
+Numba es opcional: si no está instalado, NUMBA_DISPONIBLE es False y
+`timba_core.predecir_partidos_batch` usa la versión NumPy equivalente.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    NUMBA_DISPONIBLE = False
+
+
+if NUMBA_DISPONIBLE:
+
+    @njit(cache=True)
+    def predict_kernel(mu_h, mu_a, log_fact, K):
+        """
+        Grilla de marcadores (K, K) de un partido y sus probabilidades 1X2.
+        Retorna (p_local, p_empate, p_visitante, grilla).
+        """
+        prob_h = np.empty(K)
+        prob_a = np.empty(K)
+        for k in range(K):
+            if k == 0:
+                prob_h[k] = np.exp(-mu_h)
+                prob_a[k] = np.exp(-mu_a)
+            else:
+                prob_h[k] = np.exp(k * np.log(mu_h) - mu_h - log_fact[k])
+                prob_a[k] = np.exp(k * np.log(mu_a) - mu_a - log_fact[k])
+
+        grilla = np.empty((K, K))
+        p_local = 0.0
+        p_empate = 0.0
+        p_visitante = 0.0
+        for goles_l in range(K):
+            for goles_v in range(K):
+                prob = prob_h[goles_l] * prob_a[goles_v]
+                grilla[goles_l, goles_v] = prob
+                if goles_l > goles_v:
+                    p_local += prob
+                elif goles_l == goles_v:
+                    p_empate += prob
+                else:
+                    p_visitante += prob
+        return p_local, p_empate, p_visitante, grilla
+
+    # parallel=True no compensa para fechas de ~10-40 partidos con grillas de 6x6
+    # (el arranque del pool domina) y con la capa TBB el proceso de Streamlit
+    # quedaba colgado al salir; el loop serial compilado alcanza.
+    @njit(cache=True)
+    def predict_batch_kernel(mu_h, mu_a, log_fact, K):
+        """
+        Versión batch de `predict_kernel` (un partido por iteración).
+        Retorna (p_local, p_empate, p_visitante) de forma (M,) y grillas (M, K, K).
+        """
+        M = mu_h.shape[0]
+        p_local = np.empty(M)
+        p_empate = np.empty(M)
+        p_visitante = np.empty(M)
+        grillas = np.empty((M, K, K))
+        for m in range(M):
+            p_local[m], p_empate[m], p_visitante[m], grillas[m] = predict_kernel(mu_h[m], mu_a[m], log_fact, K)
+        return p_local, p_empate, p_visitante, grillas
+
+else:
+    predict_kernel = None
+    predict_batch_kernel = None
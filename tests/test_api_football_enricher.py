@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Tests de APIFootballClient con una sesión HTTP falsa (sin red):
+cuota contada localmente (reserva, devolución, resincronización con /status
+y persistencia en daily_quota) y coalescing de requests idénticos en vuelo.
+
+Uso:
+    pytest tests/test_api_football_enricher.py -v
+"""
+
+import unittest
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import requests
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+# api_football_enricher registra un FileHandler en logs/ al importarse
+Path('logs').mkdir(exist_ok=True)
+
+import api_football_enricher
+from api_football_enricher import DAILY_LIMIT, APIFootballCache, APIFootballClient
+
+API_KEY = "test-api-key-123456"
+
+
+def _response(status_code, payload):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+class FakeSession:
+    """
+    Sesión HTTP falsa: /status responde con `requests_remaining` y el resto
+    de endpoints con `status_code` (payload con el endpoint y los params).
+    `bloqueo`, si está, detiene cada request de endpoint hasta que se setee.
+    """
+
+    def __init__(self, requests_remaining=DAILY_LIMIT):
+        self.headers = {}
+        self.requests_remaining = requests_remaining
+        self.status_code = 200
+        self.bloqueo = None
+        self.status_calls = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        if url.endswith("/status"):
+            with self._lock:
+                self.status_calls += 1
+            return _response(200, {"response": {
+                "requests": DAILY_LIMIT - self.requests_remaining,
+                "requests_remaining": self.requests_remaining,
+            }})
+
+        with self._lock:
+            self.calls.append((url, params))
+        if self.bloqueo is not None:
+            self.bloqueo.wait(timeout=10)
+        return _response(self.status_code, {"endpoint": url, "params": params})
+
+    def close(self):
+        pass
+
+
+class ClientTestCase(unittest.TestCase):
+    """Base: clientes con caché SQLite temporal y sesión falsa"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = f"{tmp.name}/api_football_cache.db"
+        nivel = api_football_enricher.logger.level
+        api_football_enricher.logger.setLevel(logging.CRITICAL)
+        self.addCleanup(api_football_enricher.logger.setLevel, nivel)
+
+    def _client(self, session):
+        with patch.object(api_football_enricher, 'APIFootballCache',
+                          lambda: APIFootballCache(db_path=self.db_path)):
+            client = APIFootballClient(API_KEY)
+        client.session.close()
+        client.session = session
+        self.addCleanup(client.close)
+        return client
+
+    @staticmethod
+    def _hoy():
+        return datetime.now(timezone.utc).date()
+
+
+class TestCuotaLocal(ClientTestCase):
+    """_cuota_disponible / _request: reserva local de cuota"""
+
+    def test_reserva_local_sin_status_por_request(self):
+        """Solo el primer request consulta /status; el resto descuenta localmente"""
+        session = FakeSession(requests_remaining=DAILY_LIMIT)
+        client = self._client(session)
+
+        for fixture_id in range(3):
+            client.request("/fixtures", {"id": fixture_id})
+
+        self.assertEqual(session.status_calls, 1)
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(client._quota_remaining, DAILY_LIMIT - 3)
+        self.assertEqual(client.cache.get_daily_quota(self._hoy()), 3)
+
+    def test_daily_quota_persistida(self):
+        """Un cliente nuevo retoma el contador de daily_quota sin llamar a /status"""
+        client = self._client(FakeSession())
+        client.request("/fixtures", {"id": 1})
+        client.request("/fixtures", {"id": 2}, cost=2)
+        client.close()
+
+        session = FakeSession()
+        nuevo = self._client(session)
+        self.assertEqual(nuevo._cuota_disponible(), DAILY_LIMIT - 3)
+        self.assertEqual(session.status_calls, 0)
+
+    def test_devolucion_en_error(self):
+        """Un error HTTP (no de cuota) devuelve la cuota reservada"""
+        session = FakeSession(requests_remaining=50)
+        client = self._client(session)
+        session.status_code = 500
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.request("/fixtures", {"id": 1})
+
+        self.assertEqual(client._quota_remaining, 50)
+        self.assertEqual(session.status_calls, 1)
+        self.assertEqual(client.cache.get_daily_quota(self._hoy()), DAILY_LIMIT - 50)
+
+    def test_429_resincroniza(self):
+        """Un 429 fuerza /status (aunque siga dentro del TTL) y persiste el valor nuevo"""
+        session = FakeSession(requests_remaining=50)
+        client = self._client(session)
+        client.request("/fixtures", {"id": 1})
+        self.assertEqual(client._quota_remaining, 49)
+
+        # La API contó más llamadas que el contador local
+        session.status_code = 429
+        session.requests_remaining = 10
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.request("/fixtures", {"id": 2})
+
+        self.assertEqual(session.status_calls, 2)
+        self.assertEqual(client._quota_remaining, 10)
+        self.assertEqual(client.cache.get_daily_quota(self._hoy()), DAILY_LIMIT - 10)
+
+    def test_cuota_agotada(self):
+        """Sin cuota no se llega a hacer la llamada HTTP"""
+        session = FakeSession(requests_remaining=0)
+        client = self._client(session)
+
+        with self.assertRaisesRegex(Exception, "Cuota diaria agotada"):
+            client.request("/fixtures", {"id": 1})
+        self.assertEqual(session.calls, [])
+
+    def test_cuota_insuficiente(self):
+        """Un request más caro que la cuota restante no reserva nada"""
+        session = FakeSession(requests_remaining=1)
+        client = self._client(session)
+
+        with self.assertRaisesRegex(Exception, "Cuota insuficiente"):
+            client.request("/fixtures", {"id": 1}, cost=2)
+        self.assertEqual(client._quota_remaining, 1)
+        self.assertEqual(session.calls, [])
+
+    def test_reserva_concurrente(self):
+        """Con requests en vuelo a la vez no se gasta más cuota de la disponible"""
+        session = FakeSession(requests_remaining=5)
+        session.bloqueo = threading.Event()
+        client = self._client(session)
+        client._cuota_disponible()
+
+        errores = []
+
+        def pedir(fixture_id):
+            try:
+                client.request("/fixtures", {"id": fixture_id})
+            except Exception as e:
+                errores.append(e)
+
+        hilos = [threading.Thread(target=pedir, args=(i,)) for i in range(10)]
+        for hilo in hilos:
+            hilo.start()
+        # Los 5 sin cuota fallan sin esperar al HTTP; los otros 5 siguen en vuelo
+        for _ in range(500):
+            if len(errores) == 5:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(errores), 5)
+        session.bloqueo.set()
+        for hilo in hilos:
+            hilo.join(timeout=10)
+
+        self.assertEqual(len(session.calls), 5)
+        self.assertTrue(all("Cuota diaria agotada" in str(e) for e in errores))
+        self.assertEqual(client._quota_remaining, 0)
+        self.assertEqual(client.cache.get_daily_quota(self._hoy()), DAILY_LIMIT)
+
+
+class FutureContador(Future):
+    """Future que avisa cuando alguien empieza a esperar su resultado"""
+
+    esperando = None  # threading.Semaphore, se asigna en cada test
+
+    def result(self, timeout=None):
+        self.esperando.release()
+        return super().result(timeout)
+
+
+class TestCoalescing(ClientTestCase):
+    """request: N requests idénticos en vuelo comparten una llamada HTTP"""
+
+    N = 8
+
+    def _pedir_en_paralelo(self, client, session, params):
+        """
+        Lanza N requests idénticos; libera la llamada HTTP solo cuando el
+        dueño está dentro de ella y los N - 1 restantes esperan su Future.
+        Retorna (resultados, errores) por hilo.
+        """
+        session.bloqueo = threading.Event()
+        FutureContador.esperando = threading.Semaphore(0)
+        resultados = [None] * self.N
+        errores = [None] * self.N
+
+        def pedir(i):
+            try:
+                resultados[i] = client.request("/predictions", dict(params))
+            except Exception as e:
+                errores[i] = e
+
+        with patch.object(api_football_enricher, 'Future', FutureContador):
+            hilos = [threading.Thread(target=pedir, args=(i,)) for i in range(self.N)]
+            for hilo in hilos:
+                hilo.start()
+            for _ in range(self.N - 1):
+                self.assertTrue(FutureContador.esperando.acquire(timeout=10))
+            session.bloqueo.set()
+            for hilo in hilos:
+                hilo.join(timeout=10)
+        return resultados, errores
+
+    def test_una_llamada_para_n_requests(self):
+        """N requests idénticos: una llamada HTTP, una unidad de cuota, el mismo dict"""
+        session = FakeSession()
+        client = self._client(session)
+
+        resultados, errores = self._pedir_en_paralelo(client, session, {"fixture": 7})
+
+        self.assertEqual(errores, [None] * self.N)
+        self.assertEqual(len(session.calls), 1)
+        self.assertTrue(all(r is resultados[0] for r in resultados))
+        self.assertEqual(resultados[0]["params"], {"fixture": 7})
+        self.assertEqual(client._quota_remaining, DAILY_LIMIT - 1)
+        self.assertEqual(client._inflight, {})
+
+        # Terminado el request, el siguiente idéntico vuelve a llamar
+        client.request("/predictions", {"fixture": 7})
+        self.assertEqual(len(session.calls), 2)
+
+    def test_excepcion_del_dueno_llega_a_todos(self):
+        """Si la llamada del dueño falla, todos los que esperan reciben su excepción"""
+        session = FakeSession()
+        client = self._client(session)
+        session.status_code = 500
+
+        resultados, errores = self._pedir_en_paralelo(client, session, {"fixture": 7})
+
+        self.assertEqual(resultados, [None] * self.N)
+        self.assertEqual(len(session.calls), 1)
+        self.assertIsInstance(errores[0], requests.exceptions.HTTPError)
+        self.assertTrue(all(e is errores[0] for e in errores))
+        self.assertEqual(client._quota_remaining, DAILY_LIMIT)
+        self.assertEqual(client._inflight, {})
+
+    def test_params_distintos_no_se_comparten(self):
+        """Endpoint o params distintos son requests distintos"""
+        session = FakeSession()
+        client = self._client(session)
+
+        client.request("/predictions", {"fixture": 7})
+        client.request("/predictions", {"fixture": 8})
+        client.request("/fixtures", {"fixture": 7})
+        # params no hashables: sin coalescing, pero el request se hace igual
+        client.request("/fixtures", {"ids": [1, 2]})
+
+        self.assertEqual(len(session.calls), 4)
+        self.assertEqual(client._quota_remaining, DAILY_LIMIT - 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
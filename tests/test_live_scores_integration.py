@@ -34,6 +34,7 @@ from live_scores import (
     LiveScoresManager,
     MatchSnapshot,
     MatchChangeDetection,
+    SnapshotStore,
     MatchEvent,
     DefaultCallbacks,
 )
@@ -361,6 +362,139 @@ class TestMatchChangeDetection(unittest.TestCase):
         self.assertEqual(len(events), 5)
 
 
+class TestSnapshotStore(unittest.TestCase):
+    """Tests para SnapshotStore (mismo comportamiento que un dict de MatchSnapshot)"""
+
+    def _snapshot(self, match_id, **cambios):
+        datos = dict(
+            match_id=match_id,
+            home_team=f'Team {match_id % 7}',
+            away_team=f'Team {(match_id + 3) % 7}',
+            status=('LIVE', 'FINISHED', 'SCHEDULED')[match_id % 3],
+            home_score=match_id % 4,
+            away_score=match_id % 3,
+            timestamp=1700000000.0 + match_id,
+            competition=('PL', 'PD')[match_id % 2],
+            minute=match_id % 90,
+            second_half=bool(match_id % 2),
+            home_possession=40.0 + match_id % 20,
+        )
+        datos.update(cambios)
+        return MatchSnapshot(**datos)
+
+    def _assert_igual_a_dict(self, store, referencia):
+        """Contenido y agregados del store contra un dict de MatchSnapshot"""
+        self.assertEqual(len(store), len(referencia))
+        self.assertEqual(set(store), set(referencia))
+        for match_id, snapshot in referencia.items():
+            self.assertEqual(store[match_id], snapshot)
+
+        estados = {}
+        goles_equipo = {}
+        for snapshot in referencia.values():
+            estados[snapshot.status] = estados.get(snapshot.status, 0) + 1
+            goles_equipo[snapshot.home_team] = goles_equipo.get(snapshot.home_team, 0) + snapshot.home_score
+            goles_equipo[snapshot.away_team] = goles_equipo.get(snapshot.away_team, 0) + snapshot.away_score
+        self.assertEqual(store.conteo_por_estado(), estados)
+        self.assertEqual(
+            store.goles_totales(),
+            sum(s.home_score + s.away_score for s in referencia.values())
+        )
+
+        goles_id = store.goles_por_equipo_id()
+        for nombre, goles in goles_equipo.items():
+            self.assertEqual(goles_id[store.team_id(nombre)], goles)
+        # Equipos que ya no tienen partidos quedan con 0 goles
+        for nombre in store.nombres_equipos:
+            self.assertEqual(goles_id[store.team_id(nombre)], goles_equipo.get(nombre, 0))
+
+    def test_round_trip_campos_none(self):
+        """set/get conserva los campos opcionales en None"""
+        store = SnapshotStore()
+        snapshot = self._snapshot(1, minute=None, second_half=None, home_possession=None)
+        store[1] = snapshot
+
+        leido = store[1]
+        self.assertEqual(leido, snapshot)
+        self.assertIsNone(leido.minute)
+        self.assertIsNone(leido.second_half)
+        self.assertIsNone(leido.home_possession)
+
+    def test_round_trip_valores_falsy(self):
+        """minute=0 y second_half=False no se confunden con None"""
+        store = SnapshotStore()
+        snapshot = self._snapshot(2, minute=0, second_half=False, home_possession=0.0)
+        store[2] = snapshot
+        self.assertEqual(store[2], snapshot)
+
+    def test_update(self):
+        """Reasignar un match_id actualiza la fila sin duplicarla"""
+        store = SnapshotStore()
+        store[5] = self._snapshot(5)
+        actualizado = self._snapshot(5, home_score=3, status='FINISHED',
+                                     minute=None, second_half=None, home_possession=None)
+        store[5] = actualizado
+
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store[5], actualizado)
+        self._assert_igual_a_dict(store, {5: actualizado})
+
+    def test_delete_fila_intermedia(self):
+        """Borrar una fila del medio mueve la última al hueco"""
+        store = SnapshotStore()
+        referencia = {}
+        for match_id in range(10, 20):
+            store[match_id] = referencia[match_id] = self._snapshot(match_id)
+
+        del store[13]
+        del referencia[13]
+        self._assert_igual_a_dict(store, referencia)
+        self.assertNotIn(13, store)
+        with self.assertRaises(KeyError):
+            store[13]
+
+        # Borrar la última fila (sin mover nada) y reinsertar
+        del store[19]
+        del referencia[19]
+        store[13] = referencia[13] = self._snapshot(13, home_score=5)
+        self._assert_igual_a_dict(store, referencia)
+
+    def test_crecimiento(self):
+        """Superar CAPACIDAD_INICIAL duplica las columnas sin perder filas"""
+        store = SnapshotStore()
+        referencia = {}
+        n = SnapshotStore.CAPACIDAD_INICIAL * 2 + 5
+        for match_id in range(1, n + 1):
+            store[match_id] = referencia[match_id] = self._snapshot(match_id)
+
+        self.assertGreaterEqual(len(store._cols['match_id']), n)
+        self._assert_igual_a_dict(store, referencia)
+
+    def test_operaciones_aleatorias(self):
+        """Secuencia aleatoria de altas, cambios y bajas contra un dict"""
+        import random
+
+        rng = random.Random(42)
+        store = SnapshotStore(capacidad=4)
+        referencia = {}
+        for _ in range(600):
+            match_id = rng.randint(1, 120)
+            if match_id in referencia and rng.random() < 0.35:
+                del store[match_id]
+                del referencia[match_id]
+            else:
+                snapshot = self._snapshot(
+                    match_id,
+                    home_score=rng.randint(0, 6),
+                    away_score=rng.randint(0, 6),
+                    minute=rng.choice([None, 0, 44, 90]),
+                    second_half=rng.choice([None, False, True]),
+                    home_possession=rng.choice([None, 0.0, 55.5]),
+                )
+                store[match_id] = referencia[match_id] = snapshot
+        self._assert_igual_a_dict(store, referencia)
+
+
 class TestLiveScoresManager(unittest.TestCase):
     """Tests para LiveScoresManager"""
     
@@ -535,6 +669,7 @@ def run_tests_verbose():
     suite.addTests(loader.loadTestsFromTestCase(TestFootballDataClient))
     suite.addTests(loader.loadTestsFromTestCase(TestMatchSnapshot))
     suite.addTests(loader.loadTestsFromTestCase(TestMatchChangeDetection))
+    suite.addTests(loader.loadTestsFromTestCase(TestSnapshotStore))
     suite.addTests(loader.loadTestsFromTestCase(TestLiveScoresManager))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegrationScenarios))
     
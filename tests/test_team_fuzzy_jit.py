@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests de paridad de team_fuzzy_jit contra rapidfuzz.
+
+`token_set_ratio_matrix` y `default_process` tienen que dar exactamente los
+mismos resultados que rapidfuzz, porque team_normalization usa uno u otro
+según esté instalado.
+
+Uso:
+    pytest tests/test_team_fuzzy_jit.py -v
+"""
+
+import unittest
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from team_fuzzy_jit import default_process, token_set_ratio_matrix
+
+try:
+    from rapidfuzz import fuzz, process
+    from rapidfuzz.utils import default_process as rf_default_process
+    RAPIDFUZZ_DISPONIBLE = True
+except ImportError:
+    RAPIDFUZZ_DISPONIBLE = False
+
+
+NOMBRES = [
+    "Atlético_Madrid",
+    "Atletico Madrid",
+    "madrid madrid",
+    "Real_Madrid C.F.",
+    "Man. United",
+    "Manchester_United_FC",
+    "Paris Saint-Germain",
+    "PSG",
+    "Borussia M'gladbach",
+    "1. FC Köln",
+    "FC__Köln",
+    "Newell's Old Boys",
+    "Club Atlético Vélez Sarsfield",
+    "Vélez-Sarsfield",
+    "  _Boca__Juniors_  ",
+    "Boca Juniors",
+    "São Paulo (SP)",
+    "Sao_Paulo",
+    "",
+    "___",
+]
+
+
+@unittest.skipUnless(RAPIDFUZZ_DISPONIBLE, "rapidfuzz no instalado")
+class TestParidadRapidfuzz(unittest.TestCase):
+    """token_set_ratio_matrix / default_process vs rapidfuzz"""
+
+    def test_default_process(self):
+        """Mismo preprocesado, incluidos '_' y puntuación"""
+        for nombre in NOMBRES:
+            self.assertEqual(default_process(nombre), rf_default_process(nombre), nombre)
+
+    def test_guion_bajo(self):
+        """'_' separa tokens igual que en rapidfuzz"""
+        ours = token_set_ratio_matrix(["Atlético_Madrid"], ["madrid madrid"])
+        self.assertEqual(ours[0, 0], 100.0)
+
+    def test_matriz_nombres(self):
+        """Todos los pares de NOMBRES contra rapidfuzz cdist"""
+        ours = token_set_ratio_matrix(NOMBRES, NOMBRES)
+        ref = process.cdist(NOMBRES, NOMBRES, scorer=fuzz.token_set_ratio,
+                            processor=rf_default_process)
+        np.testing.assert_allclose(ours, ref, atol=1e-4)
+
+    def test_matriz_aleatoria(self):
+        """Nombres aleatorios con separadores mezclados"""
+        rng = random.Random(1234)
+        tokens = ["real", "madrid", "atlético", "fc", "club", "united", "köln", "sp", "1"]
+        separadores = [" ", "_", "-", ".", "'", "__", " _ ", "/"]
+
+        def nombre_aleatorio():
+            partes = [rng.choice(tokens) for _ in range(rng.randint(1, 4))]
+            nombre = partes[0]
+            for parte in partes[1:]:
+                nombre += rng.choice(separadores) + parte
+            return nombre.upper() if rng.random() < 0.2 else nombre
+
+        a = [nombre_aleatorio() for _ in range(40)]
+        b = [nombre_aleatorio() for _ in range(30)]
+        ours = token_set_ratio_matrix(a, b)
+        ref = process.cdist(a, b, scorer=fuzz.token_set_ratio,
+                            processor=rf_default_process)
+        np.testing.assert_allclose(ours, ref, atol=1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests de TeamNormalizer.normalize_teams_batch: tiene que dar el mismo
+resultado que llamar a normalize_team por cada nombre, en orden.
+
+Uso:
+    pytest tests/test_team_normalization.py -v
+"""
+
+import unittest
+import random
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Agregar src y la raíz al path (team_normalization importa src.team_fuzzy_jit).
+# Con los dos, el caché de Numba de team_fuzzy_jit carga bajo cualquiera de
+# los dos nombres del módulo.
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.team_normalization as team_normalization
+from src.team_normalization import TeamNormalizer
+from src.team_fuzzy_jit import token_set_ratio_matrix
+
+
+# Tokens compartidos entre nombres: hay muchos empates a 100 de token_set_ratio
+# (un nombre cuyos tokens contienen a los de dos candidatos distintos)
+TOKENS = [
+    "real", "atlético", "united", "city", "rovers", "club", "sporting",
+    "madrid", "boca", "juniors", "river", "plate", "fc", "inter", "milan",
+]
+
+
+def _nombre_aleatorio(rng, max_tokens=3):
+    nombre = " ".join(rng.sample(TOKENS, rng.randint(1, max_tokens)))
+    variante = rng.random()
+    if variante < 0.15:
+        nombre = nombre.upper()
+    elif variante < 0.3:
+        nombre = nombre.title() + "."
+    elif variante < 0.4:
+        nombre = nombre.replace(" ", "_")
+    return nombre
+
+
+class TestNormalizeTeamsBatch(unittest.TestCase):
+    """normalize_teams_batch vs normalize_team secuencial, en BDs temporales"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._n_db = 0
+        nivel = team_normalization.logger.level
+        team_normalization.logger.setLevel(logging.ERROR)
+        self.addCleanup(team_normalization.logger.setLevel, nivel)
+        self.addCleanup(self._tmp.cleanup)
+
+    def _normalizer(self, equipos):
+        self._n_db += 1
+        normalizer = TeamNormalizer(db_path=f"{self._tmp.name}/teams_{self._n_db}.db")
+        if equipos:
+            normalizer.add_teams_bulk([(nombre, "Unknown", None) for nombre in equipos])
+        return normalizer
+
+    def _comparar(self, equipos, nombres, source=None, external_ids=None, create_if_missing=True):
+        """
+        Corre el lote y la versión secuencial sobre BDs con los mismos equipos
+        y compara los resultados por nombre oficial (los UUIDs son aleatorios).
+        """
+        lote = self._normalizer(equipos)
+        secuencial = self._normalizer(equipos)
+
+        res_lote = lote.normalize_teams_batch(nombres, source, external_ids, create_if_missing)
+        ids = external_ids or [None] * len(nombres)
+        res_secuencial = [
+            secuencial.normalize_team(nombre, source, ext_id, create_if_missing)
+            for nombre, ext_id in zip(nombres, ids)
+        ]
+
+        def oficial(normalizer, uuid_val):
+            return None if uuid_val is None else normalizer.get_team(uuid_val)['official_name']
+
+        self.assertEqual(len(res_lote), len(nombres))
+        for nombre, (u_lote, s_lote), (u_sec, s_sec) in zip(nombres, res_lote, res_secuencial):
+            self.assertEqual(oficial(lote, u_lote), oficial(secuencial, u_sec), nombre)
+            self.assertAlmostEqual(s_lote, s_sec, places=6, msg=nombre)
+        self.assertEqual(
+            [t['official_name'] for t in lote.get_all_teams()],
+            [t['official_name'] for t in secuencial.get_all_teams()],
+        )
+        self.assertEqual(lote._fuzzy_names, secuencial._fuzzy_names)
+        return lote, res_lote
+
+    def test_empate_precalculado_vs_creado_en_lote(self):
+        """Empate a 100 entre un candidato previo y uno creado en el lote: gana el previo"""
+        nombres = ["Gamma Rovers", "Alpha United Gamma Rovers"]
+        lote, resultados = self._comparar(["Alpha United"], nombres)
+
+        # "Gamma Rovers" se crea en el lote; el segundo nombre empata con ambos
+        self.assertEqual(resultados[0][1], 0.0)
+        self.assertEqual(resultados[1][1], 100.0)
+        self.assertEqual(lote.get_team(resultados[1][0])['official_name'], "Alpha United")
+
+    def test_creado_en_lote_gana(self):
+        """Un nombre repetido en el lote encuentra al equipo creado por una fila anterior"""
+        nombres = ["Zeta Wanderers", "Zeta Wanderers FC", "zeta wanderers"]
+        lote, resultados = self._comparar(["Alpha United"], nombres)
+
+        self.assertEqual(resultados[0][1], 0.0)
+        self.assertEqual(resultados[1][0], resultados[0][0])
+        self.assertEqual(resultados[2], (resultados[0][0], 100.0))
+        self.assertEqual(len(lote.get_all_teams()), 2)
+
+    def test_sin_candidatos_previos(self):
+        """Lote sobre una BD vacía: todo se compara contra los creados en el lote"""
+        rng = random.Random(3)
+        self._comparar([], [_nombre_aleatorio(rng) for _ in range(25)])
+
+    def test_aleatorio(self):
+        """Lotes aleatorios con repetidos, variantes de nombre e IDs externos"""
+        for semilla in range(8):
+            with self.subTest(semilla=semilla):
+                rng = random.Random(semilla)
+                equipos = list(dict.fromkeys(
+                    _nombre_aleatorio(rng, max_tokens=2).lower() for _ in range(10)
+                ))
+                nombres = [_nombre_aleatorio(rng) for _ in range(30)]
+                nombres += rng.sample(nombres, 5)
+                rng.shuffle(nombres)
+                external_ids = [
+                    str(rng.randint(1, 12)) if rng.random() < 0.5 else None
+                    for _ in nombres
+                ]
+                self._comparar(equipos, nombres, source="test",
+                               external_ids=external_ids,
+                               create_if_missing=rng.random() < 0.8)
+
+    def test_aleatorio_sin_rapidfuzz(self):
+        """Mismo test con el backend de team_fuzzy_jit"""
+        with patch.object(team_normalization, 'process', None), \
+                patch.object(team_normalization, 'token_set_ratio_matrix',
+                             token_set_ratio_matrix, create=True):
+            self.test_aleatorio()
+            self.test_empate_precalculado_vs_creado_en_lote()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Tests de timba_core: predicción en lote contra el cálculo escalar con scipy
+y FuerzasSoA contra el dict por equipo que devolvía calcular_fuerzas.
+
+Uso:
+    pytest tests/test_timba_core.py -v
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Agregar src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from timba_core import (
+    FuerzasSoA,
+    TeamView,
+    calcular_fuerzas,
+    predecir_partido,
+    predecir_partidos_batch,
+)
+
+try:
+    from scipy.stats import poisson
+    SCIPY_DISPONIBLE = True
+except ImportError:
+    SCIPY_DISPONIBLE = False
+
+
+def _df_liga():
+    """Liga chica (4 equipos, ida y vuelta) con fechas distintas por partido"""
+    equipos = ['Team A', 'Team B', 'Team C', 'Team D']
+    rng = np.random.default_rng(7)
+    filas = []
+    dia = 1
+    for local in equipos:
+        for visitante in equipos:
+            if local == visitante:
+                continue
+            fthg, ftag = rng.integers(0, 5, size=2)
+            filas.append({
+                'Date': f'{dia:02d}/01/2024',
+                'HomeTeam': local,
+                'AwayTeam': visitante,
+                'FTHG': int(fthg),
+                'FTAG': int(ftag),
+                'HTHG': int(rng.integers(0, fthg + 1)),
+                'HTAG': int(rng.integers(0, ftag + 1)),
+                'HS': int(rng.integers(5, 20)),
+                'AS': int(rng.integers(5, 20)),
+                'HST': int(rng.integers(1, 10)),
+                'AST': int(rng.integers(1, 10)),
+                'HC': int(rng.integers(0, 12)),
+                'AC': int(rng.integers(0, 12)),
+                'HY': int(rng.integers(0, 5)),
+                'AY': int(rng.integers(0, 5)),
+                'HR': int(rng.integers(0, 2)),
+                'AR': int(rng.integers(0, 2)),
+            })
+            dia += 1
+    return pd.DataFrame(filas)
+
+
+def _fuerzas_dict(df):
+    """
+    calcular_fuerzas original (un loop por equipo) como referencia:
+    retorna {equipo: {métrica: valor}} en float64.
+    """
+    df = df.copy()
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+    df = df.sort_values('Date').reset_index(drop=True)
+    media_local = df['FTHG'].mean()
+    media_visitante = df['FTAG'].mean()
+    fuerzas = {}
+    for equipo in sorted(df['HomeTeam'].unique()):
+        casa = df[df['HomeTeam'] == equipo]
+        fuera = df[df['AwayTeam'] == equipo]
+        gf_casa, gc_casa = casa['FTHG'].mean(), casa['FTAG'].mean()
+        gf_fuera, gc_fuera = fuera['FTAG'].mean(), fuera['FTHG'].mean()
+        ataque_casa_global = gf_casa / media_local
+        defensa_casa_global = gc_casa / media_visitante
+        ataque_fuera_global = gf_fuera / media_visitante
+        defensa_fuera_global = gc_fuera / media_local
+
+        partidos = [(r['Date'], r['FTHG'], r['FTAG']) for _, r in casa.iterrows()]
+        partidos += [(r['Date'], r['FTAG'], r['FTHG']) for _, r in fuera.iterrows()]
+        ultimos = sorted(partidos, key=lambda p: p[0])[-5:]
+        gf_reciente = sum(p[1] for p in ultimos) / len(ultimos)
+        gc_reciente = sum(p[2] for p in ultimos) / len(ultimos)
+        ataque_reciente = gf_reciente / media_local
+        defensa_reciente = gc_reciente / media_visitante
+
+        corners_casa, corners_fuera = casa['HC'].mean(), fuera['AC'].mean()
+        am_casa, am_fuera = casa['HY'].mean(), fuera['AY'].mean()
+        ro_casa, ro_fuera = casa['HR'].mean(), fuera['AR'].mean()
+        eficiencia_casa = gf_casa / casa['HST'].mean() * 100
+        eficiencia_fuera = gf_fuera / fuera['AST'].mean() * 100
+        todos = pd.concat([casa, fuera])
+        goles_2t = ((casa['FTHG'] - casa['HTHG']).tolist() +
+                    (fuera['FTAG'] - fuera['HTAG']).tolist())
+        fuerzas[equipo] = {
+            'Ataque_Casa': ataque_reciente * 0.6 + ataque_casa_global * 0.4,
+            'Defensa_Casa': defensa_reciente * 0.6 + defensa_casa_global * 0.4,
+            'Ataque_Fuera': ataque_reciente * 0.6 + ataque_fuera_global * 0.4,
+            'Defensa_Fuera': defensa_reciente * 0.6 + defensa_fuera_global * 0.4,
+            'Ataque_Casa_Global': ataque_casa_global,
+            'Defensa_Casa_Global': defensa_casa_global,
+            'Ataque_Fuera_Global': ataque_fuera_global,
+            'Defensa_Fuera_Global': defensa_fuera_global,
+            'Ataque_Reciente': ataque_reciente,
+            'Defensa_Reciente': defensa_reciente,
+            'Goles_Favor_Reciente': gf_reciente,
+            'Goles_Contra_Reciente': gc_reciente,
+            'Corners_Casa': corners_casa,
+            'Corners_Fuera': corners_fuera,
+            'Corners_Casa_Contra': casa['AC'].mean(),
+            'Corners_Fuera_Contra': fuera['HC'].mean(),
+            'Corners_Promedio': (corners_casa + corners_fuera) / 2,
+            'Tarjetas_Am_Casa': am_casa,
+            'Tarjetas_Am_Fuera': am_fuera,
+            'Tarjetas_Am_Promedio': (am_casa + am_fuera) / 2,
+            'Tarjetas_Ro_Casa': ro_casa,
+            'Tarjetas_Ro_Fuera': ro_fuera,
+            'Tarjetas_Ro_Promedio': (ro_casa + ro_fuera) / 2,
+            'Eficiencia_Tiro_Casa_pct': eficiencia_casa,
+            'Eficiencia_Tiro_Fuera_pct': eficiencia_fuera,
+            'Eficiencia_Tiro_Promedio_pct': (eficiencia_casa + eficiencia_fuera) / 2,
+            'BTTS_pct': ((todos['FTHG'] > 0) & (todos['FTAG'] > 0)).mean() * 100,
+            'Over25_pct': ((todos['FTHG'] + todos['FTAG']) > 2.5).mean() * 100,
+            'Goles_2T_Promedio': float(np.mean(goles_2t)),
+        }
+    return fuerzas
+
+
+def _prediccion_escalar(local, visitante, fuerzas, media_local, media_visitante):
+    """Cálculo partido a partido con scipy.stats.poisson (como el predecir_partido original)"""
+    lambda_local = fuerzas[local]['Ataque_Casa'] * fuerzas[visitante]['Defensa_Fuera'] * media_local
+    lambda_visitante = fuerzas[visitante]['Ataque_Fuera'] * fuerzas[local]['Defensa_Casa'] * media_visitante
+    prob_local = [poisson.pmf(i, lambda_local) for i in range(6)]
+    prob_visitante = [poisson.pmf(i, lambda_visitante) for i in range(6)]
+    victoria_local = empate = victoria_visitante = 0
+    marcadores = []
+    for goles_l in range(6):
+        for goles_v in range(6):
+            prob = prob_local[goles_l] * prob_visitante[goles_v]
+            if goles_l > goles_v:
+                victoria_local += prob
+            elif goles_l == goles_v:
+                empate += prob
+            else:
+                victoria_visitante += prob
+            marcadores.append({'marcador': f'{goles_l}-{goles_v}', 'prob': prob})
+    marcadores.sort(key=lambda x: x['prob'], reverse=True)
+
+    lambda_total = lambda_local + lambda_visitante
+    corners_total = fuerzas[local]['Corners_Casa'] + fuerzas[visitante]['Corners_Fuera']
+    return {
+        'Goles_Esp_Local': lambda_local,
+        'Goles_Esp_Vis': lambda_visitante,
+        'Prob_Local': victoria_local,
+        'Prob_Empate': empate,
+        'Prob_Vis': victoria_visitante,
+        'Top_3_Marcadores': marcadores[:3],
+        'Over_15': 1 - poisson.cdf(1, lambda_total),
+        'Over_25': 1 - poisson.cdf(2, lambda_total),
+        'Under_35': poisson.cdf(3, lambda_total),
+        'Prob_1X': victoria_local + empate,
+        'Prob_X2': empate + victoria_visitante,
+        'Prob_12': victoria_local + victoria_visitante,
+        'Corners_Lambda_Total': corners_total,
+        'Over_85': 1 - poisson.cdf(8, corners_total),
+        'Over_95': 1 - poisson.cdf(9, corners_total),
+        'Under_105': poisson.cdf(10, corners_total),
+    }
+
+
+@unittest.skipUnless(SCIPY_DISPONIBLE, "scipy no instalado")
+class TestPredecirPartidosBatch(unittest.TestCase):
+    """predecir_partidos_batch / predecir_partido vs Poisson escalar de scipy"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fuerzas, cls.media_local, cls.media_visitante = calcular_fuerzas(_df_liga())
+        equipos = list(cls.fuerzas)
+        cls.pares = [(l, v) for l in equipos for v in equipos if l != v]
+
+    def _assert_prediccion(self, obtenido, esperado):
+        for clave, valor in esperado.items():
+            if clave == 'Top_3_Marcadores':
+                continue
+            self.assertAlmostEqual(float(obtenido[clave]), valor, places=9, msg=clave)
+        # Los marcadores pueden empatar en probabilidad: se comparan solo las probabilidades
+        probs_esperadas = [m['prob'] for m in esperado['Top_3_Marcadores']]
+        probs_obtenidas = [float(m['prob']) for m in obtenido['Top_3_Marcadores']]
+        np.testing.assert_allclose(probs_obtenidas, probs_esperadas, rtol=1e-9)
+
+    def test_batch_vs_escalar(self):
+        """Cada partido del lote coincide con el cálculo escalar"""
+        resultados = predecir_partidos_batch(self.pares, self.fuerzas, self.media_local, self.media_visitante)
+        self.assertEqual(len(resultados), len(self.pares))
+        for (local, visitante), obtenido in zip(self.pares, resultados):
+            esperado = _prediccion_escalar(local, visitante, self.fuerzas, self.media_local, self.media_visitante)
+            self._assert_prediccion(obtenido, esperado)
+
+    def test_predecir_partido(self):
+        """predecir_partido delega en el lote y da lo mismo que el escalar"""
+        local, visitante = self.pares[0]
+        obtenido = predecir_partido(local, visitante, self.fuerzas, self.media_local, self.media_visitante)
+        esperado = _prediccion_escalar(local, visitante, self.fuerzas, self.media_local, self.media_visitante)
+        self._assert_prediccion(obtenido, esperado)
+
+    def test_equipo_inexistente(self):
+        """Los pares con equipos desconocidos quedan en None sin afectar al resto"""
+        local, visitante = self.pares[0]
+        pares = [('No Existe', visitante), (local, visitante), (local, 'Tampoco')]
+        resultados = predecir_partidos_batch(pares, self.fuerzas, self.media_local, self.media_visitante)
+        self.assertIsNone(resultados[0])
+        self.assertIsNone(resultados[2])
+        esperado = _prediccion_escalar(local, visitante, self.fuerzas, self.media_local, self.media_visitante)
+        self._assert_prediccion(resultados[1], esperado)
+        self.assertIsNone(predecir_partido('No Existe', visitante, self.fuerzas,
+                                           self.media_local, self.media_visitante))
+
+    def test_fuerzas_dict(self):
+        """El dict clásico {equipo: {métrica: valor}} da el mismo resultado"""
+        fuerzas_dict = {equipo: dict(vista) for equipo, vista in self.fuerzas.items()}
+        con_soa = predecir_partidos_batch(self.pares, self.fuerzas, self.media_local, self.media_visitante)
+        con_dict = predecir_partidos_batch(self.pares, fuerzas_dict, self.media_local, self.media_visitante)
+        for a, b in zip(con_soa, con_dict):
+            self.assertAlmostEqual(float(a['Prob_Local']), float(b['Prob_Local']), places=12)
+            self.assertAlmostEqual(float(a['Over_25']), float(b['Over_25']), places=12)
+
+
+class TestFuerzasSoA(unittest.TestCase):
+    """FuerzasSoA / TeamView se comportan como el dict {equipo: {métrica: valor}}"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = _df_liga()
+        cls.fuerzas, cls.media_local, cls.media_visitante = calcular_fuerzas(cls.df.copy())
+        cls.referencia = _fuerzas_dict(cls.df)
+
+    def test_valores_vs_dict(self):
+        """Mismos equipos, métricas y valores (tolerancia de float32)"""
+        self.assertEqual(list(self.fuerzas), list(self.referencia))
+        for equipo, metricas in self.referencia.items():
+            vista = self.fuerzas[equipo]
+            self.assertEqual(set(vista), set(metricas), equipo)
+            for campo, valor in metricas.items():
+                np.testing.assert_allclose(vista[campo], valor, rtol=1e-6, atol=1e-6,
+                                           err_msg=f'{equipo} {campo}')
+
+    def test_medias_liga(self):
+        """Las medias de la liga siguen siendo las de FTHG/FTAG"""
+        self.assertAlmostEqual(self.media_local, self.df['FTHG'].mean())
+        self.assertAlmostEqual(self.media_visitante, self.df['FTAG'].mean())
+
+    def test_equipo_inexistente(self):
+        """Equipo desconocido: KeyError, `in` falso y get() con default"""
+        self.assertNotIn('No Existe', self.fuerzas)
+        with self.assertRaises(KeyError):
+            self.fuerzas['No Existe']
+        self.assertIsNone(self.fuerzas.get('No Existe'))
+        vista = self.fuerzas['Team A']
+        with self.assertRaises(KeyError):
+            vista['Metrica_Inexistente']
+        self.assertEqual(vista.get('Metrica_Inexistente', 0), 0)
+
+    def test_orden_iteracion(self):
+        """Equipos en orden alfabético y métricas en el orden de las columnas"""
+        self.assertEqual(list(self.fuerzas), sorted(self.df['HomeTeam'].unique()))
+        self.assertEqual(len(self.fuerzas), 4)
+        self.assertEqual(list(self.fuerzas['Team B']), list(self.referencia['Team B']))
+        self.assertEqual(len(self.fuerzas['Team B']), len(self.referencia['Team B']))
+        self.assertEqual([e for e, _ in self.fuerzas.items()], list(self.fuerzas))
+
+    def test_valores_float_python(self):
+        """TeamView devuelve float de Python, no np.float32"""
+        vista = self.fuerzas['Team C']
+        self.assertIsInstance(vista, TeamView)
+        for valor in vista.values():
+            self.assertIs(type(valor), float)
+        self.assertIs(type(dict(vista)['Ataque_Casa']), float)
+
+    def test_desde_dict(self):
+        """desde_dict conserva equipos, orden y valores del dict"""
+        soa = FuerzasSoA.desde_dict(self.referencia)
+        self.assertEqual(list(soa), list(self.referencia))
+        for equipo, metricas in self.referencia.items():
+            self.assertEqual(list(soa[equipo]), list(metricas))
+            np.testing.assert_allclose(list(soa[equipo].values()), list(metricas.values()), rtol=1e-6)
+        np.testing.assert_array_equal(soa.indices(['Team D', 'Team A']), [3, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()